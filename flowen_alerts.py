@@ -0,0 +1,192 @@
+
+import heapq
+import itertools
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from flowen_refresh import REFRESH_SECONDS
+from flowen_rules import conditions_mask
+
+# ─── Alert Rules ─────────────────────────────────────────────────
+# name → what raises it. Rules are only checked against the rows a batch
+# changed (and rows whose timer ran out), never against the whole book.
+# "when": flowen_rules conditions; fires when a row starts to match them.
+# "rises": (column, values in order); fires when the value moves up.
+# "since" + "for_days": the row must also have matched for that many days
+#   since the date in "since"; rows that match early wait on a timer.
+ALERT_RULES = {
+    "dpd_over_30": {"label": "DPD crossed 30", "when": {"dpd": (">", 30)}},
+    "risk_escalation": {"label": "Risk escalated", "rises": ("risk_level", ["Low", "Medium", "High"])},
+    "ignored_7_days": {
+        "label": "Ignored for 7+ days",
+        "when": {"response_behavior": "Ignored"},
+        "since": "last_contact_date",
+        "for_days": 7,
+    },
+}
+ALERT_LOG_SIZE = 500
+
+def _now(now=None):
+    return np.datetime64(pd.Timestamp.now() if now is None else pd.Timestamp(now), "s")
+
+# Level of each row under a rule (0: no alert, higher: more severe) plus,
+# for timed rules, when rows that match but are not yet due become due
+# (NaT for the rest)
+def _levels(spec, rows, now):
+    if "rises" in spec:
+        column, order = spec["rises"]
+        return pd.Categorical(rows[column], categories=order).codes.astype(np.int8) + 1, None
+    match = conditions_mask(rows, spec["when"])
+    if "for_days" not in spec:
+        return match.astype(np.int8), None
+    since = pd.to_datetime(rows[spec["since"]], errors="coerce").to_numpy(dtype="datetime64[s]")
+    due = since + np.timedelta64(spec["for_days"], "D")
+    ready = match & (due <= now)
+    return ready.astype(np.int8), np.where(match & ~ready, due, np.datetime64("NaT"))
+
+def _columns(spec):
+    if "rises" in spec:
+        return [spec["rises"][0]]
+    return [*spec["when"], *([spec["since"]] if "since" in spec else [])]
+
+# One line per fired row, built column-wise
+def _details(spec, rows, old, new):
+    if "rises" in spec:
+        column, order = spec["rises"]
+        names = [None, *order]
+        return [f"{column}: {names[o]} → {names[n]}" if o else f"{column}: {names[n]}" for o, n in zip(old, new)]
+    parts = [[f"{column}: {value}" for value in rows[column].tolist()] for column in spec["when"]]
+    details = [", ".join(row) for row in zip(*parts)]
+    if "since" in spec:
+        dates = pd.to_datetime(rows[spec["since"]]).dt.strftime("%Y-%m-%d").tolist()
+        details = [f"{detail} since {date}" for detail, date in zip(details, dates)]
+    return details
+
+# ─── Alert Log ───────────────────────────────────────────────────
+# The last ALERT_LOG_SIZE alerts, numbered in firing order. Written by the
+# refresher thread, read by every session; it outlives the store, so a
+# rebuilt store keeps appending to the same log.
+class AlertLog:
+    def __init__(self, size=ALERT_LOG_SIZE):
+        self.entries = deque(maxlen=size)
+        self.ids = itertools.count(1)
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def add(self, alerts):
+        with self.lock:
+            for alert in alerts:
+                alert["id"] = next(self.ids)
+                self.entries.append(alert)
+            self.total += len(alerts)
+
+    # newest first
+    def recent(self, limit=50):
+        with self.lock:
+            return list(itertools.islice(reversed(self.entries), limit))
+
+# ─── Alert Engine ────────────────────────────────────────────────
+# Per rule, the level each row was last seen at, seeded from the book at
+# start-up so existing state raises nothing. A changed row fires when its
+# new level is above the one recorded, and the recorded level follows the
+# row, so repeated or re-delivered updates fire once; a row that drops
+# out of a rule can fire again when it comes back.
+class AlertEngine:
+    def __init__(self, df, log=None, rules=ALERT_RULES, now=None):
+        self.rules = rules
+        self.log = AlertLog() if log is None else log
+        # only these columns of a changed row are read
+        self.columns = list(dict.fromkeys(["account_id"] + [c for spec in rules.values() for c in _columns(spec)]))
+        self.levels = {}
+        self.timers = []  # heap of (due, position, rule)
+        self.due = {}  # (rule, position) → due time of its live timer
+        now = _now(now)
+        for name, spec in rules.items():
+            self.levels[name], waiting = _levels(spec, df, now)
+            if waiting is not None:
+                for position in np.flatnonzero(~np.isnat(waiting)):
+                    self.due[(name, position)] = waiting[position]
+                    self.timers.append((waiting[position], position, name))
+        heapq.heapify(self.timers)
+
+    # `positions` of rows just written to `df`; `appended` when they are new
+    def evaluate(self, df, positions, appended=False, now=None):
+        positions = np.asarray(positions, dtype=np.int64)
+        if appended:
+            for name, levels in self.levels.items():
+                self.levels[name] = np.concatenate([levels, np.zeros(len(df) - len(levels), dtype=np.int8)])
+        rows = df[self.columns].iloc[positions]
+        now = _now(now)
+        fired = []
+        for name in self.rules:
+            fired += self._evaluate(name, rows, positions, appended, now)
+        self.log.add(fired)
+        return len(fired)
+
+    def _evaluate(self, name, rows, positions, appended, now):
+        spec = self.rules[name]
+        levels, waiting = _levels(spec, rows, now)
+        state = self.levels[name]
+        previous = state[positions]
+        state[positions] = levels
+        if waiting is not None:
+            for position, due in zip(positions, waiting):
+                if np.isnat(due):
+                    self.due.pop((name, position), None)
+                else:
+                    self.due[(name, position)] = due
+                    heapq.heappush(self.timers, (due, position, name))
+        # a new row has no earlier value to rise from
+        if appended and "rises" in spec:
+            return []
+        hits = np.flatnonzero(levels > previous)
+        if not len(hits):
+            return []
+        fired = rows.iloc[hits]
+        at = pd.Timestamp(now)
+        return [
+            {"rule": name, "label": spec["label"], "account_id": account, "detail": detail, "at": at}
+            for account, detail in zip(
+                fired["account_id"].tolist(), _details(spec, fired, previous[hits], levels[hits])
+            )
+        ]
+
+    # Re-checks the rows whose timers have run out; a timer replaced or
+    # cancelled by a later update is skipped
+    def tick(self, df, now=None):
+        now = _now(now)
+        expired = {}
+        while self.timers and self.timers[0][0] <= now:
+            due, position, name = heapq.heappop(self.timers)
+            if self.due.get((name, position)) == due:
+                del self.due[(name, position)]
+                expired.setdefault(name, []).append(position)
+        fired = []
+        for name, positions in expired.items():
+            positions = np.array(positions, dtype=np.int64)
+            fired += self._evaluate(name, df[self.columns].iloc[positions], positions, False, now)
+        self.log.add(fired)
+        return len(fired)
+
+# ─── Sidebar Panel ───────────────────────────────────────────────
+# Polls the log on its own, so alerts appear without a page rerun; those
+# fired since the session last looked also pop up as toasts.
+ALERT_PANEL_ROWS = 20
+
+@st.fragment(run_every=REFRESH_SECONDS or None)
+def alert_panel(log):
+    alerts = log.recent(ALERT_PANEL_ROWS)
+    latest = alerts[0]["id"] if alerts else 0
+    seen = st.session_state.setdefault("alerts_seen", latest)
+    for alert in reversed([a for a in alerts if a["id"] > seen][:3]):
+        st.toast(f"{alert['label']}: {alert['account_id']}", icon="🔔")
+    st.session_state["alerts_seen"] = latest
+
+    with st.expander("🔔 Alerts"):
+        st.caption(f"{log.total} fired since start-up")
+        for alert in alerts:
+            st.markdown(f"**{alert['label']}** · {alert['account_id']}  \n{alert['detail']} · {alert['at']:%H:%M:%S}")
@@ -0,0 +1,50 @@
+
+import base64
+
+import streamlit as st
+
+LOGO_PATH = "flowen_logo.png"
+
+# ─── Startup Assets ──────────────────────────────────────────────
+# Built once per process and reused by every rerun and session. The PNG is
+# already PNG: its bytes are base64-encoded as they are, without a decode
+# and re-encode through PIL.
+@st.cache_resource
+def logo_base64(path=LOGO_PATH):
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+# Font link, dashboard CSS and sidebar logo as one markdown block.
+@st.cache_resource
+def app_css(path=LOGO_PATH):
+    logo = logo_base64(path)
+    return f"""
+<link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
+<style>
+    body {{
+        font-family: 'Inter', sans-serif;
+        color: #1C2B36;
+        background-color: #F6F8FA;
+    }}
+    .main .block-container {{
+        background-color: #F6F8FA !important;
+        padding: 2rem 3rem 3rem 3rem;
+    }}
+    [data-testid="stSidebar"] {{
+        background-color: #0B2A5B;
+    }}
+    [data-testid="stSidebar"] * {{
+        color: white !important;
+    }}
+    .stCard {{
+        background-color: #FFFFFF;
+        padding: 1.5rem;
+        border-radius: 16px;
+        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.06);
+        margin-bottom: 1.5rem;
+    }}
+</style>
+<div style='padding: 10px 0 10px 10px;'>
+    <img src='data:image/png;base64,{logo}' width='130'/>
+</div>
+"""
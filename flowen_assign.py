@@ -0,0 +1,225 @@
+
+import numpy as np
+import pandas as pd
+
+from flowen_forecast import pay_probability
+from flowen_rules import conditions_mask
+
+# ─── Assignment Rules ────────────────────────────────────────────
+# Accounts matching any of these (flowen_rules conditions) are worked by a
+# collector; the rest stay with the automated journeys.
+ASSIGN_SCOPE = [{"status_paid": "Stuck"}, {"risk_level": "High"}]
+RISK_LEVELS = ["Low", "Medium", "High"]
+# Priority of an account: total_debt × chance it pays within
+# ASSIGN_HORIZON days (flowen_forecast) × the weight of its risk level
+RISK_WEIGHTS = {"Low": 1.0, "Medium": 1.2, "High": 1.5}
+ASSIGN_HORIZON = 30
+ASSIGN_SOURCE = ["account_id", "status_paid", "risk_level", "journey_type", "total_debt", "ai_risk_score"]
+
+# ─── Collector Roster ────────────────────────────────────────────
+# One row per collector: collector_id, name, capacity (accounts held at
+# once) and past recovery rate per risk level (rate_low, rate_medium,
+# rate_high). Blank rates, e.g. for a new collector, count as the team's.
+ROSTER_COLUMNS = ["collector_id", "name", "capacity"] + [f"rate_{level.lower()}" for level in RISK_LEVELS]
+
+def load_roster(path):
+    roster = pd.read_csv(path, dtype={"collector_id": str, "name": str})
+    missing = [c for c in ROSTER_COLUMNS if c not in roster.columns]
+    if missing:
+        raise ValueError(f"{path}: roster is missing {', '.join(missing)}")
+    roster = roster[ROSTER_COLUMNS].drop_duplicates("collector_id", keep="last").reset_index(drop=True)
+    roster["capacity"] = roster["capacity"].fillna(0).clip(lower=0).astype(np.int64)
+    return roster
+
+# Collector × risk level multiplier on expected recovery: a collector's past
+# rate over the team average for that level. The last column, the mean
+# over levels, is used for accounts without a risk level.
+def performance(roster):
+    rates = roster[ROSTER_COLUMNS[3:]].to_numpy(dtype=float)
+    team = np.nanmean(rates, axis=0) if len(rates) else np.ones(len(RISK_LEVELS))
+    relative = np.nan_to_num(rates / np.where(team > 0, team, np.nan), nan=1.0)
+    return np.column_stack([relative, relative.mean(axis=1)])
+
+# Priority of each row (NaN outside ASSIGN_SCOPE) and its column in
+# performance()
+def priority(rows, model):
+    scope = np.zeros(len(rows), dtype=bool)
+    for when in ASSIGN_SCOPE:
+        scope |= conditions_mask(rows, when)
+    risk = rows["risk_level"].astype(object)
+    pays = pay_probability(model, rows, rows["journey_type"].astype(object).to_numpy(), ASSIGN_HORIZON)
+    weight = rows["total_debt"].to_numpy(dtype=float) * pays * risk.map(RISK_WEIGHTS).fillna(1.0).to_numpy(dtype=float)
+    codes = pd.Categorical(risk, categories=RISK_LEVELS).codes
+    return np.where(scope, np.nan_to_num(weight), np.nan), np.where(codes < 0, len(RISK_LEVELS), codes).astype(np.int8)
+
+# ─── Greedy Placement ────────────────────────────────────────────
+# Accounts in descending priority each go to the collector with the best
+# multiplier for their risk level among those with room left, so the
+# largest expected recoveries get the strongest collectors. Done one
+# account at a time this is a Python loop over the book; instead, while
+# no collector fills up, each risk level keeps sending its accounts to the
+# same collector, so the accounts are walked in runs that end where the
+# next collector fills. That is at most one run per collector, each
+# placed with slices and found by binary search, O(n log n) overall.
+#
+# Returns the collector index per account (-1: no room left).
+def _taken(ranks, done, levels, rank):
+    return sum(int(np.searchsorted(ranks[level], rank)) - done[level] for level in levels)
+
+def place(weight, tier, perf, free):
+    order = np.argsort(-weight, kind="stable")
+    placed = np.full(len(weight), -1, dtype=np.int32)
+    # per risk level, its accounts' ranks in priority order, and how many
+    # of them are placed
+    ranks = [np.flatnonzero(tier[order] == level) for level in range(perf.shape[1])]
+    done = [0] * len(ranks)
+    free = free.astype(np.int64).copy()
+
+    while (free > 0).any():
+        open_ = np.where(free > 0, 0, -np.inf)
+        best = {
+            level: int(np.argmax(perf[:, level] + open_))
+            for level in range(len(ranks)) if done[level] < len(ranks[level])
+        }
+        if not best:
+            break
+        # end of the run: the rank at which the first of the chosen
+        # collectors has taken as many accounts as it has room for
+        end = len(order)
+        for collector in set(best.values()):
+            levels = [level for level, c in best.items() if c == collector]
+            if _taken(ranks, done, levels, end) <= free[collector]:
+                continue
+            lo, hi = 0, end
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if _taken(ranks, done, levels, mid) >= free[collector]:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            end = lo
+        for level, collector in best.items():
+            stop = int(np.searchsorted(ranks[level], end))
+            placed[order[ranks[level][done[level]:stop]]] = collector
+            free[collector] -= stop - done[level]
+            done[level] = stop
+    return placed
+
+# ─── Collector Assignment ────────────────────────────────────────
+# The collector of every account of the book (-1: none), kept current as
+# batches change accounts and the roster changes. A rebalance never moves
+# an account whose collector is still valid; it frees the slots of
+# accounts that left the scope or lost their collector, then places the
+# queue (in-scope accounts without one) into whatever room there is. Only
+# the top `room` queued accounts can be placed, so they are picked with
+# argpartition and the cost follows the change, not the queue.
+class CollectorAssignment:
+    def __init__(self, roster):
+        self.roster = roster
+        self.perf = performance(roster)
+        self.capacity = roster["capacity"].to_numpy(dtype=np.int64)
+        self.collector = np.empty(0, dtype=np.int32)
+        self.weight = np.empty(0)
+        self.tier = np.empty(0, dtype=np.int8)
+        self.load = np.zeros(len(roster), dtype=np.int64)
+
+    # `positions` of rows (re)written to `df`; rows past the end are new
+    def update(self, df, positions, model):
+        positions = np.asarray(positions, dtype=np.int64)
+        grow = len(df) - len(self.collector)
+        if grow > 0:
+            self.collector = np.concatenate([self.collector, np.full(grow, -1, dtype=np.int32)])
+            self.weight = np.concatenate([self.weight, np.full(grow, np.nan)])
+            self.tier = np.concatenate([self.tier, np.zeros(grow, dtype=np.int8)])
+        weight, tier = priority(df[ASSIGN_SOURCE].iloc[positions], model)
+        self.weight[positions] = weight
+        self.tier[positions] = tier
+        # out of scope now: the collector's slot is freed
+        left = positions[np.isnan(weight) & (self.collector[positions] >= 0)]
+        self.load -= np.bincount(self.collector[left], minlength=len(self.load))
+        self.collector[left] = -1
+        return self._fill()
+
+    # Collectors are matched by collector_id. A removed collector's accounts
+    # rejoin the queue, as do the lowest-priority accounts of one whose
+    # capacity was cut; new rates apply to placements from now on.
+    def set_roster(self, roster):
+        moved = pd.Index(roster["collector_id"]).get_indexer(self.roster["collector_id"])
+        held = self.collector >= 0
+        self.collector[held] = moved[self.collector[held]]
+        self.roster = roster
+        self.perf = performance(roster)
+        self.capacity = roster["capacity"].to_numpy(dtype=np.int64)
+
+        load = self._count()
+        over = np.flatnonzero(load > self.capacity)
+        if len(over):
+            rows = np.flatnonzero(np.isin(self.collector, over))
+            rows = rows[np.lexsort((-self.weight[rows], self.collector[rows]))]
+            owner = self.collector[rows]
+            rank = np.arange(len(rows)) - np.searchsorted(owner, owner)
+            self.collector[rows[rank >= self.capacity[owner]]] = -1
+        self.load = self._count()
+        return self._fill()
+
+    def _count(self):
+        held = self.collector[self.collector >= 0]
+        return np.bincount(held, minlength=len(self.capacity)).astype(np.int64)
+
+    def _fill(self):
+        room = int(np.clip(self.capacity - self.load, 0, None).sum())
+        queue = np.flatnonzero((self.collector < 0) & ~np.isnan(self.weight))
+        if not room or not len(queue):
+            return 0
+        if len(queue) > room:
+            queue = queue[np.argpartition(-self.weight[queue], room - 1)[:room]]
+        placed = place(self.weight[queue], self.tier[queue], self.perf, self.capacity - self.load)
+        taken = placed >= 0
+        self.collector[queue[taken]] = placed[taken]
+        self.load += np.bincount(placed[taken], minlength=len(self.load))
+        return int(taken.sum())
+
+    # The arrays a snapshot keeps of this version
+    def frozen(self):
+        return {"roster": self.roster, "collector": self.collector.copy(), "tier": self.tier.copy(), "perf": self.perf}
+
+# ─── Leaderboard ─────────────────────────────────────────────────
+# Per collector, over the accounts in `rows` (positions; None: all):
+# what they hold and the recovery expected from it, the chance to pay
+# times their multiplier for each account's risk level. Every column
+# follows `rows`: capacity used is the share of capacity those accounts
+# take, and past recovery is the collector's past rate for each held
+# account's risk level weighted by its debt (blank when none is held;
+# blank rates count as the team's, the mean over levels for accounts
+# without a risk level).
+def past_rates(roster):
+    rates = roster[ROSTER_COLUMNS[3:]].to_numpy(dtype=float)
+    team = np.nanmean(rates, axis=0) if len(rates) else np.full(len(RISK_LEVELS), np.nan)
+    rates = np.where(np.isnan(rates), team, rates)
+    return np.column_stack([rates, np.nanmean(rates, axis=1) if len(rates) else np.empty(0)])
+
+def leaderboard(frozen, df, model, rows=None):
+    roster, perf = frozen["roster"], frozen["perf"]
+    collector, tier = frozen["collector"], frozen["tier"]
+    positions = np.arange(len(collector)) if rows is None else np.asarray(rows, dtype=np.int64)
+    positions = positions[collector[positions] >= 0]
+    owner = collector[positions]
+    accounts = df[ASSIGN_SOURCE].iloc[positions]
+    debt = accounts["total_debt"].to_numpy(dtype=float)
+    pays = pay_probability(model, accounts, accounts["journey_type"].astype(object).to_numpy(), ASSIGN_HORIZON)
+    expected = np.nan_to_num(debt * pays * perf[owner, tier[positions]])
+    past = past_rates(roster)[owner, tier[positions]]
+    count = lambda values=None: np.bincount(owner, weights=values, minlength=len(roster))
+    held, balance = count(), count(np.nan_to_num(debt))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recovery = count(np.nan_to_num(debt * past)) / np.where(balance > 0, balance, np.nan)
+    board = pd.DataFrame({
+        "Collector": roster["name"].fillna(roster["collector_id"]),
+        "Accounts": held.astype(np.int64),
+        "Capacity Used (%)": np.round(held / np.maximum(roster["capacity"].to_numpy(), 1) * 100, 1),
+        "High Risk": count((accounts["risk_level"].astype(object) == "High").to_numpy(dtype=float)).astype(np.int64),
+        "Balance (฿)": np.round(balance),
+        "Expected (฿)": np.round(count(expected)),
+        "Past Recovery (%)": np.round(recovery * 100, 1),
+    })
+    return board.sort_values("Expected (฿)", ascending=False, kind="stable").reset_index(drop=True)
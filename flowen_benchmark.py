@@ -0,0 +1,631 @@
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from flowen_cache import CACHE_DIR
+from flowen_rules import assign_journey, assign_status_paid
+
+SOURCE_CSV = "flowen_mock_data_5000.csv"
+# Generated inputs and reports stay in the (git-ignored) cache directory
+SYNTH_DIR = os.path.join(CACHE_DIR, "synth")
+RESULTS_PATH = os.path.join(CACHE_DIR, "benchmark_results.json")
+
+# ─── Reference Row-wise Implementation ───────────────────────────
+# Kept verbatim from the original load_data() so the rule engine can be
+# checked for identical output.
+def legacy_map_journey(row):
+    if row["risk_level"] == "High":
+        return "Hardship Assistance"
+    elif row["contact_channel"] == "LINE":
+        return "Default Prevention"
+    elif row["contact_channel"] == "Call":
+        return "Promise to Pay Reinforcement"
+    else:
+        return "General Follow-up"
+
+def legacy_status_paid(dpd):
+    return "Paid" if dpd == 0 else ("In Progress" if dpd < 30 else "Stuck")
+
+# ─── Helpers ─────────────────────────────────────────────────────
+def tiled_frame(rows, path=SOURCE_CSV):
+    base = pd.read_csv(path)
+    reps = -(-rows // len(base))
+    return pd.concat([base] * reps, ignore_index=True).iloc[:rows]
+
+def timed(fn, *args, repeat=1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+# ─── Journey Rules Benchmark ─────────────────────────────────────
+def bench_journey(rows):
+    df = tiled_frame(rows)
+    # contact_channel never contains "Call" in the mock data; inject some so
+    # every rule branch is exercised
+    df.loc[df.index % 7 == 0, "contact_channel"] = "Call"
+
+    t_apply, legacy_journey = timed(lambda d: d.apply(legacy_map_journey, axis=1), df)
+    t_rules, journey = timed(assign_journey, df, repeat=3)
+    t_apply_status, legacy_status = timed(lambda d: d["dpd"].apply(legacy_status_paid), df)
+    t_rules_status, status = timed(assign_status_paid, df, repeat=3)
+
+    assert (legacy_journey.to_numpy() == journey.to_numpy()).all()
+    assert (legacy_status.to_numpy() == status.to_numpy()).all()
+
+    print(f"rows={rows:,}")
+    print(f"journey_type  apply={t_apply:.3f}s  rules={t_rules:.4f}s  speedup={t_apply / t_rules:.0f}x")
+    print(f"status_paid   apply={t_apply_status:.3f}s  rules={t_rules_status:.4f}s  speedup={t_apply_status / t_rules_status:.0f}x")
+    return t_apply / t_rules
+
+# ─── Scaling Suite ───────────────────────────────────────────────
+# Times each stage of the data path on synthetic portfolios (flowen_synth)
+# of increasing size. Page stages run the page's chart builders, i.e. the
+# aggregation plus the figure construction done on a figure-cache miss.
+def page_workloads(df, cube, rankings, series):
+    from flowen_bins import compute_bins
+    from flowen_cube import rollup, total, value_counts
+    from flowen_pages import behavioral_insights, journey_management, recovery_kpi, risk_overview
+    from flowen_recovery import month_to_date
+
+    def risk_overview_page():
+        for build in (risk_overview._segment_figure, risk_overview._loan_type_figure,
+                      risk_overview._age_dpd_figure, risk_overview._risk_recovery_figure,
+                      risk_overview._journey_segment_figure, risk_overview._risk_region_figure,
+                      risk_overview._journey_risk_figure, risk_overview._behavior_risk_figure):
+            build(cube)
+        total(cube, where={"response_behavior": ["Responsive", "Slow"]})
+        rankings["likely_to_pay"].top(df, 5)
+
+    def journey_management_page():
+        journey_management._funnel_figure(cube)
+        journey_management._confidence_figure(compute_bins(df["ai_confidence"], 20))
+        value_counts(cube, "journey_type")
+        rollup(cube, ["journey_type", "status_paid"])
+        rankings["stuck_accounts"].top(df, 5)
+
+    def recovery_kpi_page():
+        month_to_date(series)
+        recovery_kpi._trend_figure(series)
+        recovery_kpi._channel_figure(series)
+        recovery_kpi._risk_segment_figure(series)
+
+    def behavioral_insights_page():
+        behavioral_insights._response_figure(cube)
+        behavioral_insights._avoidance_figure(cube)
+        behavioral_insights._income_figure(compute_bins(df["monthly_income"], 30))
+        behavioral_insights._channel_behavior_figure(cube)
+
+    return {
+        "page_risk_overview": risk_overview_page,
+        "page_journey_management": journey_management_page,
+        "page_recovery_kpi": recovery_kpi_page,
+        "page_behavioral_insights": behavioral_insights_page,
+    }
+
+def bench_size(path):
+    from flowen_cache import build_cache, cache_path, load_portfolio
+    from flowen_cube import build_cube
+    from flowen_ingest import derive_fields
+    from flowen_recovery import build_recovery_series
+    from flowen_schema import apply_schema
+    from flowen_search import AccountIndex
+    from flowen_topk import build_rankings
+
+    stages = {}
+    stages["csv_read"], _ = timed(pd.read_csv, path)
+    if os.path.exists(cache_path(path)):
+        os.remove(cache_path(path))
+    stages["parquet_build"], _ = timed(build_cache, path)
+    stages["parquet_load"], df = timed(load_portfolio, path, repeat=3)
+    stages["derive_fields"], df = timed(lambda d: apply_schema(derive_fields(d.copy())), df, repeat=3)
+    stages["cube_build"], cube = timed(build_cube, df, repeat=3)
+    stages["rankings_build"], rankings = timed(build_rankings, df, repeat=3)
+    stages["recovery_build"], series = timed(build_recovery_series, df, repeat=3)
+    stages["search_index"], _ = timed(AccountIndex, df)
+    for name, workload in page_workloads(df, cube, rankings, series).items():
+        stages[name], _ = timed(workload, repeat=3)
+    return stages
+
+def bench_suite(sizes, seed, data_dir):
+    from flowen_synth import parse_rows, write_portfolio
+
+    os.makedirs(data_dir, exist_ok=True)
+    results = {}
+    for size in sizes:
+        path = os.path.join(data_dir, f"portfolio_{size}_seed{seed}.csv")
+        if not os.path.exists(path):
+            write_portfolio(path, parse_rows(size), seed)
+        results[size] = bench_size(path)
+        print(f"rows={size}")
+        for stage, seconds in results[size].items():
+            print(f"  {stage:<26} {seconds:.4f}s")
+    return {
+        "meta": {
+            "seed": seed,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+# Stages slower than baseline × (1 + tolerance) and by more than
+# `min_delta` seconds (timer noise on millisecond stages); sizes or stages
+# missing from either side are skipped.
+def compare(report, baseline, tolerance, min_delta=0.01):
+    regressions = []
+    for size, stages in report["results"].items():
+        for stage, seconds in stages.items():
+            before = baseline["results"].get(size, {}).get(stage)
+            if before is None:
+                continue
+            ratio = seconds / before if before else float("inf")
+            flag = "  REGRESSION" if ratio > 1 + tolerance and seconds - before > min_delta else ""
+            print(f"{size:>5} {stage:<26} {before:.4f}s -> {seconds:.4f}s  x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append((size, stage))
+    return regressions
+
+# ─── Resident Memory ─────────────────────────────────────────────
+# Deep memory of the account table as the original loader held it (text
+# as Python objects, 64-bit numbers, dates as text, derived columns added
+# on the fly) against the typed table held by PortfolioStore.
+def untyped_frame(path):
+    from flowen_ingest import derive_fields
+
+    df = derive_fields(pd.read_csv(path))
+    return df.astype({c: object for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])})
+
+def bench_memory(path):
+    from flowen_cache import load_portfolio
+    from flowen_ingest import PortfolioStore
+    from flowen_schema import memory_report
+
+    untyped = untyped_frame(path)
+    before = memory_report(untyped)
+    after = memory_report(PortfolioStore(load_portfolio(path)).df)
+    print(f"{'column':<30} {'before':>10} {'after':>14} {'bytes before':>14} {'bytes after':>12}  share")
+    for column, row in after.iterrows():
+        old = before.loc[column] if column in before.index else {"dtype": "-", "bytes": 0}
+        print(f"{column:<30} {old['dtype']:>10} {row['dtype']:>14} {old['bytes']:>14,} {row['bytes']:>12,}  {row['share']:.1f}%")
+    ratio = before["bytes"].sum() / after["bytes"].sum()
+    print(f"rows={len(untyped):,}  before={before['bytes'].sum() / 2**20:.2f}MiB  "
+          f"after={after['bytes'].sum() / 2**20:.2f}MiB  x{ratio:.1f}")
+    return ratio
+
+# ─── Concurrent Sessions ─────────────────────────────────────────
+# Each session's rerun fetches the dataset, cube and recovery series; all
+# results are held, as live sessions hold theirs. Memory grown per session
+# and fetch latency should not depend on how many sessions there are.
+def bench_sessions(path, sessions):
+    import tracemalloc
+
+    import flowen_data
+
+    flowen_data.DATA_PATH = path
+    flowen_data.load_data(), flowen_data.load_cube(), flowen_data.load_recovery()
+    table = flowen_data.get_snapshot().data.memory_usage(deep=True).sum()
+
+    tracemalloc.start()
+    held, latencies = [], []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        held.append((flowen_data.load_data(), flowen_data.load_cube(), flowen_data.load_recovery()))
+        latencies.append(time.perf_counter() - start)
+    grown = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    half = len(latencies) // 2
+    print(f"rows={len(held[0][0]):,}  sessions={sessions}  table={table / 2**20:.1f}MiB")
+    print(f"  memory per session   {grown / sessions / 1024:.1f}KiB")
+    print(f"  fetch latency        first half {statistics.median(latencies[:half]) * 1e3:.3f}ms  "
+          f"second half {statistics.median(latencies[half:]) * 1e3:.3f}ms")
+    return grown / sessions
+
+# ─── Background Refresh ──────────────────────────────────────────
+# A full rebuild (source re-read, derived fields, cube, indexes) runs on
+# the refresher while this thread keeps serving reruns' data fetches; the
+# fetch latency is what a user sees during a reload.
+def bench_refresh(path):
+    import threading
+
+    import flowen_data
+
+    flowen_data.DATA_PATH = path
+    refresher = flowen_data._get_refresher(path, flowen_data.BACKEND)
+    before = refresher.current
+
+    def fetch():
+        return flowen_data.load_data(), flowen_data.load_cube(), flowen_data.load_recovery()
+
+    worker = threading.Thread(target=refresher.refresh, kwargs={"full": True})
+    start = time.perf_counter()
+    worker.start()
+    latencies = []
+    while worker.is_alive():
+        seconds, _ = timed(fetch)
+        latencies.append(seconds)
+        time.sleep(0.01)
+    rebuild = time.perf_counter() - start
+    worker.join()
+
+    swapped = refresher.current is not before
+    print(f"rows={len(refresher.current.data):,}  rebuild={rebuild:.2f}s  swapped={swapped}")
+    print(f"  fetches during rebuild={len(latencies)}  median={statistics.median(latencies) * 1e3:.2f}ms  "
+          f"max={max(latencies) * 1e3:.2f}ms")
+    if not swapped:
+        raise SystemExit(f"refresh failed:\n{refresher.last_error}")
+    return max(latencies)
+
+# ─── Cross-filters ───────────────────────────────────────────────
+# Random sidebar selections resolved through the bitmap index against the
+# same conditions evaluated by a column scan.
+def bench_filters(path, trials, seed):
+    import numpy as np
+
+    from flowen_cache import load_portfolio
+    from flowen_filters import FILTER_DIMENSIONS, BitmapIndex, filter_conditions
+    from flowen_ingest import PortfolioStore
+    from flowen_rules import conditions_mask
+
+    df = PortfolioStore(load_portfolio(path)).df
+    t_build, index = timed(BitmapIndex, df)
+    rng = np.random.default_rng(seed)
+    t_bitmap, t_scan = [], []
+    for _ in range(trials):
+        filters = []
+        for column in FILTER_DIMENSIONS:
+            values = list(index.bitmaps[column])
+            if rng.random() < 0.5:
+                picked = rng.choice(values, size=rng.integers(1, len(values)), replace=False)
+                filters.append((column, tuple(str(v) for v in picked)))
+        if not filters:
+            continue
+        seconds, mask = timed(index.mask, tuple(filters))
+        t_bitmap.append(seconds)
+        seconds, scanned = timed(conditions_mask, df, filter_conditions(filters))
+        t_scan.append(seconds)
+        assert (mask == scanned).all()
+
+    bitmap, scan = statistics.median(t_bitmap), statistics.median(t_scan)
+    print(f"rows={len(df):,}  combinations={len(t_bitmap)}  index build={t_build:.3f}s")
+    print(f"  bitmap  median={bitmap * 1e3:.2f}ms  max={max(t_bitmap) * 1e3:.2f}ms")
+    print(f"  scan    median={scan * 1e3:.2f}ms  max={max(t_scan) * 1e3:.2f}ms  speedup={scan / bitmap:.1f}x")
+    return bitmap
+
+# ─── Delta Batches ───────────────────────────────────────────────
+# Update and append batches alternating against the resident store, each
+# apply timed whole. Updates cost what their rows cost; an append also
+# copies the book once (PortfolioStore._append), so its median is the one
+# the budget is checked against.
+def bench_ingest(path, batch_rows, batches, seed):
+    import numpy as np
+
+    from flowen_cache import load_portfolio
+    from flowen_ingest import PortfolioStore
+
+    store = PortfolioStore(load_portfolio(path))
+    rows = len(store.df)
+    rng = np.random.default_rng(seed)
+    t_update, t_append = [], []
+    for batch in range(batches):
+        picked = rng.choice(len(store.df), size=batch_rows, replace=False)
+        updates = pd.DataFrame({
+            "account_id": store.df["account_id"].to_numpy()[picked],
+            "dpd": rng.integers(0, 90, batch_rows),
+            "risk_level": rng.choice(["Low", "Medium", "High"], batch_rows),
+        })
+        t_update.append(timed(store.apply_batch, updates)[0])
+        appends = store.df.iloc[picked].copy()
+        appends["account_id"] = [f"BENCH{batch:04d}{i:06d}" for i in range(batch_rows)]
+        t_append.append(timed(store.apply_batch, appends)[0])
+
+    update, append = statistics.median(t_update), statistics.median(t_append)
+    print(f"rows={rows:,} -> {len(store.df):,}  batches={batches} x ({batch_rows} updated + {batch_rows} appended)")
+    print(f"  update  median={update * 1e3:.1f}ms  max={max(t_update) * 1e3:.1f}ms")
+    print(f"  append  median={append * 1e3:.1f}ms  max={max(t_append) * 1e3:.1f}ms")
+    return append
+
+# ─── Alert Engine ────────────────────────────────────────────────
+# Random update batches (dpd and risk level) applied to the store; the
+# alert evaluation inside each apply is timed and compared with running
+# the same rules over the whole book.
+def bench_alerts(path, batch_rows, batches, seed):
+    import numpy as np
+
+    from flowen_alerts import ALERT_RULES, _levels, _now
+    from flowen_cache import load_portfolio
+    from flowen_ingest import PortfolioStore
+
+    store = PortfolioStore(load_portfolio(path))
+    evaluate, t_alerts = store.alerts.evaluate, []
+
+    def timed_evaluate(*args, **kwargs):
+        seconds, fired = timed(lambda: evaluate(*args, **kwargs))
+        t_alerts.append(seconds)
+        return fired
+
+    store.alerts.evaluate = timed_evaluate
+    rng = np.random.default_rng(seed)
+    for _ in range(batches):
+        picked = rng.choice(len(store.df), size=batch_rows, replace=False)
+        store.apply_batch(pd.DataFrame({
+            "account_id": store.df["account_id"].to_numpy()[picked],
+            "dpd": rng.integers(0, 90, batch_rows),
+            "risk_level": rng.choice(["Low", "Medium", "High"], batch_rows),
+        }))
+    now = _now()
+    t_scan, _ = timed(lambda: [_levels(spec, store.df, now) for spec in ALERT_RULES.values()], repeat=3)
+
+    alerts = statistics.median(t_alerts)
+    print(f"rows={len(store.df):,}  batches={batches} x {batch_rows} rows  fired={store.alerts.log.total}")
+    print(f"  per batch  median={alerts * 1e3:.2f}ms  max={max(t_alerts) * 1e3:.2f}ms")
+    print(f"  full scan  {t_scan * 1e3:.2f}ms")
+    return alerts
+
+# ─── Recovery Forecast ───────────────────────────────────────────
+# Monte Carlo trials over every account of the book, baseline plus a
+# what-if moving Medium-risk accounts to another journey. Peak memory is
+# what the simulation allocates beyond the account columns it is given.
+def bench_forecast(path, trials, horizon):
+    import tracemalloc
+
+    from flowen_cache import load_portfolio
+    from flowen_forecast import FORECAST_SOURCE, fit_model, simulate
+    from flowen_ingest import PortfolioStore
+
+    store = PortfolioStore(load_portfolio(path))
+    accounts = store.df[FORECAST_SOURCE]
+    model = fit_model(store.cube, store.recovery)
+    reassign = {"where": {"risk_level": "Medium"}, "journey_type": "Hardship Assistance"}
+
+    seconds, result = timed(lambda: simulate(accounts, model, trials, horizon, reassign))
+    # tracing slows the chunk loop severalfold, so memory is measured on a
+    # separate short run: the working set of a chunk does not grow with trials
+    tracemalloc.start()
+    simulate(accounts, model, min(trials, 20), horizon, reassign)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    totals = result["totals"]
+    print(f"accounts={len(accounts):,}  trials={trials}  horizon={horizon}d  scenarios={totals.shape[1]}")
+    print(f"  simulate  {seconds:.2f}s  peak {peak / 2**20:.0f}MiB")
+    for name in totals:
+        error = totals[name].mean() / result["expected"][name] - 1
+        print(f"  {name:<9} mean ฿{totals[name].mean():,.0f}  vs expected {error * 100:+.3f}%")
+    return seconds
+
+# ─── Collector Assignment ────────────────────────────────────────
+# Full assignment of the book to a synthetic roster, then the incremental
+# rebalances: a tenth of the collectors leaving, and update batches.
+def bench_assign(path, collectors, batch_rows, batches, seed):
+    import numpy as np
+
+    from flowen_cache import load_portfolio
+    from flowen_ingest import PortfolioStore
+    from flowen_synth import generate_roster
+
+    store = PortfolioStore(load_portfolio(path))
+    roster = generate_roster(collectors, len(store.df), seed)
+    full, _ = timed(store.set_roster, roster, "full")
+
+    leaving = roster.sample(frac=0.1, random_state=seed)
+    roster_change, _ = timed(store.set_roster, roster.drop(leaving.index).reset_index(drop=True), "change")
+
+    rebalance, t_batches = store._rebalance, []
+
+    def timed_rebalance(positions):
+        seconds, _ = timed(rebalance, positions)
+        t_batches.append(seconds)
+
+    store._rebalance = timed_rebalance
+    rng = np.random.default_rng(seed)
+    for _ in range(batches):
+        picked = rng.choice(len(store.df), size=batch_rows, replace=False)
+        store.apply_batch(pd.DataFrame({
+            "account_id": store.df["account_id"].to_numpy()[picked],
+            "dpd": rng.integers(0, 90, batch_rows),
+            "risk_level": rng.choice(["Low", "Medium", "High"], batch_rows),
+        }))
+
+    assignments = store.assignments
+    held = int((assignments.collector >= 0).sum())
+    print(f"accounts={len(store.df):,}  collectors={collectors}  assigned={held:,}  "
+          f"queued={int((~np.isnan(assignments.weight)).sum()) - held:,}")
+    print(f"  full assignment     {full:.2f}s")
+    print(f"  collectors leaving  {roster_change * 1e3:.1f}ms  ({len(leaving)} of {collectors})")
+    print(f"  per batch           median={statistics.median(t_batches) * 1e3:.2f}ms  ({batch_rows} rows)")
+    return full
+
+# ─── Conversation Tagging ────────────────────────────────────────
+# The full tagging pipeline (read, normalize, match, count per account)
+# over a synthetic log, plus the automaton alone on distinct messages
+# (no repeats to reuse), both in messages per minute.
+def bench_tagging(rows, accounts, workers, seed, data_dir):
+    from flowen_synth import generate_messages, write_messages
+    from flowen_tagging import get_automaton, normalize, tag_logs
+
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"conversations_{rows}_{accounts}_seed{seed}.csv")
+    if not os.path.exists(path):
+        write_messages(path, rows, accounts, seed)
+
+    seconds, (counts, messages) = timed(tag_logs, [path], workers)
+    rate = messages / seconds * 60
+    sample = next(generate_messages(100_000, accounts, seed + 1))["message"].unique()
+    automaton = get_automaton()
+    scan, _ = timed(lambda: [automaton.scan(normalize(m)) for m in sample])
+    print(f"messages={messages:,}  accounts={len(counts):,}  workers={workers or os.cpu_count()}")
+    print(f"  pipeline  {seconds:.2f}s  {rate:,.0f} messages/min")
+    print(f"  automaton {len(sample) / scan * 60:,.0f} distinct messages/min per process")
+    return rate
+
+# ─── Startup Import Budget ───────────────────────────────────────
+# What app.py imports before the first paint. Each run is a fresh
+# interpreter, as after a worker restart; page modules are not included
+# because they are only imported once their page is selected.
+STARTUP_MODULES = ["streamlit", "streamlit_option_menu", "flowen_assets", "flowen_data", "flowen_pages"]
+
+def import_profile():
+    code = "import " + ", ".join(STARTUP_MODULES)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative) / 1e6
+    return modules
+
+def bench_startup(runs):
+    code = "import " + ", ".join(STARTUP_MODULES)
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, stderr=subprocess.DEVNULL)
+        walls.append(time.perf_counter() - start)
+    wall = statistics.median(walls)
+
+    modules = import_profile()
+    print(f"startup imports  median={wall:.3f}s over {runs} runs")
+    for name in STARTUP_MODULES:
+        print(f"  {name:<24} {modules.get(name, 0.0):.3f}s")
+    heavy = [m for m in ("plotly.express", "matplotlib", "PIL.Image") if m in modules]
+    if heavy:
+        print(f"  eagerly imported: {', '.join(heavy)}")
+    return wall
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flowen performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    journey = sub.add_parser("journey", help="row-wise apply vs compiled journey rules")
+    journey.add_argument("--rows", type=int, default=1_000_000)
+    journey.add_argument("--min-speedup", type=float, default=50.0)
+    startup = sub.add_parser("startup", help="import time of the modules loaded before first paint")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--budget", type=float, default=2.0, help="seconds")
+    memory = sub.add_parser("memory", help="resident size of the account table, per column")
+    memory.add_argument("--source", default=SOURCE_CSV)
+    memory.add_argument("--min-ratio", type=float, default=5.0)
+    sessions = sub.add_parser("sessions", help="memory and fetch latency per concurrent session")
+    sessions.add_argument("--source", default=SOURCE_CSV)
+    sessions.add_argument("--sessions", type=int, default=64)
+    sessions.add_argument("--max-kib", type=float, default=256.0, help="memory per session")
+    refresh = sub.add_parser("refresh", help="data fetch latency while the refresher rebuilds everything")
+    refresh.add_argument("--source", default=SOURCE_CSV)
+    refresh.add_argument("--budget-ms", type=float, default=100.0, help="slowest fetch during the rebuild")
+    filters = sub.add_parser("filters", help="sidebar filter resolution, bitmaps vs column scans")
+    filters.add_argument("--source", default=SOURCE_CSV)
+    filters.add_argument("--trials", type=int, default=50)
+    filters.add_argument("--seed", type=int, default=0)
+    filters.add_argument("--budget-ms", type=float, default=20.0, help="median per combination")
+    ingest = sub.add_parser("ingest", help="update and append batches applied to the resident store")
+    ingest.add_argument("--source", default=SOURCE_CSV)
+    ingest.add_argument("--batch-rows", type=int, default=100)
+    ingest.add_argument("--batches", type=int, default=20)
+    ingest.add_argument("--seed", type=int, default=0)
+    ingest.add_argument("--budget-ms", type=float, default=500.0, help="median per append batch")
+    alerts = sub.add_parser("alerts", help="alert rule cost per update batch vs a full-book scan")
+    alerts.add_argument("--source", default=SOURCE_CSV)
+    alerts.add_argument("--batch-rows", type=int, default=100)
+    alerts.add_argument("--batches", type=int, default=50)
+    alerts.add_argument("--seed", type=int, default=0)
+    alerts.add_argument("--budget-ms", type=float, default=20.0, help="median per batch")
+    forecast = sub.add_parser("forecast", help="Monte Carlo recovery forecast over the whole book")
+    forecast.add_argument("--source", default=SOURCE_CSV)
+    forecast.add_argument("--trials", type=int, default=1000)
+    forecast.add_argument("--horizon", type=int, default=30, help="days")
+    forecast.add_argument("--budget", type=float, default=10.0, help="seconds")
+    assign = sub.add_parser("assign", help="collector assignment of the whole book and incremental rebalances")
+    assign.add_argument("--source", default=SOURCE_CSV)
+    assign.add_argument("--collectors", type=int, default=300)
+    assign.add_argument("--batch-rows", type=int, default=100)
+    assign.add_argument("--batches", type=int, default=20)
+    assign.add_argument("--seed", type=int, default=0)
+    assign.add_argument("--budget", type=float, default=5.0, help="seconds for the full assignment")
+    tagging = sub.add_parser("tagging", help="conversation log tagging throughput")
+    tagging.add_argument("--messages", type=int, default=2_000_000)
+    tagging.add_argument("--accounts", type=int, default=5_000)
+    tagging.add_argument("--workers", type=int, default=None, help="default: one per core")
+    tagging.add_argument("--seed", type=int, default=0)
+    tagging.add_argument("--data-dir", default=SYNTH_DIR)
+    tagging.add_argument("--min-rate", type=float, default=1_000_000, help="messages per minute")
+    suite = sub.add_parser("suite", help="data load, derivation and page aggregation at scale")
+    suite.add_argument("--sizes", nargs="+", default=["10k", "100k", "1m"], help="e.g. 10k 100k 1m 10m")
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--data-dir", default=SYNTH_DIR)
+    suite.add_argument("--out", default=RESULTS_PATH)
+    suite.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    suite.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if args.command == "journey":
+        speedup = bench_journey(args.rows)
+        if speedup < args.min_speedup:
+            raise SystemExit(f"speedup {speedup:.0f}x below required {args.min_speedup:.0f}x")
+    elif args.command == "startup":
+        wall = bench_startup(args.runs)
+        if wall > args.budget:
+            raise SystemExit(f"startup imports {wall:.2f}s over budget {args.budget:.2f}s")
+    elif args.command == "memory":
+        ratio = bench_memory(args.source)
+        if ratio < args.min_ratio:
+            raise SystemExit(f"memory reduction x{ratio:.1f} below required x{args.min_ratio:.1f}")
+    elif args.command == "sessions":
+        per_session = bench_sessions(args.source, args.sessions) / 1024
+        if per_session > args.max_kib:
+            raise SystemExit(f"{per_session:.0f}KiB per session, over {args.max_kib:.0f}KiB")
+    elif args.command == "refresh":
+        slowest = bench_refresh(args.source) * 1e3
+        if slowest > args.budget_ms:
+            raise SystemExit(f"slowest fetch {slowest:.1f}ms during the rebuild, over {args.budget_ms:.1f}ms")
+    elif args.command == "filters":
+        median = bench_filters(args.source, args.trials, args.seed) * 1e3
+        if median > args.budget_ms:
+            raise SystemExit(f"filters resolve in {median:.1f}ms, over {args.budget_ms:.1f}ms")
+    elif args.command == "ingest":
+        median = bench_ingest(args.source, args.batch_rows, args.batches, args.seed) * 1e3
+        if median > args.budget_ms:
+            raise SystemExit(f"appends take {median:.1f}ms per batch, over {args.budget_ms:.1f}ms")
+    elif args.command == "alerts":
+        median = bench_alerts(args.source, args.batch_rows, args.batches, args.seed) * 1e3
+        if median > args.budget_ms:
+            raise SystemExit(f"alerts take {median:.1f}ms per batch, over {args.budget_ms:.1f}ms")
+    elif args.command == "forecast":
+        seconds = bench_forecast(args.source, args.trials, args.horizon)
+        if seconds > args.budget:
+            raise SystemExit(f"forecast took {seconds:.1f}s, over {args.budget:.1f}s")
+    elif args.command == "assign":
+        seconds = bench_assign(args.source, args.collectors, args.batch_rows, args.batches, args.seed)
+        if seconds > args.budget:
+            raise SystemExit(f"assignment took {seconds:.1f}s, over {args.budget:.1f}s")
+    elif args.command == "tagging":
+        rate = bench_tagging(args.messages, args.accounts, args.workers, args.seed, args.data_dir)
+        if rate < args.min_rate:
+            raise SystemExit(f"tagging {rate:,.0f} messages/min, below {args.min_rate:,.0f}")
+    elif args.command == "suite":
+        report = bench_suite(args.sizes, args.seed, args.data_dir)
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare(report, json.load(f), args.tolerance)
+            if regressions:
+                raise SystemExit(f"{len(regressions)} stage(s) slower than baseline")
+
+if __name__ == "__main__":
+    main()
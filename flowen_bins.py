@@ -0,0 +1,32 @@
+
+import numpy as np
+import pandas as pd
+
+# ─── Server-side Binning ─────────────────────────────────────────
+# Histograms are binned here with NumPy and only the bins are sent to the
+# browser, so the chart payload is a few dozen bars whatever the number of
+# accounts. `value_range` re-bins a sub-range for drill-down.
+def compute_bins(values, nbins=30, value_range=None):
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if value_range is None:
+        value_range = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+    counts, edges = np.histogram(values, bins=nbins, range=value_range)
+    return pd.DataFrame({"left": edges[:-1], "right": edges[1:], "count": counts})
+
+def histogram_figure(bins, x, title="", color_discrete_sequence=None):
+    # imported here: flowen_data loads this module at startup, before any
+    # page needs plotly
+    import plotly.graph_objects as go
+
+    colors = color_discrete_sequence or [None]
+    fig = go.Figure(go.Bar(
+        x=(bins["left"] + bins["right"]) / 2,
+        y=bins["count"],
+        width=bins["right"] - bins["left"],
+        customdata=bins[["left", "right"]].to_numpy(),
+        hovertemplate="%{customdata[0]:,.2f} – %{customdata[1]:,.2f}<br>count=%{y:,}<extra></extra>",
+        marker_color=colors[0]
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title="count", bargap=0)
+    return fig
@@ -0,0 +1,98 @@
+
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+from flowen_schema import SCHEMA_VERSION, apply_schema
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow not installed → fall back to plain CSV reads
+    pq = None
+
+# ─── Cache Location ──────────────────────────────────────────────
+CACHE_DIR = os.environ.get("FLOWEN_CACHE_DIR", ".flowen_cache")
+HASH_CHUNK = 1 << 20
+
+# Temporary name for a file written and then renamed into place: unique per
+# process and thread, since session threads write the same targets at once
+def temp_path(target):
+    return f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+# ─── Source Fingerprint ──────────────────────────────────────────
+# Hashing a multi-GB CSV is itself slow, so the digest is remembered in a
+# sidecar keyed by (size, mtime) and only recomputed when the file changes.
+def file_digest(path, cache_dir=CACHE_DIR):
+    stat = os.stat(path)
+    stamp = [stat.st_size, stat.st_mtime_ns]
+    sidecar = os.path.join(cache_dir, os.path.basename(path) + ".digest.json")
+    try:
+        with open(sidecar) as f:
+            saved = json.load(f)
+        if saved["stamp"] == stamp:
+            return saved["digest"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()[:16]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    _atomic_write_text(sidecar, json.dumps({"stamp": stamp, "digest": digest}))
+    return digest
+
+def cache_path(path, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{file_digest(path, cache_dir)}-s{SCHEMA_VERSION}.parquet")
+
+# ─── Columnar Conversion ─────────────────────────────────────────
+# The cache holds the typed table (flowen_schema), so categories, narrow
+# numbers and parsed dates come back from Parquet without another pass.
+def build_cache(path, cache_dir=CACHE_DIR):
+    target = cache_path(path, cache_dir)
+    if os.path.exists(target):
+        return target
+    df = apply_schema(pd.read_csv(path))
+    tmp = temp_path(target)
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+    _prune_stale(path, target, cache_dir)
+    return target
+
+def _prune_stale(path, keep, cache_dir):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        if name.startswith(stem + "-") and name.endswith(".parquet") and full != keep:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+def _atomic_write_text(target, text):
+    tmp = temp_path(target)
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, target)
+
+# ─── Public Loader ───────────────────────────────────────────────
+# columns=None loads everything; otherwise only the requested columns are
+# read from disk (unknown names are ignored so pages can ask for optional
+# fields such as journey_type that may or may not be in the source).
+def load_portfolio(path, columns=None, cache_dir=CACHE_DIR):
+    if pq is None:
+        if columns is None:
+            return apply_schema(pd.read_csv(path))
+        return apply_schema(pd.read_csv(path, usecols=lambda c: c in set(columns)))
+
+    target = build_cache(path, cache_dir)
+    if columns is not None:
+        available = pq.read_schema(target).names
+        columns = [c for c in available if c in set(columns)]
+    return pd.read_parquet(target, columns=columns)
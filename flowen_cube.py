@@ -0,0 +1,105 @@
+
+import pandas as pd
+
+from flowen_rules import conditions_mask
+
+# ─── Cube Definition ─────────────────────────────────────────────
+# One row per observed combination of the categorical dimensions, holding
+# the row count plus per-measure sums and non-null counts. Any groupby the
+# dashboard needs over these dimensions is a roll-up of this (small) frame
+# instead of a scan of the full portfolio.
+CUBE_DIMENSIONS = [
+    "risk_level", "region", "loan_type", "response_behavior", "journey_type",
+    "contact_channel", "dpd_bucket", "status_paid", "age_group",
+]
+CUBE_MEASURES = ["dpd", "total_debt", "recovered", "monthly_income", "ai_confidence"]
+
+# Row-level conditions (flowen_rules syntax) that cannot be expressed as a
+# dimension value
+CUBE_FLAGS = {
+    "dpd_positive": {"dpd": (">", 0)},
+    "dpd_over_30": {"dpd": (">", 30)},
+}
+
+AGE_BINS = [0, 25, 35, 45, 100]
+AGE_LABELS = ["<25", "26–35", "36–45", "45+"]
+
+def add_age_group(df):
+    df["age_group"] = pd.cut(df["age"], bins=AGE_BINS, labels=AGE_LABELS)
+    return df
+
+# ─── Build ───────────────────────────────────────────────────────
+# `dims`, `measures` and `flags` default to the dashboard cube; other
+# additive aggregates (flowen_recovery) reuse the same layout.
+def build_cube(df, dims=CUBE_DIMENSIONS, measures=CUBE_MEASURES, flags=CUBE_FLAGS):
+    frame = df.copy(deep=False)
+    if "age_group" in dims and "age_group" not in frame.columns:
+        add_age_group(frame)
+    dims = [d for d in dims if d in frame.columns]
+    measures = [m for m in measures if m in frame.columns]
+    for flag, when in flags.items():
+        frame[flag] = conditions_mask(frame, when).astype("int64")
+
+    aggs = {"count": (dims[0], "size")}
+    for m in measures:
+        aggs[f"sum_{m}"] = (m, "sum")
+        aggs[f"n_{m}"] = (m, "count")
+    for flag in flags:
+        aggs[f"sum_{flag}"] = (flag, "sum")
+
+    # dropna=False keeps accounts with a missing dimension (e.g. no
+    # contact_channel) so grand totals still match len(df)
+    cube = frame.groupby(dims, dropna=False, observed=True).agg(**aggs).reset_index()
+    cube.attrs["dimensions"] = dims
+    return cube
+
+# ─── Roll-ups ────────────────────────────────────────────────────
+# `where` maps dimensions to a value or a list of values; the cube keeps
+# every dimension, so the slice still rolls up like the full cube
+def filter_cube(cube, where):
+    if not where:
+        return cube
+    mask = pd.Series(True, index=cube.index)
+    for column, value in where.items():
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        mask &= cube[column].isin(values)
+    return cube[mask]
+
+# how: "count" → accounts, "sum"/"mean" → of `measure`. Like a plain
+# groupby, combinations with a missing dimension value are dropped.
+def rollup(cube, dims, measure=None, how="count", where=None, name=None):
+    cube = filter_cube(cube, where)
+    if how == "count":
+        columns, name = ["count"], name or "count"
+    else:
+        columns = [f"sum_{measure}", f"n_{measure}"] if how == "mean" else [f"sum_{measure}"]
+        name = name or measure
+
+    grouped = cube.groupby(dims, observed=True)[columns].sum()
+    if how == "mean":
+        result = grouped[f"sum_{measure}"] / grouped[f"n_{measure}"]
+    else:
+        result = grouped[columns[0]]
+    return result.rename(name).reset_index()
+
+def value_counts(cube, dim, where=None):
+    counts = rollup(cube, [dim], where=where)
+    return counts.sort_values("count", ascending=False, kind="stable").reset_index(drop=True)
+
+def total(cube, measure=None, where=None):
+    cube = filter_cube(cube, where)
+    return int(cube["count"].sum()) if measure is None else cube[f"sum_{measure}"].sum()
+
+# ─── Incremental Maintenance ─────────────────────────────────────
+# Cubes are additive: adding (sign=1) or subtracting (sign=-1) the cube of
+# a handful of rows keeps the book's cube current without a rescan.
+def merge_cubes(cube, delta, sign=1):
+    dims = cube.attrs["dimensions"]
+    values = [c for c in cube.columns if c not in dims]
+    delta = delta.copy()
+    delta[values] = delta[values] * sign
+    merged = pd.concat([cube, delta], ignore_index=True)
+    merged = merged.groupby(dims, dropna=False, observed=True)[values].sum().reset_index()
+    merged = merged[merged["count"] > 0].reset_index(drop=True)
+    merged.attrs["dimensions"] = dims
+    return merged
@@ -0,0 +1,368 @@
+
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from flowen_assign import leaderboard, load_roster
+from flowen_bins import compute_bins
+from flowen_cache import CACHE_DIR, file_digest, load_portfolio
+from flowen_cube import filter_cube, value_counts
+from flowen_forecast import FORECAST_SOURCE, fit_model, simulate
+from flowen_filters import FILTER_DIMENSIONS, active_filters, filter_conditions
+from flowen_ingest import PortfolioStore
+from flowen_recovery import RECOVERY_SOURCE, build_recovery_series
+from flowen_refresh import Refresher, Snapshot, pin, pinned
+from flowen_rules import conditions_mask
+from flowen_tagging import TAG_COLUMNS
+
+# ─── Portfolio Source ────────────────────────────────────────────
+DATA_PATH = "flowen_mock_data_5000.csv"
+# Append/update batches (CSV or Parquet, keyed by account_id), picked up by
+# the background refresher
+DELTA_DIR = os.environ.get("FLOWEN_DELTA_DIR", "deltas")
+# Collectors that stuck and high-risk accounts are assigned to
+# (flowen_assign); re-read by the refresher when the file changes
+COLLECTORS_PATH = os.environ.get("FLOWEN_COLLECTORS", "flowen_mock_collectors.csv")
+
+# "memory": the whole book in one resident DataFrame (default).
+# "duckdb": lazy queries over partitioned Parquet (flowen_ooc), for books
+# larger than RAM. FLOWEN_DATASET_DIR points at an existing partitioned
+# dataset; otherwise one is written from DATA_PATH.
+BACKEND = os.environ.get("FLOWEN_BACKEND", "memory")
+DATASET_DIR = os.environ.get("FLOWEN_DATASET_DIR")
+
+def out_of_core():
+    return BACKEND == "duckdb"
+
+# ─── Snapshots ───────────────────────────────────────────────────
+# The data every rerun reads is a published snapshot (flowen_refresh): a
+# background thread picks up a changed source, delta batches or a rewritten
+# dataset and builds the next one, indexes included, off the request path.
+def _build_snapshot(previous):
+    if out_of_core():
+        return _build_portfolio_snapshot(previous)
+    return _build_store_snapshot(previous)
+
+# In memory: the resident store is built once per source file; delta
+# batches are merged into it in place, checked for alerts and rebalanced
+# across collectors as they land. A changed roster rebalances too.
+def _build_store_snapshot(previous):
+    digest = file_digest(DATA_PATH)
+    store = previous.source if previous is not None and previous.version.startswith(digest + ".") else None
+    if store is None:
+        store = PortfolioStore(load_portfolio(DATA_PATH), alert_log=previous.alerts if previous is not None else None)
+    roster = file_digest(COLLECTORS_PATH) if os.path.exists(COLLECTORS_PATH) else None
+    store.set_roster(load_roster(COLLECTORS_PATH) if roster else None, roster)
+    store.ingest_directory(DELTA_DIR)
+    store.check_alerts()
+    version = f"{digest}.{store.version}.{roster}"
+    if previous is not None and previous.version == version:
+        return None
+    # The store writes later batches into its frame in place; the snapshot
+    # keeps the columns of its version because copy-on-write detaches
+    # them first. Cubes and the account index are replaced, not modified,
+    # by the store; rankings and bitmaps replace their arrays, so shallow
+    # copies of them keep this version without copying any data.
+    df = store.df.copy(deep=False)
+    return Snapshot(
+        version, df, store.cube, store.recovery, source=store,
+        rankings={name: copy.copy(ranking) for name, ranking in store.rankings.items()},
+        accounts=store.account_index(),
+        bitmaps=copy.copy(store.filter_index()),
+        alerts=store.alerts.log,
+        assignment=store.assignments.frozen() if store.assignments is not None else None,
+    )
+
+# Out of core: keyed by the dataset's file listing; new or rewritten
+# partition files give a new portfolio (and a new data version).
+def _build_portfolio_snapshot(previous):
+    from flowen_ooc import OutOfCorePortfolio, dataset_digest, write_dataset
+
+    directory = DATASET_DIR
+    if directory is None:
+        stem = os.path.splitext(os.path.basename(DATA_PATH))[0]
+        directory = os.path.join(CACHE_DIR, f"{stem}-{file_digest(DATA_PATH)}.dataset")
+        if not os.path.isdir(directory):
+            write_dataset(DATA_PATH, directory)
+    version = f"ooc.{dataset_digest(directory)}"
+    if previous is not None and previous.version == version:
+        return None
+    portfolio = OutOfCorePortfolio(directory)
+    return Snapshot(version, portfolio, portfolio.cube(), portfolio.recovery_series(), source=portfolio)
+
+@st.cache_resource
+def _get_refresher(path, backend):
+    return Refresher(_build_snapshot)
+
+# Called once at the start of a rerun: every loader below then reads the
+# same snapshot until the rerun ends.
+def pin_snapshot():
+    return pin(_get_refresher(DATA_PATH, BACKEND))
+
+def get_snapshot():
+    return pinned(_get_refresher(DATA_PATH, BACKEND))
+
+# Source digest plus the number of batches merged since: every cached
+# artefact derived from the portfolio is keyed by it.
+def data_version():
+    return get_snapshot().version
+
+# The data version plus the session's sidebar filters: the key for
+# anything built from a filtered view (figures, table orderings).
+def view_version():
+    filters = active_filters()
+    if not filters:
+        return data_version()
+    return data_version() + "|" + ";".join(f"{column}={','.join(values)}" for column, values in filters)
+
+# ─── Load Data ───────────────────────────────────────────────────
+# One dataset shared by every page of the dashboard. Out of core this is
+# the OutOfCorePortfolio handle rather than a DataFrame; pages read rows
+# through the helpers below, which work with either.
+#
+# In memory, every caller gets a shallow copy of the snapshot's table:
+# with copy-on-write it shares the snapshot's buffers, and anything a page
+# adds or overwrites lands in the caller's copy only. Sessions cost
+# neither a copy nor an unpickle per rerun, and cannot change what other
+# sessions see.
+def load_data():
+    snapshot = get_snapshot()
+    if out_of_core():
+        return snapshot.data
+    return snapshot.data.copy(deep=False)
+
+# ─── Aggregate Cube ──────────────────────────────────────────────
+# Maintained incrementally by the store as batches arrive. The sidebar
+# filters are cube dimensions, so a filtered cube is a slice of the full
+# one, cached per version and filter.
+def load_cube():
+    snapshot = get_snapshot()
+    filters = active_filters()
+    if not filters:
+        return snapshot.cube.copy(deep=False)
+    return _load_cube(snapshot.version, filters, snapshot).copy(deep=False)
+
+@st.cache_resource(max_entries=16)
+def _load_cube(version, filters, _snapshot):
+    return filter_cube(_snapshot.cube, dict(filters))
+
+# ─── Recovery Series ─────────────────────────────────────────────
+# Day-bucketed payment aggregates (flowen_recovery), also kept current by
+# the store. Filtered series are built from the rows in the filter.
+def load_recovery():
+    snapshot = get_snapshot()
+    filters = active_filters()
+    if not filters:
+        return snapshot.recovery.copy(deep=False)
+    return _load_recovery(snapshot.version, filters, snapshot).copy(deep=False)
+
+@st.cache_resource(max_entries=16)
+def _load_recovery(version, filters, _snapshot):
+    if out_of_core():
+        return _snapshot.data.recovery_series(filter_conditions(filters))
+    return build_recovery_series(_snapshot.data.loc[filter_mask(filters, _snapshot), RECOVERY_SOURCE])
+
+# ─── Recovery Forecast ───────────────────────────────────────────
+# The model is fitted once per version on the whole book's cube and
+# recovery series; simulations run over the accounts within the sidebar
+# filters and are cached per version, filter and scenario. `reassign` is
+# flowen_forecast's what-if ({"where": ..., "journey_type": ...}).
+def load_forecast_model():
+    snapshot = get_snapshot()
+    return _load_forecast_model(snapshot.version, snapshot)
+
+@st.cache_resource(max_entries=4)
+def _load_forecast_model(version, _snapshot):
+    return fit_model(_snapshot.cube, _snapshot.recovery)
+
+# None when no account is within the filters
+def load_forecast(trials, horizon, reassign=None, seed=0):
+    snapshot = get_snapshot()
+    return _load_forecast(snapshot.version, active_filters(), trials, horizon, reassign, seed, snapshot)
+
+@st.cache_data(max_entries=8)
+def _load_forecast(version, filters, trials, horizon, reassign, seed, _snapshot):
+    total, chunks = export_rows(FORECAST_SOURCE, snapshot=_snapshot, filters=filters, chunk_rows=1_000_000)
+    if not total:
+        return None
+    accounts = pd.concat(chunks, ignore_index=True)
+    model = _load_forecast_model(version, _snapshot)
+    return simulate(accounts, model, trials, horizon, reassign, seed)
+
+# ─── Sidebar Filters ─────────────────────────────────────────────
+# Values offered per filter dimension, from the unfiltered cube
+def filter_options():
+    cube = get_snapshot().cube
+    return {
+        column: sorted(value_counts(cube, column)[column].astype(str))
+        for column in FILTER_DIMENSIONS if column in cube.columns
+    }
+
+# Row mask of the resident table for `filters` (None: no filter), from the
+# snapshot's bitmap index
+def filter_mask(filters=None, snapshot=None):
+    filters = active_filters() if filters is None else filters
+    if not filters:
+        return None
+    snapshot = get_snapshot() if snapshot is None else snapshot
+    return _filter_mask(snapshot.version, filters, snapshot)
+
+@st.cache_resource(max_entries=16)
+def _filter_mask(version, filters, _snapshot):
+    return _snapshot.bitmaps.mask(filters)
+
+# The active filter in the backend's own form, for helpers that take one
+# (flowen_table.paged_table): a row mask in memory, conditions out of core
+def filter_rows():
+    if out_of_core():
+        return filter_conditions(active_filters()) or None
+    return filter_mask()
+
+# ─── Account Search ──────────────────────────────────────────────
+# Lookups by account are deliberately not filtered: the profile viewer
+# finds any account in the book.
+# account_id and name of up to `limit` typeahead matches
+def search_accounts(query, limit=20):
+    snapshot = get_snapshot()
+    if out_of_core():
+        return snapshot.data.search(query, limit)
+    positions = snapshot.accounts.search(query, limit)
+    return snapshot.data.iloc[positions][["account_id", "name"]]
+
+def load_account(account_id):
+    snapshot = get_snapshot()
+    if out_of_core():
+        return snapshot.data.account(account_id)
+    position = snapshot.accounts.position(account_id)
+    return None if position is None else snapshot.data.iloc[position]
+
+# ─── Row Selections ──────────────────────────────────────────────
+# `where` uses the flowen_rules condition syntax. Both helpers stay
+# within the sidebar filters.
+def select_accounts(where, columns, limit):
+    snapshot = get_snapshot()
+    if out_of_core():
+        return snapshot.data.select(where, columns, limit, filter_conditions(active_filters()))
+    df = snapshot.data
+    mask = conditions_mask(df, where)
+    rows = filter_mask(snapshot=snapshot)
+    if rows is not None:
+        mask &= rows
+    return df[mask][columns].head(limit)
+
+def sample_accounts(columns, n):
+    snapshot = get_snapshot()
+    if out_of_core():
+        return snapshot.data.sample(columns, n, filter_conditions(active_filters()))
+    df = snapshot.data
+    rows = filter_mask(snapshot=snapshot)
+    if rows is not None:
+        df = df[rows]
+    return df.sample(min(n, len(df)))[columns]
+
+# ─── Histogram Bins ──────────────────────────────────────────────
+# Counts per bin for a numeric column; `value_range` re-bins a sub-range
+# (drill-down). Pages chart these instead of the raw column.
+def load_bins(column, nbins=30, value_range=None):
+    snapshot = get_snapshot()
+    return _load_bins(snapshot.version, active_filters(), column, nbins, value_range, snapshot)
+
+@st.cache_data(max_entries=32)
+def _load_bins(version, filters, column, nbins, value_range, _snapshot):
+    if out_of_core():
+        return _snapshot.data.bins(column, nbins, value_range, filter_conditions(filters))
+    values = _snapshot.data[column]
+    if filters:
+        values = values[filter_mask(filters, _snapshot)]
+    return compute_bins(values, nbins, value_range)
+
+# ─── Rankings ────────────────────────────────────────────────────
+# First k rows of a ranking from flowen_topk.RANKINGS, best first. A
+# narrow filter can leave fewer than k of the index's kept rows and send
+# TopK.top to the masked rows, so positions are cached per version and
+# filter like the masks themselves.
+def top_accounts(name, k):
+    snapshot = get_snapshot()
+    if out_of_core():
+        return snapshot.data.top(name, k, filter_conditions(active_filters()))
+    return snapshot.data.iloc[_top_positions(snapshot.version, name, k, active_filters(), snapshot)]
+
+@st.cache_resource(max_entries=16)
+def _top_positions(version, name, k, filters, _snapshot):
+    return _snapshot.rankings[name].top(_snapshot.data, k, filter_mask(filters, _snapshot))
+
+# ─── Conversation Tags ───────────────────────────────────────────
+# Tagged messages and tagged accounts per column of flowen_tagging's
+# TAG_COLUMNS within the sidebar filters; None until a tag batch has been
+# merged into the book.
+def load_tag_totals():
+    snapshot = get_snapshot()
+    return _load_tag_totals(snapshot.version, active_filters(), snapshot)
+
+@st.cache_data(max_entries=16)
+def _load_tag_totals(version, filters, _snapshot):
+    columns = list(TAG_COLUMNS.values())
+    if not set(columns) <= set(_snapshot.data.columns):
+        return None
+    if out_of_core():
+        return _snapshot.data.totals(columns, filter_conditions(filters))
+    counts = _snapshot.data[columns]
+    if filters:
+        counts = counts[filter_mask(filters, _snapshot)]
+    return pd.DataFrame({"messages": counts.sum(), "accounts": (counts > 0).sum()})
+
+# ─── Alerts ──────────────────────────────────────────────────────
+# The log of alerts fired on incoming batches (flowen_alerts); None out of
+# core, where batches are not applied. The log is shared across snapshots,
+# so a pinned rerun still sees alerts fired after it started.
+def alert_log():
+    return get_snapshot().alerts
+
+# ─── Collector Assignment ────────────────────────────────────────
+# Leaderboard of the collectors' assigned accounts within the sidebar
+# filters (flowen_assign); None without a roster, or out of core, where
+# batches are not applied and nothing is assigned.
+def load_leaderboard():
+    snapshot = get_snapshot()
+    if snapshot.assignment is None:
+        return None
+    return _load_leaderboard(snapshot.version, active_filters(), snapshot)
+
+@st.cache_data(max_entries=8)
+def _load_leaderboard(version, filters, _snapshot):
+    mask = filter_mask(filters, _snapshot)
+    rows = None if mask is None else np.flatnonzero(mask)
+    return leaderboard(_snapshot.assignment, _snapshot.data, _load_forecast_model(version, _snapshot), rows)
+
+# ─── Export Rows ─────────────────────────────────────────────────
+# Row count plus an iterator of DataFrame chunks of `columns` for
+# `where` within the sidebar filters, optionally sorted by (column,
+# ascending). Background exports pass the snapshot and filters of the
+# rerun that started them, and see that version however long they run.
+def export_rows(columns, where=None, sort=None, chunk_rows=10_000, snapshot=None, filters=None):
+    snapshot = get_snapshot() if snapshot is None else snapshot
+    filters = active_filters() if filters is None else filters
+    if out_of_core():
+        portfolio = snapshot.data
+        conditions = filter_conditions(filters)
+        total = portfolio.count(where, conditions)
+        batches = portfolio.stream(columns, where, chunk_rows, conditions, sort)
+        return total, (batch.to_pandas() for batch in batches)
+
+    df = snapshot.data
+    mask = conditions_mask(df, where or {})
+    rows = filter_mask(filters, snapshot)
+    if rows is not None:
+        mask &= rows
+    positions = np.flatnonzero(mask)
+    if sort is not None:
+        column, ascending = sort
+        values = df[column].iloc[positions].reset_index(drop=True)
+        positions = positions[values.sort_values(ascending=ascending, kind="stable", na_position="last").index]
+    table = df[columns]
+    return len(positions), (
+        table.iloc[positions[start:start + chunk_rows]] for start in range(0, len(positions), chunk_rows)
+    )
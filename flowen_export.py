@@ -0,0 +1,326 @@
+
+import csv
+import functools
+import os
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from flowen_cache import CACHE_DIR
+from flowen_data import export_rows, get_snapshot
+from flowen_filters import active_filters
+
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+# Finished files, and the jobs that list them, are kept this long for the
+# download button
+EXPORT_TTL = 24 * 3600
+
+# ─── Cell Formatting ─────────────────────────────────────────────
+# Values as written to every format: blanks for missing, dates as days,
+# floats with the table's two decimals.
+def _cells(chunk):
+    columns = []
+    for name in chunk.columns:
+        values = chunk[name]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime("%Y-%m-%d")
+        elif pd.api.types.is_float_dtype(values):
+            values = values.astype("float64").round(2)
+        columns.append(values.astype(object).where(values.notna(), None).tolist())
+    return zip(*columns)
+
+# ─── Writers ─────────────────────────────────────────────────────
+# Each writer takes the header once and then chunks of rows; nothing but
+# the current chunk is held in memory.
+class CsvWriter:
+    suffix = ".csv"
+
+    def __init__(self, path, labels, title):
+        self.file = open(path, "w", newline="", encoding="utf-8-sig")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(labels)
+
+    def write(self, chunk):
+        self.writer.writerows(_cells(chunk))
+
+    def close(self):
+        self.file.close()
+
+# xlsxwriter's constant_memory mode flushes every row to disk as soon as
+# the next one starts. Sheets roll over at Excel's row limit.
+class ExcelWriter:
+    suffix = ".xlsx"
+    MAX_ROWS = 1_048_575
+
+    def __init__(self, path, labels, title):
+        try:
+            import xlsxwriter
+        except ImportError:  # optional dependency
+            raise RuntimeError("Excel export needs xlsxwriter (pip install xlsxwriter)")
+        self.book = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.header = self.book.add_format({"bold": True, "bg_color": "#0B2A5B", "font_color": "white"})
+        self.labels = labels
+        self.title = title[:28]
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheets += 1
+        self.sheet = self.book.add_worksheet(self.title if self.sheets == 1 else f"{self.title} {self.sheets}")
+        self.sheet.write_row(0, 0, self.labels, self.header)
+        self.sheet.freeze_panes(1, 0)
+        self.row = 1
+
+    def write(self, chunk):
+        for cells in _cells(chunk):
+            if self.row > self.MAX_ROWS:
+                self._new_sheet()
+            self.sheet.write_row(self.row, 0, cells)
+            self.row += 1
+
+    def close(self):
+        self.book.close()
+
+# Minimal PDF writer: landscape A4 pages of fixed-height rows in the base
+# Helvetica fonts, each page flushed to the file as soon as it is full.
+# Only the byte offsets of the written objects are kept for the xref.
+class PdfWriter:
+    suffix = ".pdf"
+    WIDTH, HEIGHT, MARGIN = 842, 595, 36
+    FONT_SIZE, ROW_HEIGHT = 7, 11
+    # The base fonts only cover cp1252; characters outside it with a usual
+    # spelled-out form get that instead of "?"
+    SUBSTITUTES = {"฿": "THB"}
+
+    def __init__(self, path, labels, title):
+        self.file = open(path, "wb")
+        self.labels = labels
+        self.title = title
+        self.offsets = {}
+        self.pages = []
+        self.rows = []
+        self.widths = None
+        self.next_id = 5  # 1 catalog, 2 page tree, 3–4 fonts
+        self.per_page = int((self.HEIGHT - 2 * self.MARGIN - 3 * self.ROW_HEIGHT) // self.ROW_HEIGHT)
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        for number, font in ((3, b"Helvetica"), (4, b"Helvetica-Bold")):
+            self._object(number, b"<< /Type /Font /Subtype /Type1 /BaseFont /" + font + b" /Encoding /WinAnsiEncoding >>")
+
+    def _object(self, number, body):
+        self.offsets[number] = self.file.tell()
+        self.file.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def _allocate(self):
+        self.next_id += 1
+        return self.next_id - 1
+
+    # Column widths follow the label and first rows' text lengths
+    def _layout(self, rows):
+        lengths = [len(label) for label in self.labels]
+        for cells in rows[:200]:
+            lengths = [max(n, len(str(c))) for n, c in zip(lengths, cells)]
+        lengths = [min(n, 40) + 2 for n in lengths]
+        scale = (self.WIDTH - 2 * self.MARGIN) / sum(lengths)
+        self.widths = [n * scale for n in lengths]
+
+    def _text(self, value, width):
+        text = "" if value is None else str(value)
+        for char, spelled in self.SUBSTITUTES.items():
+            text = text.replace(char, spelled)
+        fits = max(int(width / (self.FONT_SIZE * 0.5)), 1)
+        if len(text) > fits:
+            text = text[:fits - 1] + "…"
+        data = text.encode("cp1252", errors="replace")
+        return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def _line(self, cells, y, font):
+        out, x = [], self.MARGIN
+        for value, width in zip(cells, self.widths):
+            out.append(b"BT /%s %d Tf %.1f %.1f Td (%s) Tj ET" % (font, self.FONT_SIZE, x, y, self._text(value, width)))
+            x += width
+        return b"\n".join(out)
+
+    def _flush_page(self):
+        top = self.HEIGHT - self.MARGIN
+        parts = [
+            b"BT /F2 10 Tf %d %d Td (%s) Tj ET" % (self.MARGIN, top, self._text(self.title, 400)),
+            b"BT /F1 7 Tf %d %d Td (Page %d) Tj ET" % (self.WIDTH - self.MARGIN - 40, top, len(self.pages) + 1),
+            self._line(self.labels, top - 2 * self.ROW_HEIGHT, b"F2"),
+            b"0.6 G %d %.1f m %d %.1f l S" % (
+                self.MARGIN, top - 2.4 * self.ROW_HEIGHT, self.WIDTH - self.MARGIN, top - 2.4 * self.ROW_HEIGHT
+            ),
+        ]
+        for i, cells in enumerate(self.rows):
+            parts.append(self._line(cells, top - (3 + i) * self.ROW_HEIGHT, b"F1"))
+        stream = zlib.compress(b"\n".join(parts))
+        content, page = self._allocate(), self._allocate()
+        self._object(content, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        self._object(page, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>" % (self.WIDTH, self.HEIGHT, content)
+        ))
+        self.pages.append(page)
+        self.rows = []
+
+    def write(self, chunk):
+        rows = list(_cells(chunk))
+        if self.widths is None:
+            self._layout(rows)
+        for cells in rows:
+            self.rows.append(cells)
+            if len(self.rows) == self.per_page:
+                self._flush_page()
+
+    def close(self):
+        if self.widths is None:
+            self._layout([])
+        if self.rows or not self.pages:
+            self._flush_page()
+        kids = b" ".join(b"%d 0 R" % page for page in self.pages)
+        self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.pages)))
+        xref = self.file.tell()
+        size = self.next_id
+        self.file.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for number in range(1, size):
+            self.file.write(b"%010d 00000 n \n" % self.offsets[number])
+        self.file.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+        self.file.close()
+
+WRITERS = {"csv": CsvWriter, "xlsx": ExcelWriter, "pdf": PdfWriter}
+FORMAT_LABELS = {"csv": "CSV", "xlsx": "Excel", "pdf": "PDF"}
+
+# ─── Background Jobs ─────────────────────────────────────────────
+# Exports run on a small process-wide pool, off the rerun: selecting,
+# sorting and writing the rows all happen on the pool. A job records its
+# progress in rows (total is None until the rows are selected); the file
+# is written under a temporary name and renamed when complete, so a
+# listed file is always whole.
+class ExportJob:
+    def __init__(self, name, fmt):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.fmt = fmt
+        self.total = None
+        self.rows = 0
+        self.status = "running"
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(EXPORT_DIR, f"{name}-{stamp}-{self.id}{WRITERS[fmt].suffix}")
+
+    @property
+    def progress(self):
+        if self.total is None:
+            return 0.0
+        return self.rows / self.total if self.total else 1.0
+
+class ExportJobs:
+    def __init__(self, workers=2):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flowen-export")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    # The snapshot and filters are taken from the calling rerun
+    def submit(self, name, fmt, columns, title, where=None, sort=None):
+        job = ExportJob(name, fmt)
+        with self.lock:
+            self._evict()
+            self.jobs[job.id] = job
+        snapshot, filters = get_snapshot(), active_filters()
+        rows = lambda: export_rows(list(columns), where, sort, snapshot=snapshot, filters=filters)
+        self.pool.submit(self._run, job, rows, list(columns.values()), title)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    # Finished jobs go once their file is due for _prune
+    def _evict(self, ttl=EXPORT_TTL):
+        cutoff = time.time() - ttl
+        for job_id in [i for i, job in self.jobs.items() if job.finished is not None and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def _run(self, job, rows, labels, title):
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        _prune(EXPORT_DIR)
+        tmp = job.path + ".tmp"
+        try:
+            job.total, chunks = rows()
+            writer = WRITERS[job.fmt](tmp, labels, title)
+            try:
+                for chunk in chunks:
+                    writer.write(chunk)
+                    job.rows += len(chunk)
+            finally:
+                writer.close()
+            os.replace(tmp, job.path)
+            job.status = "done"
+        except Exception as exc:
+            job.status, job.error = "failed", str(exc)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        job.finished = time.time()
+
+def _prune(directory, ttl=EXPORT_TTL):
+    cutoff = time.time() - ttl
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+@st.cache_resource
+def export_jobs():
+    return ExportJobs()
+
+# ─── Page Widget ─────────────────────────────────────────────────
+# Format picker and Export button for a table. `columns` maps source
+# columns to header labels; `where` and `sort` select and order the rows
+# (flowen_rules syntax, (column, ascending)). The sidebar filters apply.
+def export_panel(name, title, columns, where=None, sort=None):
+    ctrl_fmt, ctrl_run = st.columns([2, 1])
+    fmt = ctrl_fmt.selectbox(
+        "Export format", list(WRITERS), format_func=FORMAT_LABELS.get, key=f"{name}_export_format"
+    )
+    if ctrl_run.button("Export", key=f"{name}_export"):
+        job = export_jobs().submit(name, fmt, columns, title, where, sort)
+        st.session_state[f"{name}_export_job"] = job.id
+
+    job = export_jobs().get(st.session_state.get(f"{name}_export_job"))
+    if job is None:
+        return
+    if job.status == "running":
+        _export_progress(job)
+    elif job.status == "failed":
+        st.error(f"Export failed: {job.error}")
+    elif os.path.exists(job.path):
+        # read only when the button is clicked, not on every rerun
+        st.download_button(
+            f"Download {FORMAT_LABELS[job.fmt]} ({job.total:,} rows)", functools.partial(_read, job.path),
+            file_name=os.path.basename(job.path), key=f"{name}_export_download"
+        )
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+# Re-runs on its own every second while the job runs, then hands back to
+# a full rerun so the download button appears
+@st.fragment(run_every=1.0)
+def _export_progress(job):
+    if job.status != "running":
+        st.rerun()
+    if job.total is None:
+        st.progress(0.0, text="Selecting rows…")
+    else:
+        st.progress(job.progress, text=f"Exporting {job.rows:,} of {job.total:,} rows…")
@@ -0,0 +1,102 @@
+
+import functools
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+from flowen_data import view_version
+from flowen_metrics import section
+
+# ─── Figure Size ─────────────────────────────────────────────────
+# The JSON size of a figure, estimated without serialising it: the chart
+# is serialised when it is rendered, and doing it once more per miss only
+# to weigh the entry cost as much as the build. Numeric arrays are written
+# as base64, 4/3 of their bytes; other values are about as long as their
+# text. Layout and the default template add about 4 KB, taken as fixed.
+LAYOUT_BYTES = 4 * 2**10
+
+def _json_size(value):
+    if isinstance(value, dict):
+        return sum(len(key) + 4 + _json_size(item) for key, item in value.items())
+    if isinstance(value, np.ndarray) and value.dtype.kind in "biuf":
+        return value.nbytes * 4 // 3 + 32
+    if isinstance(value, (list, tuple, np.ndarray)):
+        # long label arrays are sized from their head
+        head = [_json_size(item) + 1 for item in value[:64]]
+        return sum(head) * len(value) // max(len(head), 1) + 2
+    return len(str(value)) + 2
+
+def figure_size(figure):
+    return LAYOUT_BYTES + sum(_json_size(trace.to_plotly_json()) for trace in figure.data)
+
+# ─── Figure Cache ────────────────────────────────────────────────
+# Built Plotly figures keyed by (chart id, data version, parameters), shared
+# by all sessions of the process. Entries are evicted least-recently-used
+# once either the entry count or their (estimated) JSON size passes its cap.
+# A rerun caused by an unrelated widget finds the figure here and skips
+# both the aggregation and the (slow) plotly.express construction.
+class FigureCache:
+    def __init__(self, max_bytes=64 * 2**20, max_entries=512):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, chart_id, version, params, build):
+        key = (chart_id, version, json.dumps(params, sort_keys=True, default=str))
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+
+        # misses only: a slow section with no figure:* entry is slow elsewhere
+        with section(f"figure:{chart_id}"):
+            figure = build()
+        size = figure_size(figure)
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (figure, size)
+                self.bytes += size
+            while self.entries and (self.bytes > self.max_bytes or len(self.entries) > self.max_entries):
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+        return figure
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
+@st.cache_resource
+def figure_cache():
+    return FigureCache()
+
+# ─── Page Helper ─────────────────────────────────────────────────
+# `build` is only called on a miss, so it should do the aggregation as
+# well as the figure construction. The default version follows the
+# sidebar filters as well as the data.
+def cached_figure(chart_id, build, params=None, version=None):
+    if version is None:
+        version = view_version()
+    return figure_cache().get(chart_id, version, params, build)
+
+# ─── Wrapper Decorator ───────────────────────────────────────────
+# Adds an optional cache_key=(chart_id, version) argument to a chart
+# wrapper. The data frame itself is not hashed: the version stands for
+# it, and the remaining keyword arguments become the cache parameters.
+def memoize_figure(wrapper):
+    @functools.wraps(wrapper)
+    def memoized(data, *args, cache_key=None, **kwargs):
+        if cache_key is None:
+            return wrapper(data, *args, **kwargs)
+        chart_id, version = cache_key
+        return figure_cache().get(
+            chart_id, version, {"args": args, **kwargs}, lambda: wrapper(data, *args, **kwargs)
+        )
+    return memoized
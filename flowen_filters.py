@@ -0,0 +1,121 @@
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ─── Filter Dimensions ───────────────────────────────────────────
+# Sidebar cross-filters applied to every page. All of them are cube
+# dimensions (flowen_cube), so aggregate views are sliced on the cube and
+# only row-level views (rankings, bins, tables) go through the bitmaps.
+FILTER_DIMENSIONS = ["region", "loan_type", "risk_level", "dpd_bucket", "journey_type"]
+FILTER_LABELS = {
+    "region": "Region",
+    "loan_type": "Loan Type",
+    "risk_level": "Risk Level",
+    "dpd_bucket": "DPD Bucket",
+    "journey_type": "Journey Type",
+}
+
+# ─── Bitmap Index ────────────────────────────────────────────────
+# One packed bitset (1 bit per row) per value of each filter dimension.
+# A filter combination is an OR of the selected values within a dimension
+# and an AND across dimensions: word-wise operations over n/8 bytes
+# instead of a scan of the columns.
+#
+# `update` follows changed and appended rows without a rebuild. It never
+# writes into a bitmap in place: the ones whose bits change are replaced
+# by modified copies, in new dicts, so a shallow copy of the index (what a
+# snapshot keeps) is unaffected by later updates.
+class BitmapIndex:
+    def __init__(self, df, dimensions=FILTER_DIMENSIONS):
+        self.rows = len(df)
+        self.bitmaps = {}
+        for column in dimensions:
+            if column not in df.columns:
+                continue
+            self.bitmaps[column] = self._build(df[column])
+
+    @staticmethod
+    def _build(values):
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("category")
+        codes = values.cat.codes.to_numpy()
+        return {label: np.packbits(codes == code) for code, label in enumerate(values.cat.categories)}
+
+    # `positions` of rows (re)written to `df`; rows past the end are new.
+    # Packed bits are zero-padded, so growing a bitmap is appending zero
+    # bytes; then only the bits of `positions` that differ are flipped.
+    def update(self, df, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        grow = -(-len(df) // 8) - -(-self.rows // 8)
+        byte = positions >> 3
+        bit = (np.uint8(1) << (7 - (positions & 7)).astype(np.uint8)).astype(np.uint8)
+        updated = {}
+        for column, bitmaps in self.bitmaps.items():
+            labels = df[column].iloc[positions].astype(object).to_numpy()
+            updated[column] = dict(bitmaps)
+            for label in list(bitmaps) + [v for v in pd.unique(labels) if not pd.isna(v) and v not in bitmaps]:
+                bitmap = bitmaps.get(label)
+                if bitmap is None:
+                    bitmap = np.zeros(-(-self.rows // 8), dtype=np.uint8)
+                if grow:
+                    bitmap = np.concatenate([bitmap, np.zeros(grow, dtype=np.uint8)])
+                flip = ((bitmap[byte] & bit) > 0) != (labels == label)
+                if not grow:
+                    if not flip.any():
+                        continue
+                    bitmap = bitmap.copy()
+                np.bitwise_xor.at(bitmap, byte[flip], bit[flip])
+                updated[column][label] = bitmap
+        self.bitmaps = updated
+        self.rows = len(df)
+        return self
+
+    # `filters` is a sequence of (dimension, values) pairs; None means
+    # every row (no filter)
+    def resolve(self, filters):
+        bits = None
+        for column, values in filters:
+            either = np.zeros(-(-self.rows // 8), dtype=np.uint8)
+            for value in values:
+                bitmap = self.bitmaps[column].get(value)
+                if bitmap is not None:
+                    either |= bitmap
+            bits = either if bits is None else bits & either
+        return bits
+
+    def mask(self, filters):
+        bits = self.resolve(filters)
+        if bits is None:
+            return np.ones(self.rows, dtype=bool)
+        return np.unpackbits(bits, count=self.rows).view(bool)
+
+# ─── Active Filters ──────────────────────────────────────────────
+# The session's selection as a tuple of (dimension, values) pairs, so it
+# can key caches; empty when nothing is selected.
+def active_filters():
+    return tuple(
+        (column, tuple(st.session_state[f"filter_{column}"]))
+        for column in FILTER_DIMENSIONS if st.session_state.get(f"filter_{column}")
+    )
+
+# Same selection in flowen_rules condition syntax (pandas or SQL)
+def filter_conditions(filters):
+    return {column: ("in", list(values)) for column, values in filters}
+
+def filter_label(filters):
+    return "; ".join(f"{FILTER_LABELS[column]}: {', '.join(values)}" for column, values in filters)
+
+# ─── Sidebar ─────────────────────────────────────────────────────
+# `options` maps each dimension to its values in the unfiltered book
+def filter_sidebar(options):
+    st.markdown("### Filters")
+    for column in FILTER_DIMENSIONS:
+        if column in options:
+            st.multiselect(FILTER_LABELS[column], options[column], key=f"filter_{column}", placeholder="All")
+    return active_filters()
+
+# Each filter offers only values present in the book, but a combination of
+# them can still match no account; pages show this instead of their content
+def empty_notice():
+    st.info("No accounts match the current sidebar filters.")
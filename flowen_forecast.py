@@ -0,0 +1,135 @@
+
+import numpy as np
+import pandas as pd
+
+from flowen_cube import rollup
+from flowen_rules import JOURNEY_DEFAULT, JOURNEY_RULES, conditions_mask
+
+# Account columns the simulation reads
+FORECAST_SOURCE = ["risk_level", "journey_type", "total_debt", "ai_risk_score"]
+JOURNEYS = [rule["then"] for rule in JOURNEY_RULES] + [JOURNEY_DEFAULT]
+# Draws held at once (8 MB as uint16); trials are simulated in chunks of
+# CHUNK_CELLS // accounts
+CHUNK_CELLS = 4_000_000
+MAX_PAY_PROBABILITY = 0.99
+
+# ─── Recovery Model ──────────────────────────────────────────────
+# Fitted from the aggregates the dashboard already keeps, never from rows:
+# - rate: share of accounts recovered, per risk level (cube)
+# - lift: per journey, recovered accounts over those its risk mix would
+#   recover at the risk-level rates, so a journey is only credited with
+#   what its mix of accounts does not explain (cube)
+# - days: mean days past due at recovery per risk level, used as the mean
+#   of an exponential time to pay (recovery series)
+def fit_model(cube, series):
+    rate = rollup(cube, ["risk_level"], "recovered", how="mean", name="rate").set_index("risk_level")["rate"]
+    cells = cube.groupby(["journey_type", "risk_level"], observed=True)[["n_recovered", "sum_recovered"]].sum()
+    cells = cells.reset_index()
+    cells["expected"] = cells["n_recovered"] * cells["risk_level"].astype(object).map(rate).astype(float)
+    journeys = cells.groupby("journey_type", observed=True)[["sum_recovered", "expected"]].sum()
+    lift = (journeys["sum_recovered"] / journeys["expected"]).reindex(JOURNEYS).fillna(1.0)
+
+    paid = series.groupby("risk_level", observed=True)[["sum_recovered_dpd", "sum_recovered"]].sum()
+    overall = paid["sum_recovered_dpd"].sum() / max(paid["sum_recovered"].sum(), 1)
+    days = (paid["sum_recovered_dpd"] / paid["sum_recovered"]).fillna(overall).clip(lower=1)
+    return {"rate": rate, "lift": lift, "days": days, "default_days": max(overall, 1)}
+
+# Probability that each account pays within `horizon` days: the recovery
+# rate of its risk level, times the lift of its journey, scaled by its
+# ai_risk_score relative to the book's mean, times the chance that an
+# exponential time to pay falls inside the horizon
+def pay_probability(model, accounts, journeys, horizon):
+    risk = accounts["risk_level"].astype(object)
+    rate = risk.map(model["rate"]).to_numpy(dtype=float)
+    lift = pd.Series(journeys, dtype=object).map(model["lift"]).fillna(1.0).to_numpy(dtype=float)
+    days = risk.map(model["days"]).fillna(model["default_days"]).to_numpy(dtype=float)
+    score = accounts["ai_risk_score"].to_numpy(dtype=float)
+    mean = np.nanmean(score) if len(score) and not np.isnan(score).all() else np.nan
+    relative = np.nan_to_num(score / mean, nan=1.0) if mean > 0 else np.ones(len(score))
+    pays = np.clip(np.nan_to_num(rate * lift * relative), 0, MAX_PAY_PROBABILITY)
+    return pays * (1 - np.exp(-horizon / days))
+
+# ─── Simulation ──────────────────────────────────────────────────
+# Every trial draws one uniform per account; an account pays within the
+# horizon when it falls under its pay probability. Uniforms are 16-bit,
+# four to each raw 64-bit output of the generator, with probabilities
+# rounded to 1/65536 to match. Per-account results never leave a chunk:
+# accounts are sorted into blocks of equal (risk level, journey, what-if
+# journey) and each chunk is reduced straight to recovered amount per
+# block and trial, so memory is CHUNK_CELLS plus trials × blocks whatever
+# the book size. The what-if shares the draws of the baseline (common
+# random numbers), so their difference is the reassignment's effect and
+# not sampling noise.
+#
+# `reassign` is {"where": flowen_rules conditions, "journey_type": journey}.
+def simulate(accounts, model, trials=1000, horizon=30, reassign=None, seed=0, chunk_cells=CHUNK_CELLS):
+    journeys = accounts["journey_type"].astype(object).to_numpy()
+    what_if = journeys
+    if reassign is not None:
+        what_if = np.where(conditions_mask(accounts, reassign["where"]), reassign["journey_type"], journeys)
+
+    keys = pd.DataFrame({
+        "risk_level": accounts["risk_level"].astype(object).to_numpy(),
+        "journey": journeys,
+        "what_if": what_if,
+    })
+    block = keys.groupby(list(keys.columns), dropna=False, sort=True).ngroup().to_numpy()
+    order = np.argsort(block, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(block[order]) != 0]) if len(order) else np.array([], dtype=np.int64)
+    spans = list(zip(starts, np.r_[starts[1:], len(order)]))
+    blocks = keys.iloc[order[starts]].reset_index(drop=True)
+    amount = accounts["total_debt"].to_numpy(dtype=np.float32)[order]
+    scenarios = {"Baseline": journeys}
+    if reassign is not None:
+        scenarios["What-if"] = what_if
+    probabilities = {
+        name: pay_probability(model, accounts, assigned, horizon)[order] for name, assigned in scenarios.items()
+    }
+    thresholds = {name: np.round(p * 65536).astype(np.uint16) for name, p in probabilities.items()}
+
+    sums = {name: np.zeros((trials, len(spans))) for name in scenarios}
+    if spans:
+        bits = np.random.default_rng(seed).bit_generator
+        step = max(1, chunk_cells // len(amount))
+        for start in range(0, trials, step):
+            size = min(step, trials - start)
+            draws = bits.random_raw(-(-size * len(amount) // 4)).view(np.uint16)[:size * len(amount)]
+            draws = draws.reshape(size, len(amount))
+            for name, threshold in thresholds.items():
+                paid = draws < threshold
+                for index, (lo, hi) in enumerate(spans):
+                    sums[name][start:start + size, index] = paid[:, lo:hi] @ amount[lo:hi]
+
+    counts = np.array([hi - lo for lo, hi in spans], dtype=np.int64)
+    segments = []
+    for name, per_block in sums.items():
+        column = "journey" if name == "Baseline" else "what_if"
+        for (risk, journey), group in blocks.groupby(["risk_level", column], dropna=False, sort=True).groups.items():
+            recovered = per_block[:, group].sum(axis=1)
+            segments.append({
+                "Scenario": name,
+                "Risk Level": risk,
+                "Journey": journey,
+                "Accounts": int(counts[group].sum()),
+                "Expected (฿)": recovered.mean(),
+                "P10 (฿)": np.percentile(recovered, 10),
+                "P90 (฿)": np.percentile(recovered, 90),
+            })
+    return {
+        "totals": pd.DataFrame({name: per_block.sum(axis=1) for name, per_block in sums.items()}),
+        "segments": pd.DataFrame(segments),
+        "balance": float(amount.sum(dtype=np.float64)),
+        "expected": {name: float((p * amount).sum()) for name, p in probabilities.items()},
+    }
+
+# ─── Journey Effectiveness ───────────────────────────────────────
+def journey_effectiveness(cube, model):
+    observed = rollup(cube, ["journey_type"], "recovered", how="mean", name="rate").set_index("journey_type")["rate"]
+    by_risk = rollup(cube, ["journey_type", "risk_level"], "recovered", how="mean", name="rate")
+    best = by_risk.sort_values("rate", ascending=False).drop_duplicates("journey_type").set_index("journey_type")
+    return pd.DataFrame({
+        "Journey": JOURNEYS,
+        "Recovery Rate (%)": [round(observed.get(j, np.nan) * 100, 1) for j in JOURNEYS],
+        "Lift vs Risk Mix": [round(model["lift"][j], 2) for j in JOURNEYS],
+        "Best Segment": [f"{best['risk_level'][j]} Risk" if j in best.index else "–" for j in JOURNEYS],
+    })
@@ -1,23 +1,22 @@
 
 import streamlit as st
-import base64
-from PIL import Image
-from io import BytesIO
 import plotly.express as px
 
+from flowen_assets import logo_base64
+from flowen_bins import compute_bins, histogram_figure
+from flowen_figures import memoize_figure
+
 # ─── Set up Flowen CI Color Palette ──────────────────────────────
 flowen_colors = ["#00B894", "#0984E3", "#FDCB6E", "#6C5CE7", "#00CEC9"]
 
 # ─── Logo Encoding ───────────────────────────────────────────────
+# Kept for callers of the old helper; the encoding is cached in flowen_assets.
 def get_base64_logo(path):
-    image = Image.open(path)
-    buffer = BytesIO()
-    image.save(buffer, format="PNG")
-    return base64.b64encode(buffer.getvalue()).decode()
+    return logo_base64(path)
 
 # ─── Inject UI Theme: Logo + Language + CSS ──────────────────────
 def inject_ui_theme(logo_path="flowen_logo.png"):
-    logo_base64 = get_base64_logo(logo_path)
+    logo = logo_base64(logo_path)
     st.markdown(f"""
         <style>
         div[data-testid="stExpander"], .stContainer {{
@@ -50,7 +49,7 @@ def inject_ui_theme(logo_path="flowen_logo.png"):
         </style>
 
         <div style="position:fixed; top:10px; left:10px; z-index:1000;">
-            <img src="data:image/png;base64,{logo_base64}" width="140"/>
+            <img src="data:image/png;base64,{logo}" width="140"/>
         </div>
 
         <div class="lang-toggle">
@@ -62,6 +61,8 @@ def inject_ui_theme(logo_path="flowen_logo.png"):
     """, unsafe_allow_html=True)
 
 # ─── Flowen Chart Wrappers ───────────────────────────────────────
+# Pass cache_key=(chart_id, data_version) to reuse the built figure across reruns.
+@memoize_figure
 def flowen_pie(data, names, values, title=""):
     return px.pie(
         data,
@@ -72,6 +73,7 @@ def flowen_pie(data, names, values, title=""):
         hole=0.4
     )
 
+@memoize_figure
 def flowen_bar(data, x, y, color=None, title="", barmode=None):
     return px.bar(
         data,
@@ -83,6 +85,7 @@ def flowen_bar(data, x, y, color=None, title="", barmode=None):
         barmode=barmode
     )
 
+@memoize_figure
 def flowen_line(data, x, y, title=""):
     return px.line(
         data,
@@ -93,6 +96,7 @@ def flowen_line(data, x, y, title=""):
         markers=True
     )
 
+@memoize_figure
 def flowen_funnel(data, x, y, title=""):
     return px.funnel(
         data,
@@ -102,11 +106,12 @@ def flowen_funnel(data, x, y, title=""):
         color_discrete_sequence=flowen_colors
     )
 
+@memoize_figure
 def flowen_histogram(data, x, nbins=30, title=""):
-    return px.histogram(
-        data,
+    # binned here; the browser only receives the bar per bin
+    return histogram_figure(
+        compute_bins(data[x], nbins),
         x=x,
-        nbins=nbins,
         title=title,
         color_discrete_sequence=flowen_colors
     )
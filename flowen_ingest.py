@@ -0,0 +1,334 @@
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from flowen_alerts import AlertEngine
+from flowen_assign import CollectorAssignment
+from flowen_cache import temp_path
+from flowen_cube import add_age_group, build_cube, merge_cubes
+from flowen_filters import FILTER_DIMENSIONS, BitmapIndex
+from flowen_forecast import fit_model
+from flowen_recovery import build_recovery_series
+from flowen_rules import assign_journey, assign_status_paid
+from flowen_schema import apply_schema, empty_column, extend_categories
+from flowen_search import SEARCH_FIELDS, AccountIndex
+from flowen_tagging import TAG_COLUMNS
+from flowen_topk import build_rankings
+
+KEY = "account_id"
+WATERMARKS = ["last_contact_date", "last_payment_date"]
+# Columns an update adds to instead of overwriting: tag batches carry the
+# counts of newly tagged messages (flowen_tagging)
+ADDITIVE = list(TAG_COLUMNS.values())
+
+# ─── Derived Fields ──────────────────────────────────────────────
+# Shared by the full load and delta batches. status_paid and age_group
+# always follow dpd and age; the other fields are only derived when the
+# source lacks them.
+ALWAYS_DERIVED = ["status_paid", "age_group"]
+DERIVED_FIELDS = ALWAYS_DERIVED + ["journey_type", "ai_confidence", "recovered"]
+
+def missing_fields(df):
+    return ALWAYS_DERIVED + [f for f in DERIVED_FIELDS if f not in ALWAYS_DERIVED and f not in df.columns]
+
+def derive_fields(df, fields=None):
+    fields = missing_fields(df) if fields is None else fields
+    if "status_paid" in fields:
+        df["status_paid"] = assign_status_paid(df)
+    if "age_group" in fields:
+        add_age_group(df)
+    if "journey_type" in fields:
+        df["journey_type"] = assign_journey(df)
+    if "ai_confidence" in fields:
+        df["ai_confidence"] = (df["ai_risk_score"] * 100).clip(0, 100)
+    if "recovered" in fields:
+        # สร้างตัวแปรจำลอง recovery_rate ถ้ายังไม่มี
+        df["recovered"] = np.where(df["dpd"] == 0, 1, recovered_draw(df[KEY]))
+    return df
+
+# Stand-in outcome for accounts not at dpd 0: 6 in 10 recovered, by a hash
+# of the account id, so a row gets the same value whatever batch it comes
+# in. md5 read little-endian is DuckDB's md5_number (flowen_ooc), so both
+# backends agree. Every power of 256 above 1 is 6 mod 10, so the 128-bit
+# value mod 10 comes from a byte sum instead of Python integers.
+def recovered_draw(ids):
+    digests = b"".join(hashlib.md5(str(account).encode()).digest() for account in ids)
+    digits = np.frombuffer(digests, dtype=np.uint8).reshape(-1, 16).astype(np.int64)
+    buckets = (digits[:, 0] + 6 * digits[:, 1:].sum(axis=1)) % 10
+    return (buckets < 6).astype(np.int64)
+
+def row_watermark(df):
+    stamps = [pd.to_datetime(df[c], errors="coerce") for c in WATERMARKS if c in df.columns]
+    if not stamps:
+        return pd.Series(pd.NaT, index=df.index)
+    return pd.concat(stamps, axis=1).max(axis=1)
+
+# ─── Key Lookup ──────────────────────────────────────────────────
+# account_id → row position, kept as a list of hash-indexed segments so an
+# append only hashes the new ids. Segments are compacted once there are
+# too many of them.
+class KeyIndex:
+    MAX_SEGMENTS = 8
+
+    def __init__(self, keys):
+        self.segments = [(0, pd.Index(keys))]
+        self.size = len(keys)
+
+    def positions(self, keys):
+        found = np.full(len(keys), -1, dtype=np.int64)
+        for offset, segment in self.segments:
+            hit = segment.get_indexer(keys)
+            mask = (hit >= 0) & (found < 0)
+            found[mask] = hit[mask] + offset
+        return found
+
+    def append(self, keys):
+        self.segments.append((self.size, pd.Index(keys)))
+        self.size += len(keys)
+        if len(self.segments) > self.MAX_SEGMENTS:
+            self.segments = [(0, self.segments[0][1].append([s for _, s in self.segments[1:]]))]
+
+# ─── Resident Portfolio ──────────────────────────────────────────
+# Holds the full dataset plus its aggregate cube and recovery series, and
+# applies append/update batches keyed by account_id. Only the rows in a
+# batch are re-derived, re-aggregated, re-indexed, checked for alerts and
+# rebalanced across collectors; the rest of the book is left untouched.
+# The table is kept in the compact dtypes of flowen_schema. `alert_log`
+# carries fired alerts over from an earlier store.
+class PortfolioStore:
+    def __init__(self, df, alert_log=None):
+        self.derived = missing_fields(df)
+        # copied because batches write into it in place, and columns read
+        # from the Parquet cache can share read-only Arrow buffers
+        self.df = apply_schema(derive_fields(df.reset_index(drop=True), self.derived)).copy()
+        self.keys = KeyIndex(self.df[KEY])
+        # rows whose ai_confidence came from a score batch (flowen_scoring)
+        self.scored = np.zeros(len(self.df), dtype=bool)
+        self.cube = build_cube(self.df)
+        self.recovery = build_recovery_series(self.df)
+        self.rankings = build_rankings(self.df)
+        # account search and sidebar filter indexes, built on first use
+        self.accounts = None
+        self.bitmaps = None
+        self.alerts = AlertEngine(self.df, alert_log)
+        self.assignments = None  # until a roster is set
+        self.roster_version = None
+        self.version = 0
+        self.watermark = row_watermark(self.df).max()
+        self.ingested = set()
+        self.lock = threading.Lock()
+
+    def apply_batch(self, batch):
+        with self.lock:
+            return self._apply_batch(batch)
+
+    def _apply_batch(self, batch):
+        batch = batch.drop_duplicates(KEY, keep="last").reset_index(drop=True)
+        # dates and numbers as stored; text is matched to categories on write
+        batch = apply_schema(batch, categorical=False)
+        # Columns new to the book (e.g. tag counts from flowen_tagging) are
+        # added first, empty for the accounts the batch does not cover
+        for column in batch.columns.difference(self.df.columns):
+            self.df[column] = empty_column(column, len(self.df))
+        positions = self.keys.positions(batch[KEY])
+        hits = positions >= 0
+
+        # An update older than the row it would replace is dropped
+        stale = np.zeros(len(batch), dtype=bool)
+        if hits.any():
+            incoming = row_watermark(batch[hits]).to_numpy()
+            current = row_watermark(self.df.iloc[positions[hits]]).to_numpy()
+            stale[hits] = incoming < current
+
+        updates, appends = batch[hits & ~stale], batch[~hits]
+        if len(updates):
+            self._update(updates, positions[hits & ~stale])
+        if len(appends):
+            self._append(appends)
+
+        if len(updates) or len(appends):
+            self.version += 1
+            self.watermark = max(self.watermark, row_watermark(batch[~stale]).max())
+        return {"updated": len(updates), "appended": len(appends), "stale": int(stale.sum())}
+
+    def _update(self, updates, positions):
+        supplied = [c for c in updates.columns if c in self.df.columns]
+        before = self.df.iloc[positions]
+        after = before.copy()
+        # Blank cells in a batch mean "unchanged", so partial rows only
+        # overwrite the fields they actually carry
+        patch = updates.set_axis(after.index)
+        for column in supplied:
+            dtype = extend_categories(self.df, column, patch[column])
+            if column in ADDITIVE:
+                merged = after[column].fillna(0) + patch[column].fillna(0)
+            else:
+                merged = patch[column].where(patch[column].notna(), after[column].astype(object))
+            after[column] = merged.astype(dtype)
+        derived = [f for f in self.derived if f in ALWAYS_DERIVED or f not in supplied]
+        # A scored confidence stands until the next score batch; only rows
+        # never scored have theirs re-derived from ai_risk_score
+        if "ai_confidence" in supplied:
+            self.scored[positions[patch["ai_confidence"].notna().to_numpy()]] = True
+        scored = self.scored[positions] if "ai_confidence" in derived else None
+        if scored is not None and scored.any():
+            confidence = after["ai_confidence"].to_numpy(copy=True)
+        apply_schema(derive_fields(after, derived), categorical=False)
+        if scored is not None and scored.any():
+            after["ai_confidence"] = np.where(scored, confidence, after["ai_confidence"].to_numpy())
+
+        # Write back only what can have changed; setitem on Arrow-backed
+        # string columns rewrites the whole column
+        for column in dict.fromkeys(supplied + derived):
+            extend_categories(self.df, column, after[column])
+            self.df.iloc[positions, self.df.columns.get_loc(column)] = after[column].to_numpy()
+        self.cube = merge_cubes(self.cube, build_cube(before), sign=-1)
+        self.cube = merge_cubes(self.cube, build_cube(after))
+        self.recovery = merge_cubes(self.recovery, build_recovery_series(before), sign=-1)
+        self.recovery = merge_cubes(self.recovery, build_recovery_series(after))
+        for ranking in self.rankings.values():
+            ranking.update(self.df, positions)
+        self._reindex(positions, renamed=any(f in supplied for f in SEARCH_FIELDS if f != KEY))
+        self.alerts.evaluate(self.df, positions)
+        self._rebalance(positions)
+
+    def _append(self, appends):
+        rows = derive_fields(appends.copy()).reindex(columns=self.df.columns)
+        for column in self.df.columns:
+            dtype = extend_categories(self.df, column, rows[column])
+            try:
+                rows[column] = rows[column].astype(dtype)
+            except (TypeError, ValueError):
+                pass
+        start = len(self.df)
+        # The one step of a batch whose cost follows the book, not the
+        # batch: concat copies every column (about 25 ms for 1M rows). A
+        # frame with spare rows would not avoid it, since under
+        # copy-on-write writing through a slice of it copies the block;
+        # `flowen_benchmark.py ingest` keeps appends within budget.
+        self.df = pd.concat([self.df, rows], ignore_index=True)
+        scored = appends["ai_confidence"].notna().to_numpy() if "ai_confidence" in appends else np.zeros(len(rows), dtype=bool)
+        self.scored = np.concatenate([self.scored, scored])
+        self.keys.append(rows[KEY])
+        self.cube = merge_cubes(self.cube, build_cube(rows))
+        self.recovery = merge_cubes(self.recovery, build_recovery_series(rows))
+        for ranking in self.rankings.values():
+            ranking.update(self.df, np.arange(start, len(self.df)))
+        self._reindex(np.arange(start, len(self.df)), renamed=True)
+        self.alerts.evaluate(self.df, np.arange(start, len(self.df)), appended=True)
+        self._rebalance(np.arange(start, len(self.df)))
+
+    # ─── Rankings ───
+    def top(self, name, k, mask=None):
+        return self.df.iloc[self.rankings[name].top(self.df, k, mask)]
+
+    # ─── Indexes ───
+    # Filter bitmaps follow the changed rows. The account index only
+    # depends on ids and names, so updates leave it as it is; appended rows
+    # or renamed accounts drop it, to be rebuilt by the next account_index().
+    def account_index(self):
+        with self.lock:
+            if self.accounts is None:
+                self.accounts = AccountIndex(self.df)
+            return self.accounts
+
+    def filter_index(self):
+        with self.lock:
+            if self.bitmaps is None:
+                self.bitmaps = BitmapIndex(self.df, FILTER_DIMENSIONS)
+            return self.bitmaps
+
+    def _reindex(self, positions, renamed):
+        if self.bitmaps is not None:
+            self.bitmaps.update(self.df, positions)
+        if renamed:
+            self.accounts = None
+
+    # ─── Alerts ───
+    # Fires time-based alerts that have come due since the last check
+    def check_alerts(self):
+        with self.lock:
+            return self.alerts.tick(self.df)
+
+    # ─── Collector Assignment ───
+    # `roster` from flowen_assign.load_roster (None: no collectors);
+    # `version` identifies it, and an unchanged version is a no-op. The
+    # first roster assigns the whole book, later ones rebalance.
+    def set_roster(self, roster, version=None):
+        with self.lock:
+            if version is not None and version == self.roster_version:
+                return
+            self.roster_version = version
+            if roster is None:
+                self.assignments = None
+            elif self.assignments is None:
+                self.assignments = CollectorAssignment(roster)
+                self._rebalance(np.arange(len(self.df)))
+            else:
+                self.assignments.set_roster(roster)
+
+    def _rebalance(self, positions):
+        if self.assignments is not None:
+            self.assignments.update(self.df, positions, fit_model(self.cube, self.recovery))
+
+    # ─── Delta Files ───
+    # Batches dropped into `directory` as CSV or Parquet are applied once
+    # each, in file-name order.
+    def ingest_directory(self, directory):
+        if not os.path.isdir(directory):
+            return []
+        results = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.endswith((".csv", ".parquet")) or path in self.ingested:
+                continue
+            batch = pd.read_parquet(path) if name.endswith(".parquet") else pd.read_csv(path)
+            results.append((name, self.apply_batch(batch)))
+            self.ingested.add(path)
+        return results
+
+# Batch producers (flowen_scoring, flowen_tagging) write through a temporary
+# file, so the refresher never picks up a half-written batch. Names sort
+# in write order (nanoseconds) and never repeat (random suffix): a reused
+# name would be skipped as already ingested.
+def write_batch(frame, delta_dir, prefix):
+    os.makedirs(delta_dir, exist_ok=True)
+    now = time.time_ns()
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now // 10**9))}.{now % 10**9:09d}"
+    target = os.path.join(delta_dir, f"{prefix}-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+    tmp = temp_path(target)
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+    return target
+
+# ─── Current Book ────────────────────────────────────────────────
+# Offline jobs (flowen_scoring, flowen_tagging) see the book as the
+# dashboard holds it: the source with every batch in `delta_dir` applied,
+# so accounts and fields that arrived after the source file count.
+def current_book(source, delta_dir):
+    from flowen_cache import load_portfolio
+
+    store = PortfolioStore(load_portfolio(source))
+    store.ingest_directory(delta_dir)
+    return store.df
+
+# Only the ids: those of the source plus those of every batch, which is
+# where appended accounts come from
+def known_accounts(source, delta_dir):
+    from flowen_cache import load_portfolio
+
+    ids = [load_portfolio(source, columns=[KEY])[KEY].astype(str)]
+    if os.path.isdir(delta_dir):
+        for name in sorted(os.listdir(delta_dir)):
+            path = os.path.join(delta_dir, name)
+            if name.endswith(".parquet"):
+                ids.append(pd.read_parquet(path, columns=[KEY])[KEY].astype(str))
+            elif name.endswith(".csv"):
+                ids.append(pd.read_csv(path, usecols=[KEY], dtype=str)[KEY])
+    return pd.Index(pd.concat(ids, ignore_index=True).unique())
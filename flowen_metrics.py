@@ -0,0 +1,173 @@
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+from flowen_cache import CACHE_DIR, temp_path
+
+# Rewritten by a background thread every FLOWEN_METRICS_WRITE_SECONDS while
+# reruns are being recorded; point a node_exporter textfile collector at it
+METRICS_FILE = os.environ.get("FLOWEN_METRICS_FILE", os.path.join(CACHE_DIR, "metrics.prom"))
+WRITE_SECONDS = float(os.environ.get("FLOWEN_METRICS_WRITE_SECONDS", "15"))
+# Optional scrape endpoint (http://host:port/metrics)
+METRICS_PORT = os.environ.get("FLOWEN_METRICS_PORT")
+# Show the sidebar timing panel to everyone, not only with ?debug=1
+DEBUG = os.environ.get("FLOWEN_DEBUG") == "1"
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ─── Process-wide Registry ───────────────────────────────────────
+# Prometheus histograms of rerun and section wall time plus a counter of
+# rows scanned per section, labelled by page. p95 per page is
+# histogram_quantile(0.95, rate(flowen_rerun_seconds_bucket[5m])).
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def lines(self, name, labels):
+        for bound, count in zip(BUCKETS, self.counts):
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6f}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+class Metrics:
+    def __init__(self):
+        self.reruns = {}
+        self.sections = {}
+        self.rows = {}
+        # observations so far, and how many the file last written holds
+        self.observed = 0
+        self.written = 0
+        self.lock = threading.Lock()
+
+    def observe_section(self, page, section, seconds, rows):
+        with self.lock:
+            self.sections.setdefault((page, section), Histogram()).observe(seconds)
+            self.rows[(page, section)] = self.rows.get((page, section), 0) + rows
+            self.observed += 1
+
+    def observe_rerun(self, page, seconds):
+        with self.lock:
+            self.reruns.setdefault(page, Histogram()).observe(seconds)
+            self.observed += 1
+
+    def prometheus(self):
+        with self.lock:
+            out = ["# HELP flowen_rerun_seconds Wall time of a full script rerun.",
+                   "# TYPE flowen_rerun_seconds histogram"]
+            for page, hist in sorted(self.reruns.items()):
+                out += hist.lines("flowen_rerun_seconds", f'page="{page}"')
+            out += ["# HELP flowen_section_seconds Wall time of a page section.",
+                    "# TYPE flowen_section_seconds histogram"]
+            for (page, section), hist in sorted(self.sections.items()):
+                out += hist.lines("flowen_section_seconds", f'page="{page}",section="{section}"')
+            out += ["# HELP flowen_section_rows_total Rows scanned by a page section.",
+                    "# TYPE flowen_section_rows_total counter"]
+            for (page, section), rows in sorted(self.rows.items()):
+                out.append(f'flowen_section_rows_total{{page="{page}",section="{section}"}} {rows}')
+        return "\n".join(out) + "\n"
+
+    def write(self, path=METRICS_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        observed = self.observed
+        tmp = temp_path(path)
+        with open(tmp, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+        self.written = observed
+
+@st.cache_resource
+def registry():
+    metrics = Metrics()
+    if METRICS_PORT:
+        _serve(metrics, int(METRICS_PORT))
+    _write_periodically(metrics, METRICS_FILE, WRITE_SECONDS)
+    return metrics
+
+# Off the request path: reruns only record, and the file is rewritten at
+# most every `interval` seconds, when there is anything new
+def _write_periodically(metrics, path, interval):
+    def loop():
+        while True:
+            time.sleep(interval)
+            if metrics.observed != metrics.written:
+                try:
+                    metrics.write(path)
+                except OSError:
+                    pass  # e.g. a read-only cache dir; retried next interval
+
+    threading.Thread(target=loop, daemon=True, name="flowen-metrics").start()
+
+def _serve(metrics, port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+# ─── Timing Hooks ────────────────────────────────────────────────
+# Each session's script runs in its own thread, so the current rerun
+# (page, start time, section records) is kept thread-local.
+_rerun = threading.local()
+
+def begin_rerun(page):
+    _rerun.page = page
+    _rerun.start = time.perf_counter()
+    _rerun.records = []
+
+@contextmanager
+def section(name, rows=0):
+    record = {"section": name, "rows": rows}
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        page = getattr(_rerun, "page", "app")
+        registry().observe_section(page, name, record["seconds"], record["rows"])
+        if hasattr(_rerun, "records"):
+            _rerun.records.append(record)
+
+def end_rerun():
+    seconds = time.perf_counter() - _rerun.start
+    registry().observe_rerun(_rerun.page, seconds)
+    return seconds, _rerun.records
+
+# ─── Debug Panel ─────────────────────────────────────────────────
+# Opt-in with ?debug=1 (or FLOWEN_DEBUG=1): this rerun's sections, slowest
+# first.
+def debug_enabled():
+    return DEBUG or st.query_params.get("debug") == "1"
+
+def debug_panel(seconds, records):
+    with st.sidebar.expander("⏱ Render Timings", expanded=True):
+        st.caption(f"Rerun: {seconds * 1000:,.0f} ms")
+        rows = sorted(records, key=lambda r: r["seconds"], reverse=True)
+        st.dataframe(
+            [{"Section": r["section"], "ms": round(r["seconds"] * 1000, 1), "Rows": r["rows"]} for r in rows],
+            use_container_width=True,
+            hide_index=True
+        )
@@ -0,0 +1,271 @@
+
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from flowen_cache import temp_path
+from flowen_cube import AGE_BINS, AGE_LABELS, CUBE_DIMENSIONS, CUBE_FLAGS, CUBE_MEASURES
+from flowen_recovery import RECOVERY_DIMENSIONS, RECOVERY_MEASURES
+from flowen_rules import (
+    JOURNEY_DEFAULT, JOURNEY_RULES, STATUS_PAID_DEFAULT, STATUS_PAID_RULES, conditions_sql, rules_sql, sql_literal
+)
+from flowen_schema import SCHEMA, apply_schema
+from flowen_topk import RANKINGS
+
+# DuckDB memory cap (e.g. "2GB"); larger intermediates spill to disk
+MEMORY_LIMIT = os.environ.get("FLOWEN_DUCKDB_MEMORY")
+
+# ─── Partitioned Dataset ─────────────────────────────────────────
+# The source CSV is streamed in chunks into Hive-partitioned Parquet
+# (`<dir>/region=North/…parquet`), so neither the conversion nor any later
+# query holds the whole book in memory.
+#
+# Every file must get the same column types, whatever values its chunk
+# happens to hold (a column all blank in one chunk, whole numbers in one
+# and fractions in another), so types are fixed before reading: from
+# flowen_schema, with text as strings and counts as nullable integers,
+# and for columns outside it from a sample of the file (numbers as
+# float64, anything else as strings).
+def file_dtypes(source, sample_rows=10_000):
+    sample = pd.read_csv(source, nrows=sample_rows)
+    dtypes = {}
+    for column in sample.columns:
+        dtype = SCHEMA.get(column)
+        if dtype is None:
+            numeric = pd.api.types.is_numeric_dtype(sample[column]) and sample[column].notna().any()
+            dtypes[column] = "float64" if numeric else "string"
+        elif dtype == "category" or isinstance(dtype, pd.CategoricalDtype) or str(dtype).startswith("datetime64"):
+            dtypes[column] = "string"  # dates are parsed by apply_schema
+        elif str(dtype).startswith("int"):
+            dtypes[column] = str(dtype).capitalize()
+        else:
+            dtypes[column] = dtype
+    return dtypes
+
+def write_dataset(source, directory, partition_by=("region",), chunk_rows=1_000_000):
+    tmp = temp_path(directory)
+    for chunk in pd.read_csv(source, chunksize=chunk_rows, dtype=file_dtypes(source)):
+        apply_schema(chunk, categorical=False).to_parquet(tmp, partition_cols=list(partition_by), index=False)
+    os.replace(tmp, directory)
+    return directory
+
+def dataset_digest(directory):
+    digest = hashlib.sha256()
+    for root, _, files in sorted(os.walk(directory)):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            digest.update(f"{os.path.relpath(root, directory)}/{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+# ─── Derived Fields in SQL ───────────────────────────────────────
+# Same definitions as flowen_ingest.derive_fields / flowen_cube, computed
+# per query instead of being stored. The recovered fallback hashes the
+# account id the same way (flowen_ingest.recovered_draw).
+def _age_group_sql():
+    cases = " ".join(
+        f"WHEN age > {lo} AND age <= {hi} THEN {sql_literal(label)}"
+        for lo, hi, label in zip(AGE_BINS[:-1], AGE_BINS[1:], AGE_LABELS)
+    )
+    return f"CASE {cases} END"
+
+DERIVED_SQL = {
+    "status_paid": rules_sql(STATUS_PAID_RULES, STATUS_PAID_DEFAULT),
+    "journey_type": rules_sql(JOURNEY_RULES, JOURNEY_DEFAULT),
+    "ai_confidence": "LEAST(GREATEST(ai_risk_score * 100, 0), 100)",
+    "recovered": "CASE WHEN dpd = 0 THEN 1 ELSE CAST(md5_number(CAST(account_id AS VARCHAR)) % 10 < 6 AS INTEGER) END",
+    "age_group": _age_group_sql(),
+}
+
+RECOVERY_SQL = {
+    "payment_day": "TRY_CAST(last_payment_date AS DATE)",
+    "recovered_amount": "total_debt * recovered",
+    "recovered_dpd": "dpd * recovered",
+}
+
+# ─── Out-of-core Portfolio ───────────────────────────────────────
+# Lazy queries over the partitioned files with DuckDB. Every method returns
+# a result bounded by its own size (a cube, k rows, one page); the
+# portfolio itself is never materialised. Queries run on per-call cursors,
+# so sessions on different threads can share one instance.
+class OutOfCorePortfolio:
+    def __init__(self, directory):
+        import duckdb
+
+        self.directory = directory
+        self.version = dataset_digest(directory)
+        self.con = duckdb.connect()
+        if MEMORY_LIMIT:
+            self.con.execute(f"SET memory_limit = {sql_literal(MEMORY_LIMIT)}")
+        self.lock = threading.Lock()
+
+        files = sql_literal(os.path.join(directory, "**", "*.parquet"))
+        source = f"read_parquet({files}, hive_partitioning = true, union_by_name = true)"
+        present = {row[0] for row in self.con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+        # status_paid always follows dpd; the others only fill gaps
+        derived = {c: e for c, e in DERIVED_SQL.items() if c == "status_paid" or c not in present}
+        keep = "* EXCLUDE (status_paid)" if "status_paid" in present else "*"
+        extra = "".join(f", {expr} AS {column}" for column, expr in derived.items())
+        self.con.execute(f"CREATE VIEW portfolio AS SELECT {keep}{extra} FROM {source}")
+        self.columns = [row[0] for row in self.con.execute("DESCRIBE portfolio").fetchall()]
+        self.rows = self._query("SELECT count(*) FROM portfolio").fetchone()[0]
+
+    def __len__(self):
+        return self.rows
+
+    def _query(self, sql, params=None):
+        with self.lock:
+            cursor = self.con.cursor()
+        return cursor.execute(sql, params or [])
+
+    def _frame(self, sql, params=None):
+        return self._query(sql, params).df()
+
+    # AND of flowen_rules condition dicts; `filters` arguments below are the
+    # sidebar filters in that syntax (flowen_filters.filter_conditions)
+    def _where(self, *conditions):
+        return " AND ".join(conditions_sql(c) for c in conditions if c) or "TRUE"
+
+    # ─── Aggregates ───
+    # Same layout as flowen_cube.build_cube, so rollup/total/value_counts
+    # work on it unchanged.
+    def _aggregate(self, dims, measures, flags, source="portfolio"):
+        aggs = ["count(*) AS count"]
+        for m in measures:
+            aggs += [f'sum("{m}") AS sum_{m}', f'count("{m}") AS n_{m}']
+        for flag, when in flags.items():
+            aggs.append(f"count(*) FILTER (WHERE {conditions_sql(when)}) AS sum_{flag}")
+        group = ", ".join(f'"{d}"' for d in dims)
+        cube = self._frame(f"SELECT {group}, {', '.join(aggs)} FROM {source} GROUP BY {group}")
+        cube.attrs["dimensions"] = dims
+        return cube
+
+    def cube(self):
+        dims = [d for d in CUBE_DIMENSIONS if d in self.columns]
+        measures = [m for m in CUBE_MEASURES if m in self.columns]
+        cube = self._aggregate(dims, measures, CUBE_FLAGS)
+        if "age_group" in cube.columns:
+            cube["age_group"] = pd.Categorical(cube["age_group"], categories=AGE_LABELS)
+        return cube
+
+    # flowen_recovery.build_recovery_series
+    def recovery_series(self, filters=None):
+        fields = ", ".join(f"{expr} AS {column}" for column, expr in RECOVERY_SQL.items())
+        series = self._aggregate(
+            RECOVERY_DIMENSIONS, RECOVERY_MEASURES, {},
+            source=f"(SELECT *, {fields} FROM portfolio WHERE {self._where(filters)})"
+        )
+        series["payment_day"] = pd.to_datetime(series["payment_day"])
+        return series
+
+    def top(self, name, k, filters=None):
+        spec = RANKINGS[name]
+        column = spec["column"]
+        where = self._where(spec.get("where"), filters)
+        direction = "ASC" if spec.get("ascending") else "DESC"
+        return self._frame(
+            f'SELECT * FROM portfolio WHERE {where} AND "{column}" IS NOT NULL '
+            f'ORDER BY "{column}" {direction}, account_id LIMIT ?', [k]
+        )
+
+    # Same bins as flowen_bins.compute_bins (last bin closed on the right)
+    def bins(self, column, nbins=30, value_range=None, filters=None):
+        where = self._where(filters)
+        if value_range is None:
+            value_range = self._query(f'SELECT min("{column}"), max("{column}") FROM portfolio WHERE {where}').fetchone()
+            if value_range[0] is None:
+                value_range = (0.0, 1.0)
+        lo, hi = map(float, value_range)
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        edges = np.linspace(lo, hi, nbins + 1)
+        counts = self._frame(
+            f'SELECT least(CAST(floor(("{column}" - ?) / ?) AS BIGINT), ?) AS bin, count(*) AS n '
+            f'FROM portfolio WHERE {where} AND "{column}" BETWEEN ? AND ? GROUP BY bin',
+            [lo, (hi - lo) / nbins, nbins - 1, lo, hi]
+        )
+        full = np.zeros(nbins, dtype=np.int64)
+        full[counts["bin"].to_numpy(dtype=np.int64)] = counts["n"].to_numpy()
+        return pd.DataFrame({"left": edges[:-1], "right": edges[1:], "count": full})
+
+    # ─── Rows ───
+    def select(self, where, columns, limit, filters=None):
+        return self._frame(
+            f"SELECT {self._columns(columns)} FROM portfolio WHERE {self._where(where, filters)} LIMIT ?", [limit]
+        )
+
+    # the sample clause binds to the FROM, so filtering happens in a subquery
+    def sample(self, columns, n, filters=None):
+        return self._frame(
+            f"SELECT {self._columns(columns)} FROM (SELECT * FROM portfolio WHERE {self._where(filters)}) "
+            f"USING SAMPLE reservoir({int(n)} ROWS)"
+        )
+
+    def account(self, account_id):
+        rows = self._frame("SELECT * FROM portfolio WHERE account_id = ? LIMIT 1", [account_id])
+        return None if rows.empty else rows.iloc[0]
+
+    # Exact id first, then prefix matches, then substring matches
+    def search(self, query, limit=20):
+        query = query.strip()
+        if not query:
+            return self._frame("SELECT account_id, name FROM portfolio ORDER BY account_id LIMIT ?", [limit])
+        needle = query.lower()
+        return self._frame(
+            "SELECT account_id, name FROM ("
+            "  SELECT account_id, name, CASE"
+            "    WHEN account_id = ? THEN 0"
+            "    WHEN starts_with(lower(account_id), ?) OR starts_with(lower(name), ?) THEN 1"
+            "    ELSE 2 END AS rank"
+            "  FROM portfolio"
+            "  WHERE contains(lower(account_id), ?) OR contains(lower(name), ?)"
+            ") ORDER BY rank, account_id LIMIT ?",
+            [query, needle, needle, needle, needle, limit]
+        )
+
+    # One page of a sorted, filtered table plus the filtered row count
+    def page(self, columns, sort_column=None, ascending=True, query="", search_columns=(), offset=0, limit=25,
+             filters=None):
+        where, params = self._where(filters), []
+        if query and search_columns:
+            matches = " OR ".join(f'contains(lower(CAST("{c}" AS VARCHAR)), ?)' for c in search_columns)
+            where += f" AND ({matches})"
+            params = [query.lower()] * len(search_columns)
+        order = ""
+        if sort_column:
+            order = f'ORDER BY "{sort_column}" {"ASC" if ascending else "DESC"} NULLS LAST, account_id'
+        total = self._query(f"SELECT count(*) FROM portfolio WHERE {where}", params).fetchone()[0]
+        frame = self._frame(
+            f"SELECT {self._columns(columns)} FROM portfolio WHERE {where} {order} LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return frame, total
+
+    def count(self, where=None, filters=None):
+        return self._query(f"SELECT count(*) FROM portfolio WHERE {self._where(where, filters)}").fetchone()[0]
+
+    # Sum and number of non-zero rows per column, e.g. messages and
+    # accounts per conversation tag
+    def totals(self, columns, filters=None):
+        parts = ", ".join(f'sum("{c}"), count(*) FILTER (WHERE "{c}" > 0)' for c in columns)
+        row = self._query(f"SELECT {parts} FROM portfolio WHERE {self._where(filters)}").fetchone()
+        return pd.DataFrame({"messages": row[0::2], "accounts": row[1::2]}, index=columns)
+
+    # Arrow record batches of `batch_rows`, for consumers that must see
+    # every row (exports) without holding them all at once. `sort` is a
+    # (column, ascending) pair.
+    def stream(self, columns, where=None, batch_rows=100_000, filters=None, sort=None):
+        # table order unless sorted; DuckDB's parallel scan has none of its own
+        order = "ORDER BY account_id"
+        if sort is not None:
+            column, ascending = sort
+            order = f'ORDER BY "{column}" {"ASC" if ascending else "DESC"} NULLS LAST, account_id'
+        reader = self._query(
+            f"SELECT {self._columns(columns)} FROM portfolio WHERE {self._where(where, filters)} {order}"
+        ).fetch_record_batch(batch_rows)
+        yield from reader
+
+    def _columns(self, columns):
+        return ", ".join(f'"{c}"' for c in columns)
@@ -0,0 +1,21 @@
+
+import importlib
+
+# ─── Flowen Gradient Color Palette ─────────────
+flowen_colors = ["#00B894", "#00A2C2", "#0984E3"]
+
+# ─── Page Registry ───────────────────────────────────────────────
+# Menu label → module exposing render(df). Modules are imported on first
+# use, so a rerun only pays for the page that is actually selected.
+PAGES = {
+    "Risk Overview": "flowen_pages.risk_overview",
+    "Journey Management": "flowen_pages.journey_management",
+    "Recovery KPI": "flowen_pages.recovery_kpi",
+    "Behavioral Insights": "flowen_pages.behavioral_insights",
+}
+
+PAGE_ICONS = ["bar-chart-line", "bar-chart", "pie-chart", "graph-up"]
+
+def render_page(name, df):
+    module = importlib.import_module(PAGES[name])
+    module.render(df)
@@ -0,0 +1,145 @@
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from flowen_bins import histogram_figure
+from flowen_cube import rollup, total, value_counts
+from flowen_data import load_bins, load_cube, load_tag_totals
+from flowen_figures import cached_figure
+from flowen_filters import empty_notice
+from flowen_pages import flowen_colors
+from flowen_tagging import TAG_ACTIONS, TAG_COLUMNS, TAG_PHRASES, get_automaton
+
+# ─── Chart Builders ───
+# Only called on a figure-cache miss (see flowen_figures).
+def _response_figure(cube):
+    response_counts = value_counts(cube, "response_behavior")
+    response_counts.columns = ["Behavior", "Count"]
+    fig_response = px.pie(
+        response_counts,
+        names="Behavior",
+        values="Count",
+        hole=0.4,
+        title="Customer Response Breakdown",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_response
+
+def _repayment_timing_figure():
+    repay_delay = pd.DataFrame({
+        "Delay (Days)": ["0–1", "2–3", "4–7", "8–14", "15+"],
+        "Paid Count": [350, 420, 300, 180, 90]
+    })
+    fig_repay = px.bar(
+        repay_delay,
+        x="Delay (Days)",
+        y="Paid Count",
+        title="Repayment after Reminder Timing",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_repay
+
+def _avoidance_figure(cube):
+    avoid = rollup(cube, ["region"], where={"response_behavior": "Ignored"}, name="Ignored Count")
+    fig_avoid = px.bar(
+        avoid,
+        x="region",
+        y="Ignored Count",
+        color="region",
+        title="Avoidance by Region",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_avoid
+
+def _income_figure(bins):
+    fig_cash = histogram_figure(
+        bins,
+        x="monthly_income",
+        title="Monthly Income Distribution",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_cash
+
+def _channel_behavior_figure(cube):
+    chan_beh = rollup(cube, ["contact_channel", "response_behavior"], name="Count")
+    fig_chan = px.bar(
+        chan_beh,
+        x="contact_channel",
+        y="Count",
+        color="response_behavior",
+        barmode="group",
+        title="Contact Channel Performance by Behavior",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_chan
+
+def _tag_figure(tags):
+    fig_tags = px.bar(
+        tags,
+        x="AI Tag",
+        y=["Messages", "Accounts"],
+        barmode="group",
+        title="Tagged Conversations",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_tags
+
+def render(df):
+    cube = load_cube()
+
+    st.title(" Behavioral Insights Dashboard")
+    if not total(cube):
+        empty_notice()
+        return
+
+    st.markdown("###  Response Behavior")
+    st.plotly_chart(cached_figure("behavioral.response", lambda: _response_figure(cube)), use_container_width=True)
+
+    st.markdown("###  Repayment Timing")
+    st.plotly_chart(cached_figure("behavioral.repayment_timing", _repayment_timing_figure, version="static"), use_container_width=True)
+
+    st.markdown("###  Avoidance Pattern")
+    st.plotly_chart(cached_figure("behavioral.avoidance", lambda: _avoidance_figure(cube)), use_container_width=True)
+
+    st.markdown("###  Cash Flow Pattern")
+    bins = load_bins("monthly_income", 30)
+    full_range = (float(bins["left"].iloc[0]), float(bins["right"].iloc[-1]))
+    # drill-down: re-bin the selected income range on the server
+    income_range = st.slider("Income range", *full_range, value=full_range)
+    if income_range != full_range:
+        bins = load_bins("monthly_income", 30, income_range)
+    st.plotly_chart(
+        cached_figure("behavioral.income", lambda: _income_figure(bins), params={"range": income_range}),
+        use_container_width=True
+    )
+
+    st.markdown("###  Channel vs Behavior")
+    st.plotly_chart(cached_figure("behavioral.channel_behavior", lambda: _channel_behavior_figure(cube)), use_container_width=True)
+
+    st.markdown("###  AI Insight Panel – NLP Behavior Tags")
+    st.info("AI analyzes conversation logs and assigns behavioral tags for smarter journey orchestration.")
+
+    totals = load_tag_totals()
+    if totals is None:
+        st.caption("No conversation logs tagged yet: run `python flowen_tagging.py <logs>`.")
+    else:
+        tags = pd.DataFrame({
+            "AI Tag": list(TAG_COLUMNS),
+            "Messages": totals["messages"].to_numpy(),
+            "Accounts": totals["accounts"].to_numpy()
+        })
+        st.plotly_chart(cached_figure("behavioral.nlp_tags", lambda: _tag_figure(tags)), use_container_width=True)
+
+    ai_tags = pd.DataFrame({
+        "AI Tag": list(TAG_PHRASES),
+        "Sample Phrases": [", ".join(phrases[:3]) for phrases in TAG_PHRASES.values()],
+        "Recommended Action": [TAG_ACTIONS[tag] for tag in TAG_PHRASES]
+    })
+    st.dataframe(ai_tags)
+
+    # the same automaton the batch tagger runs
+    message = st.text_input("Try a message", placeholder="ขอเลื่อน 3 วัน")
+    if message:
+        found = get_automaton().tag(message)
+        st.write("AI Tag: " + (", ".join(found) if found else "none"))
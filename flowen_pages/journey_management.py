@@ -0,0 +1,226 @@
+
+import streamlit as st
+import streamlit.components.v1 as components
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from flowen_bins import histogram_figure
+from flowen_cube import rollup, total, value_counts
+from flowen_data import load_bins, load_cube, sample_accounts, top_accounts
+from flowen_export import export_panel
+from flowen_figures import cached_figure
+from flowen_filters import empty_notice
+from flowen_topk import RANKINGS
+
+# Table Style
+def styled_table(df):
+    return f"""
+    <style>
+    .custom-table {{
+        border-collapse: collapse;
+        width: 100%;
+        font-size: 14px;
+        font-family: 'Arial', sans-serif;
+        border-radius: 12px;
+        overflow: hidden;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+    }}
+    .custom-table thead {{
+        background-color: #EDF0FB;
+        color: #222;
+        text-align: left;
+    }}
+    .custom-table th, .custom-table td {{
+        padding: 12px 16px;
+        border-bottom: 1px solid #ddd;
+    }}
+    .custom-table tbody tr:nth-child(even) {{
+        background-color: #F8FBFF;
+    }}
+    </style>
+    {df.to_html(classes='custom-table', index=False, escape=False)}
+    """
+
+# ─── Chart Builders ───
+# Only called on a figure-cache miss (see flowen_figures).
+def _funnel_figure(cube):
+    funnel_data = pd.DataFrame({
+        "Stage": ["Uncontacted", "Contacted", "Promise to Pay", "Paid"],
+        "Count": [
+            total(cube, where={"response_behavior": "Silent"}),
+            total(cube, where={"response_behavior": ["Responsive", "Slow", "Ignored"]}),
+            total(cube, where={"status_paid": "In Progress"}),
+            total(cube, where={"status_paid": "Paid"}),
+        ]
+    })
+    fig_funnel = px.bar(funnel_data, x="Stage", y="Count", text="Count", color_discrete_sequence=["#0B5394"])
+    fig_funnel.update_traces(textposition="outside")
+    return fig_funnel
+
+def _trend_figure():
+    line_data = pd.DataFrame({
+        "Month": ["Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct"],
+        "Success Rate": [68, 69, 70, 71, 72, 73, 74],
+        "Rraterie": [48, 49, 50, 50, 51, 52, 53],
+        "Drop-off Rate": [28, 27, 26, 25, 24, 23, 22]
+    })
+    fig_line = go.Figure()
+    fig_line.add_trace(go.Scatter(x=line_data["Month"], y=line_data["Success Rate"], mode="lines", name="Success Rate"))
+    fig_line.add_trace(go.Scatter(x=line_data["Month"], y=line_data["Rraterie"], mode="lines", name="Rraterie"))
+    fig_line.add_trace(go.Scatter(x=line_data["Month"], y=line_data["Drop-off Rate"], mode="lines", name="Drop-off Rate"))
+    return fig_line
+
+def _time_in_journey_figure():
+    risk_journey_time = pd.DataFrame({
+        "Risk Level": ["Low", "Medium", "High"],
+        "Avg Days in Journey": [2.5, 4.2, 6.7]
+    })
+    fig_time = px.bar(
+        risk_journey_time,
+        x="Risk Level",
+        y="Avg Days in Journey",
+        color="Risk Level",
+        color_discrete_sequence=["#0984E3", "#00A2C2", "#00B894"]
+    )
+    return fig_time
+
+def _confidence_figure(bins):
+    fig_conf = histogram_figure(
+        bins,
+        x="ai_confidence",
+        title="AI Confidence Score",
+        color_discrete_sequence=["#0B5394"]
+    )
+    return fig_conf
+
+STUCK_COLUMNS = {
+    "account_id": "Account ID", "name": "Name", "dpd": "Days Past Due",
+    "risk_level": "Risk Level", "last_payment_days_ago": "Last Payment (Days Ago)",
+    "contact_channel": "Contact Channel"
+}
+
+def render(df):
+    cube = load_cube()
+
+    st.title("Journey Management Dashboard")
+
+    # KPI Cards
+    total_customers = total(cube)
+    if not total_customers:
+        empty_notice()
+        return
+    engaged_customers = total(cube, where={"response_behavior": ["Responsive", "Slow"]})
+    engagement_rate = round((engaged_customers / total_customers) * 100, 1)
+    active_journeys = total(cube, "dpd_positive")
+
+    cols = st.columns(3)
+    metrics = [
+        ("Total Customers", f"{total_customers:,}"),
+        ("Engagement Rate", f"{engagement_rate}%"),
+        ("Active Journeys", f"{active_journeys:,}")
+    ]
+    for col, (label, value) in zip(cols, metrics):
+        col.metric(label, value)
+
+    # Funnel + Line
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(cached_figure("journey.funnel", lambda: _funnel_figure(cube)), use_container_width=True)
+
+    with col2:
+        st.plotly_chart(cached_figure("journey.trend", _trend_figure, version="static"), use_container_width=True)
+
+    # --- Current Journeys ---
+    st.markdown("### Current Journeys")
+    journey_summary = value_counts(cube, "journey_type")
+    journey_summary.columns = ["Journey Type", "Total Customers"]
+    components.html(styled_table(journey_summary), height=300, scrolling=True)
+
+    # Time in Journey by Risk Level
+    # st.markdown("### Time in Journey by Risk Level")
+    # risk_journey_time = pd.DataFrame({
+     #   "Risk Level": ["Low", "Medium", "High"],
+     #   "Avg Days in Journey": [2.5, 4.2, 6.7]
+    #})
+    #fig_time = px.bar(risk_journey_time, x="Risk Level", y="Avg Days in Journey", color="Risk Level", color_discrete_sequence=["#0984E3", "#00A2C2", "#00B894"])
+    #st.plotly_chart(fig_time, use_container_width=True)
+
+    # Time in Journey & Confidence Score (2 Columns)
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("### Time in Journey by Risk Level")
+        st.plotly_chart(cached_figure("journey.time_in_journey", _time_in_journey_figure, version="static"), use_container_width=True)
+
+    with col2:
+        st.markdown("### 📊 Journey Confidence Score Distribution")
+        bins = load_bins("ai_confidence", 20)
+        full_range = (float(bins["left"].iloc[0]), float(bins["right"].iloc[-1]))
+        confidence_range = st.slider("Confidence range", *full_range, value=full_range)
+        if confidence_range != full_range:
+            bins = load_bins("ai_confidence", 20, confidence_range)
+        st.plotly_chart(
+            cached_figure("journey.confidence", lambda: _confidence_figure(bins), params={"range": confidence_range}),
+            use_container_width=True
+        )
+
+
+    # Stuck Accounts
+    st.markdown("### Stuck Accounts Alert")
+    stuck_accounts = top_accounts("stuck_accounts", 5)
+    if not stuck_accounts.empty:
+        stuck_df = stuck_accounts[list(STUCK_COLUMNS)].rename(columns=STUCK_COLUMNS)
+        st.markdown(styled_table(stuck_df), unsafe_allow_html=True)
+        # the whole list, in the same order as the top 5
+        stuck = RANKINGS["stuck_accounts"]
+        export_panel("stuck_accounts", "Stuck Accounts", STUCK_COLUMNS,
+                     where=stuck["where"], sort=(stuck["column"], stuck["ascending"]))
+    else:
+        st.markdown("<p>No overdue accounts found.</p>", unsafe_allow_html=True)
+
+    # --- AI Journey Recommendation (Sample) ---
+    st.markdown("### AI Journey Recommendation (Sample)")
+
+    # สุ่ม 5 ตัวอย่างจากข้อมูลจริง
+    rec_sample = sample_accounts(["account_id", "name", "risk_level", "response_behavior", "ai_confidence"], 5).copy()
+    rec_sample["AI Recommended Journey"] = rec_sample["risk_level"].map({
+        "Low": "LINE Reminder A",
+        "Medium": "LINE Reminder B",
+        "High": "Voice Prompt"
+    })
+    rec_sample = rec_sample.rename(columns={
+        "account_id": "Account ID",
+        "name": "Name",
+        "risk_level": "Risk Level",
+        "response_behavior": "Behavior",
+        "ai_confidence": "Confidence (%)"
+    })
+
+    # ใช้ styled_table เพื่อสร้าง HTML table ที่สวยงาม
+    styled_html = styled_table(rec_sample)
+
+    # แสดงผลผ่าน components.html เพื่อให้ render สวยงามจริง
+    components.html(styled_html, height=400, scrolling=True)
+
+    # --- Conversion Rate by Journey Type ---
+    st.markdown("### 🔍 Conversion Rate by Journey Type (%)")
+
+    # สร้างตารางจากข้อมูลจริง
+    journey_status = rollup(cube, ["journey_type", "status_paid"]).pivot(
+        index="journey_type", columns="status_paid", values="count"
+    ).fillna(0)
+    conversion = journey_status.div(journey_status.sum(axis=1), axis=0) * 100
+    conversion = conversion.round(1).reset_index()
+
+    # ใช้ styled_table เพื่อ render เป็น HTML
+    styled_html = styled_table(conversion)
+
+    # แสดง HTML table สวยงามด้วย components.html
+    components.html(styled_html, height=300, scrolling=True)
+
+
+    # --- Confidence Histogram ---
+    #st.markdown("### 📊 Journey Confidence Score Distribution")
+    #fig_conf = px.histogram(df, x="ai_confidence", nbins=20, title="AI Confidence Score", color_discrete_sequence=["#0B5394"])
+    #st.plotly_chart(fig_conf, use_container_width=True)
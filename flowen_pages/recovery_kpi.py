@@ -0,0 +1,160 @@
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from flowen_data import (
+    filter_options, load_cube, load_forecast, load_forecast_model, load_leaderboard, load_recovery
+)
+from flowen_cube import total
+from flowen_figures import cached_figure
+from flowen_filters import empty_notice
+from flowen_forecast import JOURNEYS, journey_effectiveness
+from flowen_pages import flowen_colors
+from flowen_recovery import channel_effectiveness, daily_recovery, month_to_date, recovery_by_risk
+
+# ─── Chart Builders ───
+# Only called on a figure-cache miss (see flowen_figures).
+def _trend_figure(series):
+    trend_data = daily_recovery(series, days=30, rolling=7)
+    fig_trend = px.line(
+        trend_data,
+        x="Date",
+        y=["Recovered", "7-day Avg"],
+        markers=True,
+        title="Daily Recovery Trend",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_trend
+
+def _channel_figure(series):
+    channel_perf = channel_effectiveness(series)
+    fig_bar = px.bar(
+        channel_perf,
+        x="Channel",
+        y="Success Rate (%)",
+        color="Channel",
+        hover_data=["Avg Recovery per Case"],
+        title="Channel Success Rate",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_bar
+
+def _risk_segment_figure(series):
+    risk_seg = recovery_by_risk(series)
+    fig_seg = px.bar(
+        risk_seg,
+        x="Risk Level",
+        y="Recovery Rate (%)",
+        color="Risk Level",
+        title="Recovery Rate by Risk Group",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_seg
+
+def _funnel_figure():
+    funnel_data = pd.DataFrame({
+        "Stage": ["Messaged", "Opened", "Responded", "Promised to Pay", "Paid"],
+        "Count": [18000, 14400, 9100, 3400, 1850]
+    })
+    fig_funnel = px.funnel(
+        funnel_data,
+        x="Count",
+        y="Stage",
+        title="End-to-End Recovery Funnel",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_funnel
+
+def _forecast_figure(totals, horizon):
+    trials = totals.melt(var_name="Scenario", value_name="Recovered (฿)")
+    fig_forecast = px.histogram(
+        trials,
+        x="Recovered (฿)",
+        color="Scenario",
+        barmode="overlay",
+        nbins=40,
+        title=f"Simulated Recovery, Next {horizon} Days",
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_forecast
+
+def render(df):
+    series = load_recovery()
+    mtd = month_to_date(series)
+    board = load_leaderboard()
+
+    st.title(" Recovery KPI Dashboard")
+    if not total(load_cube()):
+        empty_notice()
+        return
+
+    st.markdown("###  Recovery Overview (Month-to-date)")
+    if pd.isna(mtd["as_of"]):
+        st.info("No payments recorded for the accounts within the current filters.")
+    else:
+        st.caption(f"As of {mtd['as_of']:%d %b %Y}, the latest payment date in the portfolio")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Recovered", f"฿{mtd['recovered_amount']:,.0f}")
+    col2.metric("Recovery Rate", f"{mtd['recovery_rate']:.1f}%")
+    col3.metric("Avg. DPD at Recovery", f"{mtd['avg_dpd_at_recovery']:.1f} days")
+    col4.metric("Active Collectors", "–" if board is None else int((board["Accounts"] > 0).sum()))
+
+    st.plotly_chart(cached_figure("recovery.trend", lambda: _trend_figure(series)), use_container_width=True)
+
+    st.markdown("###  Channel Effectiveness")
+    st.plotly_chart(cached_figure("recovery.channel", lambda: _channel_figure(series)), use_container_width=True)
+
+    st.markdown("###  Collector Leaderboard")
+    if board is None:
+        st.caption("No collector roster loaded: set `FLOWEN_COLLECTORS` to a roster CSV (in-memory backend only).")
+    else:
+        st.caption("Stuck and high-risk accounts assigned by expected recovery, within each collector's capacity. "
+                   "Every column covers the accounts within the current filters; past recovery is weighted by debt.")
+        st.dataframe(board)
+
+    st.markdown("###  Recovery by Risk Level")
+    st.plotly_chart(cached_figure("recovery.risk_segment", lambda: _risk_segment_figure(series)), use_container_width=True)
+
+    st.markdown("###  Recovery Conversion Funnel")
+    st.plotly_chart(cached_figure("recovery.funnel", _funnel_figure, version="static"), use_container_width=True)
+
+    st.markdown("###  AI Journey Effectiveness")
+    journeys = journey_effectiveness(load_cube(), load_forecast_model())
+    st.dataframe(journeys)
+    best = journeys.sort_values("Lift vs Risk Mix", ascending=False).iloc[0]
+    st.success(
+        f" Insight: {best['Journey']} recovers {best['Lift vs Risk Mix']:.2f}× what its risk mix predicts, "
+        f"strongest in the {best['Best Segment']} group. Consider promoting this journey."
+    )
+
+    st.markdown("###  Recovery Forecast")
+    col1, col2 = st.columns(2)
+    horizon = col1.slider("Horizon (days)", 7, 90, 30)
+    trials = col2.select_slider("Trials", [200, 500, 1000, 2000], value=1000)
+    with st.expander("What-if: move a segment to another journey"):
+        levels = st.multiselect("Risk level", filter_options().get("risk_level", []))
+        target = st.selectbox("New journey", JOURNEYS)
+    reassign = {"where": {"risk_level": ("in", tuple(levels))}, "journey_type": target} if levels else None
+
+    forecast = load_forecast(trials, horizon, reassign)
+    if forecast is None:
+        st.caption("No accounts within the current filters.")
+        return
+    totals = forecast["totals"]
+    baseline = totals["Baseline"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Expected Recovery", f"฿{baseline.mean():,.0f}", f"{baseline.mean() / forecast['balance'] * 100:.1f}% of balance", delta_color="off")
+    col2.metric("P10 – P90", f"฿{baseline.quantile(0.1):,.0f} – ฿{baseline.quantile(0.9):,.0f}")
+    if reassign is not None:
+        # same draws in both scenarios: the per-trial difference is the effect
+        change = totals["What-if"] - baseline
+        col3.metric("What-if Change", f"฿{change.mean():+,.0f}", f"P10 ฿{change.quantile(0.1):+,.0f} · P90 ฿{change.quantile(0.9):+,.0f}", delta_color="off")
+    st.plotly_chart(
+        cached_figure(
+            "recovery.forecast", lambda: _forecast_figure(totals, horizon),
+            params={"trials": trials, "horizon": horizon, "reassign": reassign}
+        ),
+        use_container_width=True
+    )
+    st.dataframe(forecast["segments"].round({"Expected (฿)": 0, "P10 (฿)": 0, "P90 (฿)": 0}))
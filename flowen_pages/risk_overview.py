@@ -0,0 +1,339 @@
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from flowen_cube import rollup, total, value_counts
+from flowen_data import (
+    data_version, filter_rows, load_account, load_cube, search_accounts, select_accounts, top_accounts
+)
+from flowen_figures import cached_figure
+from flowen_filters import empty_notice
+from flowen_metrics import section
+from flowen_pages import flowen_colors
+from flowen_export import export_panel
+from flowen_table import paged_table
+
+# ─── Chart Builders ───
+# Only called on a figure-cache miss (see flowen_figures).
+def _segment_figure(cube):
+    segment_data = value_counts(cube, "response_behavior")
+    segment_data.columns = ["Segment", "Count"]
+    fig_segment = px.pie(
+        segment_data,
+        names="Segment",
+        values="Count",
+        hole=0.4,
+        title="Behavior-Based Segmentation",
+        color_discrete_sequence=flowen_colors
+    )
+    fig_segment.update_traces(textinfo='label+percent')
+    return fig_segment
+
+def _loan_type_figure(cube):
+    loan_dist = value_counts(cube, "loan_type")
+    loan_dist.columns = ["Loan Type", "Count"]
+    fig_loan = px.pie(
+        loan_dist,
+        names="Loan Type",
+        values="Count",
+        hole=0.0,
+        title="Loan Type Breakdown",
+        color_discrete_sequence=flowen_colors
+    )
+    fig_loan.update_traces(textinfo='label+percent', textposition='outside', textfont_size=10)
+    return fig_loan
+
+def _age_dpd_figure(cube):
+    age_dpd = rollup(cube, ["age_group"], "dpd", how="mean")
+    fig_age = px.bar(
+        age_dpd,
+        x="age_group",
+        y="dpd",
+        title="Avg DPD by Age Group",
+        labels={"dpd": "Avg DPD", "age_group": "Age Group"},
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_age
+
+def _risk_recovery_figure(cube):
+    recovery_risk = rollup(cube, ["risk_level"], "recovered", how="mean")
+    recovery_risk.columns = ["Risk Level", "Recovery Rate"]
+    recovery_risk["Recovery Rate"] = recovery_risk["Recovery Rate"] * 100
+
+    fig_risk_recovery = px.bar(
+        recovery_risk,
+        x="Risk Level",
+        y="Recovery Rate",
+        text="Recovery Rate",
+        color="Risk Level",
+        color_discrete_sequence=flowen_colors,
+        title="Recovery Rate by Risk Level"
+    )
+    fig_risk_recovery.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    fig_risk_recovery.update_layout(yaxis_title="Recovery Rate (%)")
+    return fig_risk_recovery
+
+def _journey_segment_figure(cube):
+    journey_segment = rollup(cube, ["journey_type", "response_behavior"], name="Count")
+    fig_journey_seg = px.bar(
+        journey_segment,
+        x="journey_type",
+        y="Count",
+        color="response_behavior",
+        title="Journey Assignment vs Debtor Behavior",
+        barmode="group",
+        color_discrete_sequence=flowen_colors
+    )
+    fig_journey_seg.update_layout(xaxis_title="Journey Type", yaxis_title="Debtor Count")
+    return fig_journey_seg
+
+def _risk_region_figure(cube):
+    risk_region = rollup(cube, ["region", "risk_level"], name="Accounts")
+    fig_heatmap = px.density_heatmap(
+        risk_region,
+        x="region",
+        y="risk_level",
+        z="Accounts",
+        color_continuous_scale="YlOrBr" ,
+        title="Concentration of Risk Levels Across Regions"
+    )
+    return fig_heatmap
+
+def _journey_risk_figure(cube):
+    journey_risk = rollup(cube, ["risk_level", "journey_type"], name="Count")
+    fig_journey_risk = px.bar(
+        journey_risk,
+        x="risk_level",
+        y="Count",
+        color="journey_type",
+        barmode="stack",
+        title="Journey Allocation by Risk Group",
+        labels={"risk_level": "Risk Level", "journey_type": "Journey Type"},
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_journey_risk
+
+def _behavior_risk_figure(cube):
+    behav_risk = rollup(cube, ["risk_level", "response_behavior"], name="Count")
+    fig_behav = px.bar(
+        behav_risk,
+        x="risk_level",
+        y="Count",
+        color="response_behavior",
+        barmode="group",
+        title="Behavior Types by Risk Level",
+        labels={"risk_level": "Risk Level", "response_behavior": "Behavior"},
+        color_discrete_sequence=flowen_colors
+    )
+    return fig_behav
+
+DEBTOR_COLUMNS = {
+    "account_id": "Account ID",
+    "name": "Name",
+    "risk_score": "Risk Score",
+    "total_debt": "Outstanding (฿)",
+    "dpd": "Days Past Due",
+    "loan_type": "Loan Type",
+    "region": "Region",
+    "risk_level": "Risk Level",
+    "journey_type": "Assigned Journey"
+}
+
+# Dates are datetime64 in memory (flowen_schema) and text out of core
+def _day(value):
+    return "—" if pd.isna(value) else f"{pd.Timestamp(value):%Y-%m-%d}"
+
+def render(df):
+    with section("load_cube") as timing:
+        cube = load_cube()
+        timing["rows"] = len(cube)
+    total_accounts = total(cube)
+
+    st.title("Risk Overview")
+    if not total_accounts:
+        empty_notice()
+        return
+
+    # ─── Top Metrics Cards ───
+    with st.container(), section("metrics", rows=len(cube)):
+        cols = st.columns(4)
+        metrics = [
+            ("Accounts Contacted Today", f"{total_accounts}"),
+            ("Responses Received", f"{total(cube, where={'response_behavior': ['Responsive', 'Slow']})}"),
+            ("Active Conversations", f"{total(cube, 'dpd_positive')}"),
+            ("Paid Within 24h", f"{total(cube, where={'status_paid': 'Paid'})/total_accounts*100:.1f}%")
+        ]
+        for col, (label, value) in zip(cols, metrics):
+            with col:
+                st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+                st.metric(label, value)
+                st.markdown("</div>", unsafe_allow_html=True)
+
+    # ─── AI Suggestion Feed ───
+    with st.container(), section("ai_feed", rows=len(df)):
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.markdown("### 🤖 AI Suggestion Feed")
+        with st.expander("Top 5 Accounts Likely to Pay in 48h"):
+            st.table(top_accounts("likely_to_pay", 5)[[
+                "account_id", "name", "risk_score", "loan_type", "contact_channel"
+            ]].rename(columns={
+                "account_id": "Account ID", "name": "Name", "risk_score": "Risk Score",
+                "loan_type": "Loan Type", "contact_channel": "Contact Channel"
+            }))
+        with st.expander("Accounts Ignored All Contact for 7+ Days"):
+            ignored_df = select_accounts(
+                {"response_behavior": "Ignored", "last_payment_days_ago": (">", 7)},
+                ["account_id", "name", "risk_score", "last_payment_days_ago", "region"],
+                limit=5
+            )
+            st.dataframe(ignored_df.rename(columns={
+                "account_id": "Account ID",
+                "name": "Name",
+                "risk_score": "Risk Score",
+                "last_payment_days_ago": "Last Payment (Days Ago)",
+                "region": "Region"
+            }), use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ─── 3 Column Segmentation View ───
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        with st.container(), section("segment", rows=len(cube)):
+            st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+            st.markdown("### Debtor Segment Overview")
+            st.plotly_chart(cached_figure("risk_overview.segment", lambda: _segment_figure(cube)), use_container_width=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    with col2:
+        with st.container(), section("loan_type", rows=len(cube)):
+            st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+            st.markdown("### Loan Type Distribution")
+            st.plotly_chart(cached_figure("risk_overview.loan_type", lambda: _loan_type_figure(cube)), use_container_width=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    with col3:
+        with st.container(), section("age_dpd", rows=len(cube)):
+            st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+            st.markdown("### Payment Delay by Age Group")
+            st.plotly_chart(cached_figure("risk_overview.age_dpd", lambda: _age_dpd_figure(cube)), use_container_width=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+
+    # ─── Debtor Summary & Profile Viewer ───
+    col_summary, col_profile = st.columns([2, 1])
+
+    with col_summary:
+        with st.container(), section("debtor_summary", rows=len(df)):
+            st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+            st.markdown("### 📋 Debtor Summary Table")
+            paged_table(df, DEBTOR_COLUMNS, key="debtor_summary", version=data_version(),
+                        search_columns=["account_id", "name"], rows=filter_rows())
+            # every account in the sidebar filters, written in the background
+            export_panel("debtor_summary", "Debtor Summary", DEBTOR_COLUMNS)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    with col_profile:
+        with st.container(), section("profile_viewer"):
+            st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+            st.markdown("### 👤 Debtor Profile Viewer")
+            # Server-side typeahead: only the first 20 matches reach the browser
+            query = st.text_input("Search Account ID or Name", placeholder="e.g. ACCT00012 or User_12")
+            matches = search_accounts(query, limit=20)
+            names = dict(zip(matches["account_id"], matches["name"]))
+            selected_id = st.selectbox(
+                "Select Account ID",
+                list(names),
+                format_func=lambda account_id: f"{account_id} — {names[account_id]}"
+            )
+            debtor = None if selected_id is None else load_account(selected_id)
+
+            if debtor is None:
+                st.info("No matching accounts.")
+            else:
+                st.markdown(f"**Name:** {debtor['name']}")
+                st.markdown(f"**Account ID:** {debtor['account_id']}")
+                st.markdown(f"**Journey Type:** {debtor['journey_type']}")
+                st.markdown(f"**Risk Score:** {debtor['risk_score']:.1f} | **Risk Level:** {debtor['risk_level']}")
+                st.markdown(f"**Outstanding Debt:** ฿{debtor['total_debt']:,}")
+                st.markdown(f"**Days Past Due (DPD):** {debtor['dpd']} days")
+                st.markdown(f"**Region:** {debtor['region']} | **Loan Type:** {debtor['loan_type']}")
+                st.markdown(f"**Response Behavior:** {debtor['response_behavior']}")
+                st.markdown(f"**Confidence Score:** {debtor['ai_confidence']:.1f}%")
+                st.markdown(f"**Last Payment Date:** {_day(debtor['last_payment_date'])}  \n**Last Contact:** {_day(debtor.get('last_contact_date'))}")
+            st.markdown("</div>", unsafe_allow_html=True)
+    # ─── Risk vs Recovery Rate ───
+    with st.container(), section("risk_recovery", rows=len(cube)):
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.markdown("### 📈 Risk Level vs Recovery Rate")
+        st.plotly_chart(cached_figure("risk_overview.risk_recovery", lambda: _risk_recovery_figure(cube)), use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ─── Journey Effectiveness by Segment ───
+    with st.container(), section("journey_segment", rows=len(cube)):
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.markdown("### 🚀 Journey Effectiveness by Segment")
+
+        st.plotly_chart(cached_figure("risk_overview.journey_segment", lambda: _journey_segment_figure(cube)), use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ─── AI Risk Score vs Region (Behavioral Heatmap) ───
+    with st.container(), section("risk_region", rows=len(cube)):
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.markdown("### 🌏 Risk Score Heatmap by Region")
+        st.plotly_chart(cached_figure("risk_overview.risk_region", lambda: _risk_region_figure(cube)), use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ─── Insight Panel ───
+    with st.container(), section("insights", rows=len(cube)):
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.markdown("### 🧠 Key Risk Insights Summary")
+
+        high_risk_count = total(cube, where={"risk_level": "High"})
+        stuck_count = total(cube, "dpd_over_30")
+        responsive_rate = total(cube, where={"response_behavior": "Responsive"}) / total_accounts * 100
+
+        st.info(f"""
+        - **{high_risk_count:,} accounts** are classified as **High Risk**
+        - **{stuck_count:,} accounts** have **DPD > 30** and may need escalated action
+        - **Responsive rate** across all accounts is **{responsive_rate:.1f}%**
+        - Highest recovery observed in **Medium Risk** group with **LINE Reminder B**
+        """)
+        st.markdown("</div>", unsafe_allow_html=True)
+    # ─── Risk-Level Summary Card ───
+    with st.container(), section("risk_summary", rows=len(cube)):
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.markdown("### 📌 Risk-Level Portfolio Summary")
+
+        col_r1, col_r2, col_r3 = st.columns(3)
+
+        with col_r1:
+            total_high_risk = total(cube, where={"risk_level": "High"})
+            st.metric("High Risk Accounts", f"{total_high_risk:,}")
+        with col_r2:
+            total_med_risk = total(cube, where={"risk_level": "Medium"})
+            st.metric("Medium Risk Accounts", f"{total_med_risk:,}")
+        with col_r3:
+            total_low_risk = total(cube, where={"risk_level": "Low"})
+            st.metric("Low Risk Accounts", f"{total_low_risk:,}")
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ─── Risk Group vs Journey Strategy ───
+    with st.container(), section("journey_risk", rows=len(cube)):
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.markdown("### 🧭 Journey Strategy by Risk Group")
+
+        st.plotly_chart(cached_figure("risk_overview.journey_risk", lambda: _journey_risk_figure(cube)), use_container_width=True)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ─── Risk vs Behavior Insight ───
+    with st.container(), section("behavior_risk", rows=len(cube)):
+        st.markdown("<div class='stCard'>", unsafe_allow_html=True)
+        st.markdown("### 🧠 Behavior Pattern by Risk")
+
+        st.plotly_chart(cached_figure("risk_overview.behavior_risk", lambda: _behavior_risk_figure(cube)), use_container_width=True)
+
+        st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,89 @@
+
+import pandas as pd
+
+from flowen_cube import build_cube, rollup
+
+# ─── Recovery Series ─────────────────────────────────────────────
+# Day buckets of payment activity: one row per (last_payment_date day,
+# contact channel, risk level) holding account counts and recovered sums.
+# It is an additive cube (flowen_cube), so the resident store moves it
+# with merge_cubes when payment events arrive, and every KPI below reads
+# only the buckets of its window, never the accounts.
+RECOVERY_DIMENSIONS = ["payment_day", "contact_channel", "risk_level"]
+RECOVERY_MEASURES = ["total_debt", "recovered", "recovered_amount", "recovered_dpd"]
+# Account columns the series is built from
+RECOVERY_SOURCE = ["last_payment_date", "total_debt", "recovered", "dpd", *RECOVERY_DIMENSIONS[1:]]
+
+def add_recovery_fields(df):
+    frame = df.copy(deep=False)
+    frame["payment_day"] = pd.to_datetime(frame["last_payment_date"], errors="coerce").dt.normalize()
+    # the balance of a recovered account counts as recovered on its last payment day
+    frame["recovered_amount"] = frame["total_debt"] * frame["recovered"]
+    frame["recovered_dpd"] = frame["dpd"] * frame["recovered"]
+    return frame
+
+def build_recovery_series(df):
+    return build_cube(add_recovery_fields(df), RECOVERY_DIMENSIONS, RECOVERY_MEASURES, flags={})
+
+# ─── Windows ─────────────────────────────────────────────────────
+# The mock book has no live clock, so "today" is the latest payment day;
+# NaT when the series has no payments (e.g. a filter matching no account),
+# in which case the windows below are empty.
+def as_of(series):
+    return series["payment_day"].max()
+
+def window(series, start=None, end=None):
+    days = series["payment_day"]
+    mask = days.notna()
+    if start is not None:
+        mask &= days >= start
+    if end is not None:
+        mask &= days <= end
+    return series[mask]
+
+def month_to_date(series, day=None):
+    day = as_of(series) if day is None else day
+    if pd.isna(day):
+        return {"as_of": day, "recovered_amount": 0.0, "recovery_rate": 0.0, "avg_dpd_at_recovery": 0.0, "accounts": 0}
+    buckets = window(series, day.replace(day=1), day)
+    accounts = buckets["count"].sum()
+    recovered = buckets["sum_recovered"].sum()
+    return {
+        "as_of": day,
+        "recovered_amount": buckets["sum_recovered_amount"].sum(),
+        "recovery_rate": recovered / accounts * 100 if accounts else 0.0,
+        "avg_dpd_at_recovery": buckets["sum_recovered_dpd"].sum() / recovered if recovered else 0.0,
+        "accounts": int(accounts),
+    }
+
+# Recovered amount per day over the last `days` days, with empty days as 0
+# and a trailing rolling mean over `rolling` days.
+def daily_recovery(series, days=30, rolling=7, day=None):
+    day = as_of(series) if day is None else day
+    if pd.isna(day):
+        return pd.DataFrame({"Date": pd.DatetimeIndex([]), "Recovered": [], f"{rolling}-day Avg": []})
+    start = day - pd.Timedelta(days=days + rolling - 2)
+    buckets = window(series, start, day)
+    daily = buckets.groupby("payment_day")["sum_recovered_amount"].sum()
+    daily = daily.reindex(pd.date_range(start, day, freq="D"), fill_value=0)
+    frame = pd.DataFrame({
+        "Date": daily.index,
+        "Recovered": daily.to_numpy(),
+        f"{rolling}-day Avg": daily.rolling(rolling, min_periods=1).mean().to_numpy(),
+    })
+    return frame.iloc[rolling - 1:].reset_index(drop=True)
+
+# ─── Breakdowns ──────────────────────────────────────────────────
+def channel_effectiveness(series):
+    rate = rollup(series, ["contact_channel"], "recovered", how="mean", name="Success Rate (%)")
+    amount = rollup(series, ["contact_channel"], "recovered_amount", how="sum", name="amount")
+    cases = rollup(series, ["contact_channel"], "recovered", how="sum", name="cases")
+    result = rate.merge(amount, on="contact_channel").merge(cases, on="contact_channel")
+    result["Success Rate (%)"] = (result["Success Rate (%)"] * 100).round(1)
+    result["Avg Recovery per Case"] = (result["amount"] / result["cases"]).round(0)
+    return result.rename(columns={"contact_channel": "Channel"})[["Channel", "Success Rate (%)", "Avg Recovery per Case"]]
+
+def recovery_by_risk(series):
+    rate = rollup(series, ["risk_level"], "recovered", how="mean", name="Recovery Rate (%)")
+    rate["Recovery Rate (%)"] = (rate["Recovery Rate (%)"] * 100).round(1)
+    return rate.rename(columns={"risk_level": "Risk Level"})
@@ -0,0 +1,86 @@
+
+import os
+import threading
+import time
+import traceback
+
+# Seconds between checks for a changed source, new delta batches or a
+# rewritten dataset
+REFRESH_SECONDS = float(os.environ.get("FLOWEN_REFRESH_SECONDS", "5"))
+
+# ─── Snapshot ────────────────────────────────────────────────────
+# Everything a rerun reads, for one data version: the table (or the
+# out-of-core portfolio), its aggregates and its indexes. A snapshot is
+# never modified once published; `source` is the object the next snapshot
+# is built from and is only touched by the refresher thread. `alerts` is
+# the exception: a log shared by successive snapshots, safe to read from
+# any thread (flowen_alerts). `assignment` is the collector assignment of
+# the version (flowen_assign), when there is a roster.
+class Snapshot:
+    def __init__(self, version, data, cube, recovery, source=None, rankings=None, accounts=None, bitmaps=None,
+                 alerts=None, assignment=None):
+        self.version = version
+        self.data = data
+        self.cube = cube
+        self.recovery = recovery
+        self.source = source
+        self.rankings = rankings
+        self.accounts = accounts
+        self.bitmaps = bitmaps
+        self.alerts = alerts
+        self.assignment = assignment
+        self.built = time.time()
+
+# ─── Refresher ───────────────────────────────────────────────────
+# `build(previous)` returns the next snapshot, or None when nothing has
+# changed. Only the first build runs on the caller's thread; afterwards a
+# daemon thread rebuilds off the request path and publishes by swapping
+# `current`, a single reference assignment. A failed build keeps serving
+# the last good snapshot.
+class Refresher:
+    def __init__(self, build, interval=REFRESH_SECONDS):
+        self.build = build
+        self.interval = interval
+        self.current = build(None)
+        self.swaps = 0
+        self.last_error = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        if interval > 0:
+            threading.Thread(target=self._run, daemon=True, name="flowen-refresh").start()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.refresh()
+
+    # `full` rebuilds from the source even if nothing has changed
+    def refresh(self, full=False):
+        with self.lock:
+            try:
+                snapshot = self.build(None if full else self.current)
+            except Exception:
+                self.last_error = traceback.format_exc()
+                return False
+            if snapshot is None:
+                return False
+            self.current = snapshot
+            self.swaps += 1
+            return True
+
+    def stop(self):
+        self.stopped.set()
+
+# ─── Per-rerun Pinning ───────────────────────────────────────────
+# A rerun reads one snapshot from start to finish, even if a swap happens
+# meanwhile. Streamlit runs each rerun on its own script thread, so the
+# pin is thread-local; threads that never pin (CLIs, benchmarks) read the
+# latest snapshot.
+_local = threading.local()
+
+def pin(refresher):
+    _local.snapshot = refresher.current
+    return _local.snapshot
+
+def pinned(refresher):
+    snapshot = getattr(_local, "snapshot", None)
+    return refresher.current if snapshot is None else snapshot
@@ -0,0 +1,90 @@
+
+import operator
+
+import numpy as np
+import pandas as pd
+
+# ─── Rule Tables ─────────────────────────────────────────────────
+# Rules are evaluated top to bottom; the first matching rule wins and rows
+# matching nothing get the default. A condition is either a plain value
+# (equality) or an (operator, operand) tuple, e.g. {"dpd": ("<", 30)}.
+JOURNEY_RULES = [
+    {"when": {"risk_level": "High"}, "then": "Hardship Assistance"},
+    {"when": {"contact_channel": "LINE"}, "then": "Default Prevention"},
+    {"when": {"contact_channel": "Call"}, "then": "Promise to Pay Reinforcement"},
+]
+JOURNEY_DEFAULT = "General Follow-up"
+
+STATUS_PAID_RULES = [
+    {"when": {"dpd": ("==", 0)}, "then": "Paid"},
+    {"when": {"dpd": ("<", 30)}, "then": "In Progress"},
+]
+STATUS_PAID_DEFAULT = "Stuck"
+
+# ─── Rule Compiler ───────────────────────────────────────────────
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda s, values: s.isin(values),
+    "not in": lambda s, values: ~s.isin(values),
+}
+
+def _condition_mask(df, column, condition):
+    if isinstance(condition, tuple):
+        op, operand = condition
+    else:
+        op, operand = "==", condition
+    # NaN compares False under every operator, matching the row-wise rules
+    return np.asarray(OPERATORS[op](df[column], operand), dtype=bool)
+
+def conditions_mask(df, when):
+    mask = np.ones(len(df), dtype=bool)
+    for column, condition in when.items():
+        mask &= _condition_mask(df, column, condition)
+    return mask
+
+def compile_rules(rules, default):
+    # np.select over small integer codes, then one take into the label array;
+    # selecting over strings directly is an order of magnitude slower
+    labels = np.array([rule["then"] for rule in rules] + [default], dtype=object)
+    codes = list(range(len(rules)))
+    columns = sorted({col for rule in rules for col in rule["when"]})
+
+    def evaluate(df):
+        masks = [conditions_mask(df, rule["when"]) for rule in rules]
+        picked = np.select(masks, codes, default=len(rules))
+        return pd.Series(labels[picked], index=df.index, dtype=object)
+
+    evaluate.columns = columns
+    return evaluate
+
+# ─── SQL Translation ─────────────────────────────────────────────
+# The same tables as SQL expressions, for engines that query the portfolio
+# in place (flowen_ooc). NULL compares as unknown, so a missing value falls
+# through to the next rule exactly like NaN does above.
+def sql_literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+def conditions_sql(when):
+    parts = []
+    for column, condition in when.items():
+        op, operand = condition if isinstance(condition, tuple) else ("==", condition)
+        if op in ("in", "not in"):
+            operand = "(" + ", ".join(sql_literal(v) for v in operand) + ")"
+            parts.append(f'"{column}" {op.upper()} {operand}')
+        else:
+            parts.append(f'"{column}" {"=" if op == "==" else op} {sql_literal(operand)}')
+    return " AND ".join(parts) or "TRUE"
+
+def rules_sql(rules, default):
+    cases = " ".join(f"WHEN {conditions_sql(rule['when'])} THEN {sql_literal(rule['then'])}" for rule in rules)
+    return f"CASE {cases} ELSE {sql_literal(default)} END"
+
+assign_journey = compile_rules(JOURNEY_RULES, JOURNEY_DEFAULT)
+assign_status_paid = compile_rules(STATUS_PAID_RULES, STATUS_PAID_DEFAULT)
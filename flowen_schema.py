@@ -0,0 +1,95 @@
+
+import numpy as np
+import pandas as pd
+
+from flowen_cube import AGE_LABELS
+from flowen_tagging import TAG_COLUMNS
+
+# ─── Column Schema ───────────────────────────────────────────────
+# Resident dtype per column. Low-cardinality text is categorical, counts
+# and flags use the narrowest integer with headroom for delta batches,
+# scores are float32 and dates are parsed once. Money stays float64 so
+# portfolio totals keep their precision. Columns not listed (account_id,
+# name, …) keep the loader's dtype.
+CATEGORICAL = [
+    "loan_type", "region", "payment_frequency", "payment_channel", "last_contact_channel",
+    "occupation_type", "region_income_level", "loan_purpose", "stage_last_contacted",
+    "recommended_next_action", "contact_channel", "response_behavior", "risk_level", "dpd_bucket",
+    "income_level", "payment_pattern_score", "contact_success_rate", "seasonality_score",
+    "contact_availability_window", "journey_type", "status_paid",
+]
+SCHEMA = {
+    **{column: "category" for column in CATEGORICAL},
+    "age_group": pd.CategoricalDtype(AGE_LABELS, ordered=True),
+    "dpd": "int16",
+    "partial_payments_count": "int16",
+    "response_time_avg": "int16",
+    "touchpoints_count": "int16",
+    "age": "int16",
+    "last_payment_days_ago": "int16",
+    "credit_history_score": "int16",
+    "recovered": "int8",
+    "prior_restructuring_flag": "int8",
+    "is_first_default": "int8",
+    "risk_score": "float32",
+    "ai_risk_score": "float32",
+    "ai_confidence": "float32",
+    "bot_interaction_score": "float32",
+    "call_pickup_rate": "float32",
+    "total_debt": "float64",
+    "monthly_income": "float64",
+    "due_date": "datetime64[s]",
+    "last_payment_date": "datetime64[s]",
+    "last_contact_date": "datetime64[s]",
+    **{column: "int32" for column in TAG_COLUMNS.values()},
+}
+# Bump when SCHEMA changes so typed Parquet caches are rebuilt
+SCHEMA_VERSION = 2
+
+def _cast(series, dtype):
+    if str(dtype).startswith("datetime64"):
+        return pd.to_datetime(series, errors="coerce").astype(dtype)
+    if str(dtype).startswith("int") and series.isna().any():
+        # a missing count or flag cannot be narrowed without a sentinel
+        return series
+    return series.astype(dtype)
+
+# `categorical=False` parses dates and narrows numbers but leaves text as
+# is, for delta batches whose values are merged into existing categories.
+def apply_schema(df, categorical=True):
+    for column, dtype in SCHEMA.items():
+        if column not in df.columns:
+            continue
+        if not categorical and (dtype == "category" or isinstance(dtype, pd.CategoricalDtype)):
+            continue
+        df[column] = _cast(df[column], dtype)
+    return df
+
+# A column a batch adds to the book, for the rows it does not cover:
+# counts start at 0, anything else as missing
+def empty_column(column, rows):
+    dtype = SCHEMA.get(column)
+    if dtype is not None and str(dtype).startswith("int"):
+        return np.zeros(rows, dtype=dtype)
+    return np.full(rows, np.nan)
+
+# ─── Category Maintenance ────────────────────────────────────────
+# Categorical columns reject values outside their categories, so the
+# store widens a column before writing a batch that brings new labels.
+def extend_categories(df, column, values):
+    dtype = df[column].dtype
+    if not isinstance(dtype, pd.CategoricalDtype):
+        return df[column].dtype
+    new = pd.Index(pd.unique(pd.Series(values).dropna())).difference(dtype.categories)
+    if len(new):
+        df[column] = df[column].cat.add_categories(new)
+    return df[column].dtype
+
+# ─── Memory Report ───────────────────────────────────────────────
+def memory_report(df):
+    report = pd.DataFrame({
+        "dtype": df.dtypes.astype(str),
+        "bytes": df.memory_usage(deep=True, index=False),
+    })
+    report["share"] = (report["bytes"] / report["bytes"].sum() * 100).round(1)
+    return report.sort_values("bytes", ascending=False)
@@ -0,0 +1,106 @@
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+KEY = "account_id"
+
+# ─── Score Model ─────────────────────────────────────────────────
+# Logistic score over behavioural fields, as a weight table in the style
+# of flowen_rules. Each feature is mapped to 0–1 (numeric `scale` range or
+# categorical `levels`) and enters as weight × (value − 0.5). A higher
+# ai_risk_score means more likely to pay, which is how the dashboard ranks
+# "likely to pay" accounts. Missing fields (columns or cells) are neutral
+# and lower ai_confidence instead. The default flowen_mock_data_5000.csv
+# lacks credit_history_score, prior_restructuring_flag, is_first_default,
+# payment_pattern_score and contact_success_rate (7.0 of the 14.2 total
+# weight): its scores rest on contact behaviour and dpd alone, and its
+# ai_confidence stays at or under 50.7. The enhanced file has them all.
+SCORE_INTERCEPT = 0.9
+SCORE_FEATURES = {
+    "call_pickup_rate": {"weight": 2.0},
+    "bot_interaction_score": {"weight": 1.0},
+    "response_time_avg": {"weight": -1.4, "scale": (0, 72)},
+    "credit_history_score": {"weight": 2.6, "scale": (500, 800)},
+    "partial_payments_count": {"weight": 0.8, "scale": (0, 5)},
+    "dpd": {"weight": -2.0, "scale": (0, 30)},
+    "prior_restructuring_flag": {"weight": -0.8},
+    "is_first_default": {"weight": 0.6},
+    "payment_pattern_score": {"weight": 1.6, "levels": {"Regular": 1.0, "Irregular": 0.4, "Sporadic": 0.2}},
+    "contact_success_rate": {"weight": 1.4, "levels": {"Low": 0.0, "Medium": 0.5, "High": 1.0}},
+}
+
+def _feature(df, column, spec):
+    if "levels" in spec:
+        # unlisted levels (e.g. "Unknown") count as missing
+        return df[column].map(spec["levels"]).to_numpy(dtype=float)
+    values = df[column].to_numpy(dtype=float)
+    lo, hi = spec.get("scale", (0, 1))
+    return np.clip((values - lo) / (hi - lo), 0, 1)
+
+def score_frame(df):
+    logit = np.full(len(df), SCORE_INTERCEPT)
+    known = np.zeros(len(df))
+    total_weight = sum(abs(spec["weight"]) for spec in SCORE_FEATURES.values())
+    for column, spec in SCORE_FEATURES.items():
+        if column not in df.columns:
+            continue
+        value = _feature(df, column, spec)
+        present = ~np.isnan(value)
+        logit += np.where(present, spec["weight"] * (value - 0.5), 0.0)
+        known += present * abs(spec["weight"])
+
+    score = 1 / (1 + np.exp(-logit))
+    # 50–100 for a fully described account, scaled down by missing weight
+    confidence = 100 * (known / total_weight) * (0.5 + np.abs(score - 0.5))
+    return pd.DataFrame({KEY: df[KEY].to_numpy(), "ai_risk_score": score, "ai_confidence": confidence.round(1)})
+
+# ─── Batch Pipeline ──────────────────────────────────────────────
+# Chunks of the scoring columns only are shipped to a process pool; every
+# chunk is scored independently, so throughput grows with the core count.
+def score_parallel(df, workers=None, chunk_rows=250_000):
+    columns = [KEY] + [c for c in SCORE_FEATURES if c in df.columns]
+    chunks = [df[columns].iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows)]
+    if workers == 1 or len(chunks) <= 1:
+        return pd.concat(map(score_frame, chunks), ignore_index=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return pd.concat(pool.map(score_frame, chunks), ignore_index=True)
+
+# Scores are written as a batch into the delta directory: a running
+# dashboard merges it into the resident store (cube and rankings follow
+# incrementally), and a fresh process re-applies it on load.
+def write_scores(scores, delta_dir):
+    from flowen_ingest import write_batch
+
+    return write_batch(scores, delta_dir, "scores")
+
+# Accounts are scored as the dashboard holds them, the source with the
+# delta batches applied, so fields changed since the source file count
+def main(argv=None):
+    from flowen_data import DATA_PATH, DELTA_DIR
+    from flowen_ingest import current_book
+
+    parser = argparse.ArgumentParser(description="Batch-score ai_risk_score and ai_confidence")
+    parser.add_argument("--source", default=DATA_PATH)
+    parser.add_argument("--delta-dir", default=DELTA_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = current_book(args.source, args.delta_dir)
+    loaded = time.perf_counter()
+    missing = [c for c in SCORE_FEATURES if c not in df.columns]
+    if missing:
+        print(f"scoring without {', '.join(missing)} (neutral, lower ai_confidence)")
+    scores = score_parallel(df, args.workers, args.chunk_rows)
+    scored = time.perf_counter()
+    target = write_scores(scores, args.delta_dir)
+    print(f"rows={len(scores):,} load={loaded - start:.2f}s score={scored - loaded:.2f}s "
+          f"write={time.perf_counter() - scored:.2f}s -> {target}")
+
+if __name__ == "__main__":
+    main()
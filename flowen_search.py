@@ -0,0 +1,87 @@
+
+import numpy as np
+import pandas as pd
+
+# ─── Account Index ───────────────────────────────────────────────
+# O(1) account_id → row position plus a typeahead over account_id and
+# name: prefix matches come from sorted keys (binary search), substring
+# matches from a trigram posting list. Only the first `limit` hits are ever
+# materialised, so the widget stays small whatever the book size.
+SEARCH_FIELDS = ("account_id", "name")
+
+class AccountIndex:
+    def __init__(self, df, fields=SEARCH_FIELDS):
+        self.ids = pd.Index(df["account_id"])
+        texts = [df[f].astype(str).str.lower().to_numpy(dtype=object) for f in fields]
+        self.texts = texts
+        self.sorted_keys, self.sorted_positions = [], []
+        for text in texts:
+            order = np.argsort(text, kind="stable")
+            self.sorted_keys.append(text[order])
+            self.sorted_positions.append(order)
+        self._build_trigrams(texts)
+
+    def _build_trigrams(self, texts):
+        grams, owners = [], []
+        for text in texts:
+            # Arrow-backed strings keep the slicing and hashing vectorised
+            series = pd.Series(text, dtype="string[pyarrow]")
+            longest = int(series.str.len().max()) if len(series) else 0
+            for start in range(max(longest - 2, 0)):
+                gram = series.str[start:start + 3]
+                full = (gram.str.len() == 3).to_numpy()
+                grams.append(gram[full])
+                owners.append(np.flatnonzero(full))
+        if not grams:
+            grams, owners = [pd.Series([], dtype="string[pyarrow]")], [np.array([], dtype=np.int64)]
+
+        codes, uniques = pd.factorize(pd.concat(grams, ignore_index=True))
+        order = np.argsort(codes, kind="stable")
+        self.trigrams = pd.Index(uniques)
+        self.postings = np.concatenate(owners)[order]
+        self.offsets = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+    # ─── Lookup ───
+    def position(self, account_id):
+        try:
+            return self.ids.get_loc(account_id)
+        except KeyError:
+            return None
+
+    # ─── Search ───
+    def _prefix(self, query, limit):
+        hits = []
+        for keys, positions in zip(self.sorted_keys, self.sorted_positions):
+            lo = np.searchsorted(keys, query, side="left")
+            hi = np.searchsorted(keys, query + "\uffff", side="left")
+            hits.append(positions[lo:min(hi, lo + limit)])
+        return hits
+
+    def _substring(self, query, limit):
+        codes = self.trigrams.get_indexer([query[i:i + 3] for i in range(len(query) - 2)])
+        if (codes < 0).any():
+            return np.array([], dtype=np.int64)
+        # intersect the rarest postings first
+        lists = sorted((self.postings[self.offsets[c]:self.offsets[c + 1]] for c in codes), key=len)
+        candidates = np.unique(lists[0])
+        for other in lists[1:]:
+            candidates = candidates[np.isin(candidates, other)]
+        verified = []
+        for p in candidates:
+            if any(query in text[p] for text in self.texts):
+                verified.append(p)
+                if len(verified) == limit:
+                    break
+        return np.asarray(verified, dtype=np.int64)
+
+    def search(self, query, limit=20):
+        exact = self.position(query.strip())
+        query = query.strip().lower()
+        if not query:
+            return np.arange(min(limit, len(self.ids)))
+        ranked = [np.array([], dtype=np.int64) if exact is None else np.array([exact])]
+        ranked += self._prefix(query, limit)
+        if len(query) >= 3 and sum(len(r) for r in ranked) < limit:
+            ranked.append(self._substring(query, limit))
+        hits = pd.unique(np.concatenate(ranked)) if ranked else []
+        return np.asarray(hits[:limit], dtype=np.int64)
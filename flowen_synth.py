@@ -0,0 +1,144 @@
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+REFERENCE_CSV = "flowen_mock_data_5000_enhanced.csv"
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Continuous columns get multiplicative noise so repeated rows do not carry
+# identical values; the rest are drawn as-is with their row.
+JITTER = {
+    "risk_score": 0.10,
+    "total_debt": 0.05,
+    "monthly_income": 0.05,
+    "ai_risk_score": 0.03,
+    "bot_interaction_score": 0.05,
+    "call_pickup_rate": 0.05,
+}
+ROUNDED = {"bot_interaction_score": 2, "call_pickup_rate": 2}
+
+# ─── Synthetic Portfolio ─────────────────────────────────────────
+# Rows are bootstrapped from the reference file, so every column keeps its
+# distribution and its correlation with the other columns; ids and names
+# are renumbered and continuous values jittered within the observed range.
+# Each chunk has its own seed, so a chunk is the same whatever was
+# generated before it.
+def read_reference(path=REFERENCE_CSV):
+    return pd.read_csv(path)
+
+def generate_chunks(rows, seed=0, chunk_rows=1_000_000, reference=None):
+    reference = read_reference() if reference is None else reference
+    width = max(5, len(str(rows)))
+    bounds = {c: (reference[c].min(), reference[c].max()) for c in JITTER}
+
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        size = min(chunk_rows, rows - start)
+        rng = np.random.default_rng([seed, index])
+        chunk = reference.iloc[rng.integers(0, len(reference), size)].reset_index(drop=True)
+
+        number = pd.Series(np.arange(start + 1, start + size + 1)).astype(str)
+        chunk["account_id"] = "ACCT" + number.str.zfill(width)
+        chunk["name"] = "User_" + number
+        for column, scale in JITTER.items():
+            lo, hi = bounds[column]
+            values = chunk[column].to_numpy() * rng.normal(1.0, scale, size)
+            chunk[column] = np.clip(values, lo, hi).round(ROUNDED.get(column, 12))
+        yield chunk
+
+def write_portfolio(path, rows, seed=0, chunk_rows=1_000_000):
+    chunks = generate_chunks(rows, seed, chunk_rows)
+    if str(path).endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        writer.close()
+    else:
+        for index, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode="w" if index == 0 else "a", header=index == 0, index=False)
+    return path
+
+# ─── Synthetic Conversation Logs ─────────────────────────────────
+# Messages from the accounts of a synthetic portfolio of `accounts` rows.
+# Replies come from a pool of common ones, tagged and untagged; "{n}" takes
+# a random amount or day count, and a random ending is appended. This gives
+# the repetition and spelling noise of real chat logs.
+REPLIES = [
+    "ขอเลื่อน {n} วัน", "ตอนนี้ไม่มีเงิน", "ไม่ใช่หนี้ผม", "จะจ่ายพรุ่งนี้", "ไม่ตอบกลับ",
+    "จะโอน {n} บาท", "ขอผ่อนเป็นงวดได้ไหม", "เงินเดือนยังไม่ออก", "จ่ายไปแล้ว เลขที่ {n}",
+    "สวัสดีครับ", "โอเค", "ได้ครับ", "ส่งเลขบัญชีมาหน่อย", "ok", "will pay {n} on friday",
+]
+ENDINGS = ["", " ครับ", " ค่ะ", " นะคะ", "!!", " 555", "ๆ"]
+
+def generate_messages(rows, accounts, seed=0, chunk_rows=1_000_000):
+    width = max(5, len(str(accounts)))
+    heads, _, tails = zip(*(reply.partition("{n}") for reply in REPLIES))
+    heads, tails = np.array(heads, dtype=object), np.array(tails, dtype=object)
+    endings = np.array(ENDINGS, dtype=object)
+
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        size = min(chunk_rows, rows - start)
+        rng = np.random.default_rng([seed, index, 1])
+        number = pd.Series(rng.integers(1, accounts + 1, size)).astype(str)
+        reply = rng.integers(0, len(REPLIES), size)
+        amount = pd.Series(rng.integers(1, 5000, size)).astype(str).to_numpy(dtype=object)
+        amount[np.array(["{n}" not in r for r in REPLIES])[reply]] = ""
+        message = heads[reply] + amount + tails[reply] + endings[rng.integers(0, len(ENDINGS), size)]
+        yield pd.DataFrame({"account_id": "ACCT" + number.str.zfill(width), "message": message})
+
+def write_messages(path, rows, accounts, seed=0, chunk_rows=1_000_000):
+    for index, chunk in enumerate(generate_messages(rows, accounts, seed, chunk_rows)):
+        chunk.to_csv(path, mode="w" if index == 0 else "a", header=index == 0, index=False)
+    return path
+
+# ─── Synthetic Collector Roster ──────────────────────────────────
+# `rows` collectors for a portfolio of `accounts` rows (flowen_assign
+# roster columns). Capacities add up to COLLECTOR_COVER of the book, a bit
+# under the share of stuck and high-risk accounts, so some queue.
+COLLECTOR_COVER = 0.35
+
+def generate_roster(rows, accounts, seed=0):
+    rng = np.random.default_rng([seed, 2])
+    width = max(3, len(str(rows)))
+    share = rng.uniform(0.5, 1.5, rows)
+    skill = rng.normal(0.62, 0.05, rows)
+    roster = pd.DataFrame({
+        "collector_id": ["COL" + str(i).zfill(width) for i in range(1, rows + 1)],
+        "name": [f"Collector_{i}" for i in range(1, rows + 1)],
+        "capacity": np.floor(share / share.sum() * accounts * COLLECTOR_COVER).astype(np.int64),
+    })
+    for level in ["low", "medium", "high"]:
+        roster[f"rate_{level}"] = np.clip(skill + rng.normal(0, 0.06, rows), 0.2, 0.95).round(3)
+    return roster
+
+def parse_rows(value):
+    return SIZES.get(value.lower()) or int(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Flowen portfolio")
+    parser.add_argument("rows", help="row count or one of " + ", ".join(SIZES))
+    parser.add_argument("out", help=".csv or .parquet path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--conversations", metavar="ACCOUNTS",
+                        help="write conversation log messages for a portfolio of this size instead")
+    parser.add_argument("--collectors", metavar="ACCOUNTS",
+                        help="write a roster of `rows` collectors for a portfolio of this size instead")
+    args = parser.parse_args(argv)
+    if args.collectors:
+        generate_roster(parse_rows(args.rows), parse_rows(args.collectors), args.seed).to_csv(args.out, index=False)
+    elif args.conversations:
+        write_messages(args.out, parse_rows(args.rows), parse_rows(args.conversations), args.seed, args.chunk_rows)
+    else:
+        write_portfolio(args.out, parse_rows(args.rows), args.seed, args.chunk_rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ─── Cached Orderings ────────────────────────────────────────────
+# Sort permutations and filter hits are computed once per data version and
+# reused by every session and every page turn. Arguments starting with "_"
+# are not hashed by Streamlit; `version` identifies the data instead.
+@st.cache_resource(max_entries=16)
+def _sort_order(version, _df, column, ascending):
+    values = _df[column].reset_index(drop=True)
+    if isinstance(values.dtype, pd.CategoricalDtype) and not values.cat.ordered:
+        # labels added by delta batches sit after the original categories
+        values = values.cat.reorder_categories(values.cat.categories.sort_values())
+    ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+    return ordered.index.to_numpy()
+
+@st.cache_resource(max_entries=16)
+def _filter_mask(version, _df, search_columns, query):
+    mask = np.zeros(len(_df), dtype=bool)
+    for column in search_columns:
+        mask |= _df[column].astype(str).str.contains(query, case=False, regex=False).to_numpy()
+    return mask
+
+def _first_page(key):
+    st.session_state[f"{key}_page"] = 1
+
+# One page of rows plus the number of rows passing the filter. `df` is a
+# DataFrame, or an out-of-core portfolio (flowen_ooc) that sorts, filters
+# and slices in its query engine. `rows` restricts the table to a subset:
+# a boolean row mask for a DataFrame, flowen_rules conditions out of core.
+def _page(df, columns, version, sort_column, ascending, query, search_columns, start, size, rows=None):
+    if not isinstance(df, pd.DataFrame):
+        return df.page(list(columns), sort_column, ascending, query, search_columns, start, size, rows)
+    if sort_column is None:
+        order = np.arange(len(df))
+    else:
+        order = _sort_order(version, df, sort_column, ascending)
+    if rows is not None:
+        order = order[rows[order]]
+    if query:
+        order = order[_filter_mask(version, df, search_columns, query)[order]]
+    return df.iloc[order[start:start + size]][list(columns)], len(order)
+
+# ─── Paged Table ─────────────────────────────────────────────────
+# Sorting, filtering and slicing happen on the server; only the visible
+# page is serialised to the browser, so payload size does not grow with
+# the portfolio.
+def paged_table(df, columns, key, version, search_columns=(), page_size=25, rows=None):
+    labels = list(columns.values())
+    by_label = dict(zip(labels, columns))
+
+    ctrl_search, ctrl_sort, ctrl_dir = st.columns([2, 2, 1])
+    # any change to filter or sort jumps back to the first page
+    reset = {"on_change": _first_page, "args": (key,)}
+    query = ctrl_search.text_input("Filter", key=f"{key}_query", placeholder="Account ID or Name", **reset) \
+        if search_columns else ""
+    sort_label = ctrl_sort.selectbox("Sort by", ["(none)"] + labels, key=f"{key}_sort", **reset)
+    descending = ctrl_dir.toggle("Desc", key=f"{key}_desc", **reset)
+
+    sort_column = None if sort_label == "(none)" else by_label[sort_label]
+    fetch = lambda page: _page(df, columns, version, sort_column, not descending, query.strip(),
+                               tuple(search_columns), (page - 1) * page_size, page_size, rows)
+
+    page = st.session_state.get(f"{key}_page", 1)
+    visible, total_rows = fetch(page)
+    pages = max(1, -(-total_rows // page_size))
+    if page > pages:
+        page = st.session_state[f"{key}_page"] = pages
+        visible, total_rows = fetch(page)
+    st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+
+    st.dataframe(
+        visible.rename(columns=columns),
+        use_container_width=True,
+        hide_index=True
+    )
+    st.caption(f"Rows {min(start + 1, total_rows):,}–{start + len(visible):,} of {total_rows:,}")
@@ -0,0 +1,241 @@
+
+import argparse
+import functools
+import os
+import re
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+KEY = "account_id"
+MESSAGE = "message"
+
+# ─── Tag Dictionary ──────────────────────────────────────────────
+# tag → phrases that raise it, matched anywhere in a message after
+# normalization. A message counts once per tag however many of its
+# phrases it contains.
+TAG_PHRASES = {
+    "Willing": [
+        "ขอเลื่อน", "ขอผ่อน", "ขอแบ่งจ่าย", "ขอเวลา", "ขอลดค่างวด", "ยินดีจ่าย",
+        "postpone", "extension", "installment",
+    ],
+    "Cashflow_Issue": [
+        "ไม่มีเงิน", "เงินไม่พอ", "ตกงาน", "เงินเดือนยังไม่ออก", "รอเงินเดือน", "ธุรกิจขาดทุน",
+        "no money", "lost my job", "waiting for salary",
+    ],
+    "Dispute": [
+        "ไม่ใช่หนี้", "ไม่ได้กู้", "ไม่ได้ยืม", "ยอดไม่ถูก", "จ่ายไปแล้ว", "ไม่เคยสมัคร",
+        "not my debt", "already paid", "wrong amount",
+    ],
+    "Pay_Intent": [
+        "จะจ่าย", "จ่ายพรุ่งนี้", "จะโอน", "โอนให้", "จ่ายสิ้นเดือน", "จ่ายวันนี้",
+        "will pay", "pay tomorrow", "will transfer",
+    ],
+    "Silent": [
+        "ไม่ตอบกลับ", "ไม่สะดวกคุย", "อย่าโทรมา", "ไม่ว่างคุย", "เลิกโทร",
+        "stop calling", "do not call",
+    ],
+}
+TAG_ACTIONS = {
+    "Willing": "Remind in 2 days",
+    "Cashflow_Issue": "Pause & retry next payday",
+    "Dispute": "Send dispute form",
+    "Pay_Intent": "Follow-up in 24h",
+    "Silent": "Escalate to voice",
+}
+# Per-account message counts, merged into the book as these columns
+TAG_COLUMNS = {tag: f"tag_{tag.lower()}" for tag in TAG_PHRASES}
+
+# ─── Thai-aware Normalization ────────────────────────────────────
+# Chat text spells the same phrase many ways. Messages and phrases both go
+# through normalize() before matching:
+# - NFKC, lower case, Thai digits as Arabic digits
+# - zero-width characters dropped; runs of spaces and punctuation become one
+#   space, and a space between two Thai characters is dropped (Thai is
+#   written without spaces between words, so "ไม่ มี เงิน" matches
+#   "ไม่มีเงิน"); the result is padded with a space on either side
+# - sara am typed as nikhahit + sara aa joined into one character
+# - a tone mark typed before the vowel above/below it moved after it
+# - the repetition mark ๆ and letters held down ("มากกกก") collapsed
+_TRANSLATE = str.maketrans("๐๑๒๓๔๕๖๗๘๙", "0123456789", "\u200b\u200c\u200d\u2060\ufeffๆ")
+_THAI = "\u0e01-\u0e3a\u0e40-\u0e4e"
+_VOWELS = "\u0e31\u0e34-\u0e3a\u0e47"  # above/below the consonant
+_TONES = "\u0e48-\u0e4c"
+_MARK_ORDER = re.compile(f"([{_TONES}])([{_VOWELS}])")
+_REPEATS = re.compile(r"([a-z\u0e01-\u0e2e])\1{2,}")
+_SEPARATORS = re.compile(f"[^0-9a-z{_THAI}]+")
+_THAI_GAP = re.compile(f"(?<=[{_THAI}]) (?=[{_THAI}])")
+_THAI_CHAR = re.compile(f"[{_THAI}]")
+
+def normalize(text):
+    text = unicodedata.normalize("NFKC", text).lower().translate(_TRANSLATE)
+    text = text.replace("\u0e4d\u0e32", "\u0e33")
+    text = _MARK_ORDER.sub(r"\2\1", text)
+    text = _REPEATS.sub(r"\1", text)
+    text = _THAI_GAP.sub("", _SEPARATORS.sub(" ", text).strip())
+    return f" {text} "
+
+# A phrase as the automaton matches it. Latin words must match whole, so a
+# phrase keeps the padding space next to a Latin end ("no money" is not
+# found in "casino money"); a Thai end has no word boundary to match.
+def phrase_pattern(phrase):
+    text = normalize(phrase)
+    start = 1 if _THAI_CHAR.match(text[1:2]) else 0
+    end = -1 if _THAI_CHAR.match(text[-2:-1]) else len(text)
+    return text[start:end]
+
+# ─── Phrase Automaton ────────────────────────────────────────────
+# Aho-Corasick over the normalized phrases: one pass over a message finds
+# every phrase in it, whatever the dictionary size. Failure links are
+# folded into each state's transition table when it is built, so the scan
+# is a dict lookup per character and never backtracks. `out` holds the
+# tags ending at a state (its own and those of its failure chain) as a
+# bitmask over `tags`.
+class TagAutomaton:
+    def __init__(self, phrases=TAG_PHRASES):
+        self.tags = list(phrases)
+        goto, out = [{}], [0]
+        for bit, tag in enumerate(self.tags):
+            for phrase in phrases[tag]:
+                state = 0
+                for char in phrase_pattern(phrase):
+                    if char not in goto[state]:
+                        goto[state][char] = len(goto)
+                        goto.append({})
+                        out.append(0)
+                    state = goto[state][char]
+                out[state] |= 1 << bit
+
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0) if state else 0
+                out[child] |= out[fail[child]]
+                queue.append(child)
+        self.delta = delta
+        self.out = out
+
+    # bitmask of the tags found in already normalized text
+    def scan(self, text):
+        delta, out = self.delta, self.out
+        state = found = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            found |= out[state]
+        return found
+
+    def tag(self, message):
+        found = self.scan(normalize(message))
+        return [tag for bit, tag in enumerate(self.tags) if found >> bit & 1]
+
+# Built once per worker process
+@functools.lru_cache(maxsize=None)
+def get_automaton():
+    return TagAutomaton()
+
+# ─── Batch Tagging ───────────────────────────────────────────────
+# Tag counts per account for one chunk of (account_id, message) rows.
+# Collection chats repeat the same short replies constantly, so each
+# distinct message is normalized and scanned once per chunk.
+def tag_chunk(chunk):
+    automaton = get_automaton()
+    seen = {}
+    masks = np.fromiter(
+        (seen[m] if m in seen else seen.setdefault(m, automaton.scan(normalize(m)))
+         for m in chunk[MESSAGE].fillna("").astype(str)),
+        dtype=np.int64, count=len(chunk),
+    )
+    bits = np.arange(len(automaton.tags))
+    counts = pd.DataFrame(
+        (masks[:, None] >> bits & 1).astype(np.int32),
+        columns=[TAG_COLUMNS[tag] for tag in automaton.tags],
+    )
+    counts[KEY] = chunk[KEY].to_numpy()
+    return counts.groupby(KEY, sort=False).sum()
+
+# ─── Conversation Logs ───────────────────────────────────────────
+# CSV, JSON lines or Parquet files with one message per row and at least
+# `account_id` and `message` columns, read a chunk at a time.
+def log_files(path):
+    if not os.path.isdir(path):
+        return [path]
+    return [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+        if name.endswith((".csv", ".jsonl", ".parquet"))
+    ]
+
+def read_logs(paths, chunk_rows=200_000):
+    for path in paths:
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            for batch in pq.ParquetFile(path).iter_batches(chunk_rows, columns=[KEY, MESSAGE]):
+                yield batch.to_pandas()
+        elif path.endswith(".jsonl"):
+            for chunk in pd.read_json(path, lines=True, chunksize=chunk_rows, dtype={KEY: str, MESSAGE: str}):
+                yield chunk[[KEY, MESSAGE]]
+        else:
+            yield from pd.read_csv(path, usecols=[KEY, MESSAGE], dtype=str, chunksize=chunk_rows)
+
+# Chunks are tagged across a process pool with at most two per worker in
+# flight, so memory stays bounded however long the logs are. Returns one
+# row of tag counts per account seen, and the number of messages read.
+def tag_logs(paths, workers=None, chunk_rows=200_000):
+    workers = workers or os.cpu_count() or 1
+    parts, messages = [], 0
+    if workers == 1:
+        for chunk in read_logs(paths, chunk_rows):
+            parts.append(tag_chunk(chunk))
+            messages += len(chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in read_logs(paths, chunk_rows):
+                pending.append(pool.submit(tag_chunk, chunk))
+                messages += len(chunk)
+                if len(pending) >= 2 * workers:
+                    parts.append(pending.popleft().result())
+            parts += [future.result() for future in pending]
+    if not parts:
+        return pd.DataFrame(columns=[KEY, *TAG_COLUMNS.values()]), 0
+    counts = pd.concat(parts).groupby(level=0).sum()
+    return counts.rename_axis(KEY).reset_index(), messages
+
+# Each run writes the counts of the messages it read as a batch, which the
+# store adds to the counts already held (flowen_ingest.ADDITIVE): a run
+# covers only logs not tagged before, e.g. the day's new files.
+def main(argv=None):
+    from flowen_data import DATA_PATH, DELTA_DIR
+    from flowen_ingest import known_accounts, write_batch
+
+    parser = argparse.ArgumentParser(description="Tag conversation logs and write per-account tag counts")
+    parser.add_argument("logs", nargs="?", default=os.environ.get("FLOWEN_CONVERSATION_DIR", "conversations"),
+                        help="log file or directory of CSV / JSON lines / Parquet logs not tagged before")
+    parser.add_argument("--source", default=DATA_PATH, help="portfolio whose accounts (plus those of the delta batches) are kept")
+    parser.add_argument("--delta-dir", default=DELTA_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--chunk-rows", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts, messages = tag_logs(log_files(args.logs), args.workers, args.chunk_rows)
+    tagged = time.perf_counter()
+    # a batch may only update accounts: logs of accounts outside the book,
+    # the source plus the accounts appended by batches since, are dropped
+    known = counts[KEY].astype(str).isin(known_accounts(args.source, args.delta_dir))
+    target = write_batch(counts[known], args.delta_dir, "tags")
+    rate = messages / max(tagged - start, 1e-9) * 60
+    print(f"messages={messages:,} accounts={int(known.sum()):,} unknown={int((~known).sum()):,} "
+          f"tag={tagged - start:.2f}s ({rate:,.0f} messages/min) -> {target}")
+
+if __name__ == "__main__":
+    main()
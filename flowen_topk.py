@@ -0,0 +1,105 @@
+
+import numpy as np
+
+from flowen_rules import conditions_mask
+
+# ─── Ranking Definitions ─────────────────────────────────────────
+# name → score column, direction and optional row conditions (flowen_rules
+# syntax). Pages ask for the first k rows of a ranking instead of sorting
+# the whole book.
+RANKINGS = {
+    "likely_to_pay": {"column": "ai_risk_score", "ascending": False},
+    "stuck_accounts": {
+        "column": "last_payment_days_ago",
+        "ascending": False,
+        "where": {"dpd": (">", 30)},
+    },
+}
+
+# ─── Top-K Index ─────────────────────────────────────────────────
+# Keeps the best `capacity` rows of one ranking, found with argpartition
+# (O(n)) instead of a full sort. Rows are ordered by key, then position,
+# the order the out-of-core backend sorts in (account_id), so ties at
+# the cut keep the earliest rows. Changed rows are merged into the kept
+# candidates; everything outside them ranks after the last kept entry
+# (`threshold`, `threshold_position`), so merged entries up to it are
+# still exact. A rebuild is only needed when too few exact entries remain.
+#
+# Only `rebuild` and `update` change the index, and they replace its
+# arrays rather than write into them: a shallow copy (what a snapshot
+# keeps) stays as it was while the store goes on updating the original.
+# `top` only reads, so any number of sessions can share a copy.
+def _head(rows, keys, k):
+    # the k smallest (key, row) pairs, best first; `rows` ascending
+    if len(rows) > k:
+        cut = np.partition(keys, k - 1)[k - 1]
+        below = np.flatnonzero(keys < cut)
+        ties = np.flatnonzero(keys == cut)[:k - len(below)]
+        pick = np.concatenate([below, ties])
+        rows, keys = rows[pick], keys[pick]
+    order = np.lexsort((rows, keys))
+    return rows[order], keys[order]
+
+class TopK:
+    def __init__(self, column, ascending=False, where=None, capacity=64):
+        self.column = column
+        self.ascending = ascending
+        self.where = where
+        self.capacity = capacity
+
+    def _keys(self, df):
+        # smaller key ranks first; rows without a score or failing the
+        # predicate get +inf and never qualify
+        values = df[self.column].to_numpy(dtype=float)
+        keys = values if self.ascending else -values
+        eligible = ~np.isnan(keys)
+        if self.where is not None:
+            eligible &= conditions_mask(df, self.where)
+        return np.where(eligible, keys, np.inf)
+
+    def rebuild(self, df):
+        keys = self._keys(df)
+        candidates = np.flatnonzero(np.isfinite(keys))
+        self.positions, self.keys = _head(candidates, keys[candidates], self.capacity)
+        if len(candidates) > self.capacity:
+            self.threshold, self.threshold_position = self.keys[-1], self.positions[-1]
+        else:
+            self.threshold, self.threshold_position = np.inf, len(df)  # every qualifying row is a candidate
+        return self
+
+    def update(self, df, changed):
+        changed = np.asarray(changed, dtype=np.int64)
+        keys = self._keys(df.iloc[changed])
+        keep = ~np.isin(self.positions, changed)
+        qualify = np.isfinite(keys)
+
+        positions = np.concatenate([self.positions[keep], changed[qualify]])
+        merged = np.concatenate([self.keys[keep], keys[qualify]])
+        exact = (merged < self.threshold) | ((merged == self.threshold) & (positions <= self.threshold_position))
+        order = np.lexsort((positions[exact], merged[exact]))
+        self.positions, self.keys = positions[exact][order], merged[exact][order]
+        if len(self.positions) > self.capacity:
+            self.positions = self.positions[:self.capacity]
+            self.keys = self.keys[:self.capacity]
+            self.threshold, self.threshold_position = self.keys[-1], self.positions[-1]
+        elif len(self.positions) < self.capacity // 2 and np.isfinite(self.threshold):
+            # too many of the kept rows dropped out of the head
+            self.rebuild(df)
+
+    # `mask` restricts the ranking to a row subset (sidebar filters). The
+    # kept entries are the exact head of the whole book, so the first k of
+    # them inside the mask are exact too; asking for more than are kept, or
+    # a narrow mask that leaves fewer than k of them, falls back to a
+    # selection over the masked rows only (callers cache the result per
+    # data version and filter, see flowen_data.top_accounts).
+    def top(self, df, k, mask=None):
+        kept = self.positions if mask is None else self.positions[mask[self.positions]]
+        if len(kept) >= k or not np.isfinite(self.threshold):
+            return kept[:k]
+        rows = np.arange(len(df)) if mask is None else np.flatnonzero(mask)
+        keys = self._keys(df.iloc[rows])
+        qualify = np.isfinite(keys)
+        return _head(rows[qualify], keys[qualify], k)[0]
+
+def build_rankings(df):
+    return {name: TopK(**spec).rebuild(df) for name, spec in RANKINGS.items()}
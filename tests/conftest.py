@@ -0,0 +1,8 @@
+
+import os
+import sys
+
+# the flowen_* modules live at the repository root, next to app.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
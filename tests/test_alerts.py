@@ -0,0 +1,64 @@
+import pandas as pd
+
+from flowen_alerts import AlertEngine, AlertLog
+
+NOW = pd.Timestamp("2025-07-10 12:00")
+
+def book():
+    return pd.DataFrame({
+        "account_id": ["A", "B", "C", "D"],
+        "dpd": [10, 45, 0, 20],
+        "risk_level": ["Low", "High", "Medium", "Low"],
+        "response_behavior": ["Responsive", "Ignored", "Responsive", "Responsive"],
+        "last_contact_date": pd.to_datetime(["2025-07-01", "2025-06-01", "2025-07-09", "2025-07-09"]),
+    })
+
+def write(df, position, **values):
+    for column, value in values.items():
+        df.loc[position, column] = value
+
+def test_only_transitions_fire_and_only_once():
+    df = book()
+    engine = AlertEngine(df, now=NOW)
+    assert engine.log.total == 0  # existing state raises nothing
+
+    write(df, 0, dpd=31, risk_level="High")
+    assert engine.evaluate(df, [0], now=NOW) == 2
+    alerts = {alert["rule"]: alert for alert in engine.log.recent()}
+    assert alerts["dpd_over_30"]["account_id"] == "A" and alerts["dpd_over_30"]["detail"] == "dpd: 31"
+    assert alerts["risk_escalation"]["detail"] == "risk_level: Low → High"
+    # a re-delivered update or a drop in level fires nothing
+    write(df, 0, risk_level="Medium")
+    assert engine.evaluate(df, [0], now=NOW) == 0
+    # leaving a rule and coming back fires again
+    write(df, 0, dpd=5)
+    engine.evaluate(df, [0], now=NOW)
+    write(df, 0, dpd=35)
+    assert engine.evaluate(df, [0], now=NOW) == 1
+
+def test_timed_rules_wait_for_their_due_date():
+    df = book()
+    engine = AlertEngine(df, now=NOW)
+    write(df, 3, response_behavior="Ignored")
+    write(df, 2, response_behavior="Ignored")
+    assert engine.evaluate(df, [2, 3], now=NOW) == 0
+    assert engine.tick(df, now=NOW + pd.Timedelta(days=3)) == 0
+
+    write(df, 2, response_behavior="Responsive")  # cancels C's timer
+    engine.evaluate(df, [2], now=NOW + pd.Timedelta(days=4))
+    assert engine.tick(df, now=NOW + pd.Timedelta(days=7)) == 1
+    (alert,) = engine.log.recent()
+    assert alert["account_id"] == "D" and alert["detail"] == "response_behavior: Ignored since 2025-07-09"
+    assert engine.tick(df, now=NOW + pd.Timedelta(days=30)) == 0
+
+def test_new_accounts_fire_conditions_but_not_rises():
+    df = book()
+    engine = AlertEngine(df, now=NOW)
+    df = pd.concat([df, book().iloc[[1]].assign(account_id="E")], ignore_index=True)
+    assert engine.evaluate(df, [4], appended=True, now=NOW) == 2
+    assert {alert["rule"] for alert in engine.log.recent()} == {"dpd_over_30", "ignored_7_days"}
+
+def test_log_keeps_the_newest_entries():
+    log = AlertLog(size=3)
+    log.add([{"rule": str(n)} for n in range(5)])
+    assert [alert["id"] for alert in log.recent()] == [5, 4, 3] and log.total == 5
@@ -0,0 +1,24 @@
+import base64
+import subprocess
+import sys
+
+from flowen_assets import LOGO_PATH, app_css, logo_base64
+from flowen_benchmark import STARTUP_MODULES
+
+HEAVY = ["plotly.express", "plotly.graph_objects", "matplotlib", "PIL.Image"]
+
+def loaded(modules):
+    code = f"import sys, {', '.join(modules)}; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    return set(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split())
+
+def test_logo_is_the_png_bytes():
+    with open(LOGO_PATH, "rb") as f:
+        assert base64.b64decode(logo_base64()) == f.read()
+    assert f"data:image/png;base64,{logo_base64()}" in app_css()
+    assert app_css() is app_css()
+
+# Streamlit itself may load some of these; the dashboard's own startup
+# modules must not add any
+def test_startup_path_skips_heavy_imports():
+    framework = [m for m in STARTUP_MODULES if not m.startswith("flowen_")]
+    assert loaded(STARTUP_MODULES) <= loaded(framework)
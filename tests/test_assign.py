@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_assign import leaderboard, load_roster, place
+from flowen_cache import load_portfolio
+from flowen_forecast import fit_model
+from flowen_ingest import PortfolioStore
+
+@pytest.fixture
+def store():
+    store = PortfolioStore(load_portfolio("flowen_mock_data_5000.csv"))
+    store.set_roster(load_roster("flowen_mock_collectors.csv"))
+    return store
+
+def board_for(store, rows=None):
+    frozen = store.assignments.frozen()
+    board = leaderboard(frozen, store.df, fit_model(store.cube, store.recovery), rows)
+    return frozen, board.set_index("Collector")
+
+def test_leaderboard_columns_follow_the_filter(store):
+    rows = np.flatnonzero((store.df["region"] == "North").to_numpy())
+    frozen, board = board_for(store, rows)
+    roster = frozen["roster"].set_index("name")
+    held = rows[frozen["collector"][rows] >= 0]
+    accounts = store.df.iloc[held].assign(collector=roster.index[frozen["collector"][held]])
+
+    for name, group in accounts.groupby("collector"):
+        assert board.loc[name, "Accounts"] == len(group)
+        assert board.loc[name, "Capacity Used (%)"] == round(len(group) / roster.loc[name, "capacity"] * 100, 1)
+        rates = group["risk_level"].astype(object).map(lambda level: roster.loc[name, f"rate_{level.lower()}"])
+        expected = (group["total_debt"] * rates).sum() / group["total_debt"].sum() * 100
+        assert board.loc[name, "Past Recovery (%)"] == pytest.approx(expected, abs=0.05)
+    idle = board.index.difference(accounts["collector"].unique())
+    assert (board.loc[idle, "Accounts"] == 0).all() and board.loc[idle, "Past Recovery (%)"].isna().all()
+
+    # the whole book holds at least as much per collector as any filter
+    _, whole = board_for(store)
+    assert (whole["Capacity Used (%)"] >= board["Capacity Used (%)"].reindex(whole.index)).all()
+
+# One account at a time: the loop place() replaces
+def place_one_by_one(weight, tier, perf, free):
+    placed = np.full(len(weight), -1, dtype=np.int32)
+    free = free.astype(np.int64).copy()
+    for account in np.argsort(-weight, kind="stable"):
+        if not (free > 0).any():
+            break
+        collector = int(np.argmax(perf[:, tier[account]] + np.where(free > 0, 0, -np.inf)))
+        placed[account] = collector
+        free[collector] -= 1
+    return placed
+
+@pytest.mark.parametrize("seed", range(6))
+def test_runs_place_like_the_account_loop(seed):
+    rng = np.random.default_rng(seed)
+    accounts, collectors = int(rng.integers(50, 400)), int(rng.integers(1, 8))
+    weight = rng.integers(0, 30, accounts).astype(float)  # ties included
+    tier = rng.integers(0, 4, accounts).astype(np.int8)
+    perf = rng.choice([0.8, 1.0, 1.2], (collectors, 4))
+    free = rng.integers(0, accounts // collectors + 5, collectors)
+    placed = place(weight, tier, perf, free)
+    assert np.array_equal(placed, place_one_by_one(weight, tier, perf, free))
+    assert (np.bincount(placed[placed >= 0], minlength=collectors) <= free).all()
+
+def test_assignment_follows_batches_and_roster_changes(store):
+    roster = load_roster("flowen_mock_collectors.csv")
+    assignment = store.assignments
+    held = assignment.collector >= 0
+    assert (np.bincount(assignment.collector[held], minlength=len(roster)) <= roster["capacity"]).all()
+    scope = (store.df["status_paid"] == "Stuck") | (store.df["risk_level"] == "High")
+    assert not held[~scope.to_numpy()].any()
+
+    # accounts paid off leave the queue and free their collector's slot
+    paid = store.df["account_id"].to_numpy()[held][:20]
+    store.apply_batch(pd.DataFrame({"account_id": paid, "dpd": 0, "risk_level": "Low"}))
+    positions = store.keys.positions(pd.Index(paid))
+    assert (store.assignments.collector[positions] == -1).all()
+
+    # a removed collector's accounts are placed elsewhere, within capacity
+    store.set_roster(roster.iloc[1:].reset_index(drop=True), "smaller")
+    collector = store.assignments.collector
+    assert (np.bincount(collector[collector >= 0], minlength=len(roster) - 1) <= roster["capacity"].iloc[1:]).all()
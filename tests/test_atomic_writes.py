@@ -0,0 +1,28 @@
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from flowen_cache import _atomic_write_text
+from flowen_metrics import Metrics
+
+THREADS = 8
+WRITES = 300
+
+def hammer(write):
+    with ThreadPoolExecutor(THREADS) as pool:
+        futures = [pool.submit(write) for _ in range(THREADS * WRITES)]
+    return [f.exception() for f in futures if f.exception() is not None]
+
+def test_concurrent_metrics_writes(tmp_path):
+    metrics = Metrics()
+    metrics.observe_rerun("Risk Overview", 0.1)
+    path = str(tmp_path / "metrics.prom")
+    assert hammer(lambda: metrics.write(path)) == []
+    assert "flowen_rerun_seconds" in open(path).read()
+    assert os.listdir(tmp_path) == ["metrics.prom"]
+
+def test_concurrent_text_writes(tmp_path):
+    path = str(tmp_path / "digest.json")
+    assert hammer(lambda: _atomic_write_text(path, "{}")) == []
+    assert open(path).read() == "{}"
+    assert os.listdir(tmp_path) == ["digest.json"]
@@ -0,0 +1,38 @@
+import os
+
+import pandas as pd
+
+import flowen_benchmark
+from flowen_cache import CACHE_DIR
+from flowen_synth import generate_chunks, read_reference, write_portfolio
+
+def test_synthetic_chunks_are_seeded_per_chunk():
+    reference = read_reference()
+    whole = pd.concat(generate_chunks(2_500, seed=3, chunk_rows=1_000, reference=reference), ignore_index=True)
+    again = pd.concat(generate_chunks(2_500, seed=3, chunk_rows=1_000, reference=reference), ignore_index=True)
+    pd.testing.assert_frame_equal(whole, again)
+    assert whole["account_id"].is_unique and list(whole.columns) == list(reference.columns)
+    # a chunk does not depend on what was generated before it
+    last = list(generate_chunks(2_500, seed=3, chunk_rows=1_000, reference=reference))[-1]
+    assert (last["risk_level"].to_numpy() == whole["risk_level"].iloc[2_000:].to_numpy()).all()
+    for column in ["total_debt", "call_pickup_rate"]:
+        assert reference[column].min() <= whole[column].min() and whole[column].max() <= reference[column].max()
+
+def test_portfolio_writes_csv_and_parquet_alike(tmp_path):
+    csv = pd.read_csv(write_portfolio(tmp_path / "p.csv", 1_200, chunk_rows=500))
+    parquet = pd.read_parquet(write_portfolio(tmp_path / "p.parquet", 1_200, chunk_rows=500))
+    assert len(csv) == len(parquet) == 1_200
+    assert (csv["account_id"] == parquet["account_id"]).all()
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"results": {"10k": {"load": 1.0, "cube": 0.001, "gone": 1.0}}}
+    report = {"results": {"10k": {"load": 1.5, "cube": 0.005, "new": 9.0}}}
+    assert flowen_benchmark.compare(report, baseline, tolerance=0.25) == [("10k", "load")]
+
+def test_outputs_default_to_the_cache_dir(monkeypatch, tmp_path):
+    assert flowen_benchmark.SYNTH_DIR == os.path.join(CACHE_DIR, "synth")
+    out = tmp_path / "cache" / "results.json"
+    monkeypatch.setattr(flowen_benchmark, "bench_suite", lambda sizes, seed, data_dir: {"results": {}, "data_dir": data_dir})
+    flowen_benchmark.main(["suite", "--sizes", "10k", "--out", str(out)])
+    assert '"data_dir": "' + flowen_benchmark.SYNTH_DIR in out.read_text()
+    assert flowen_benchmark.RESULTS_PATH == os.path.join(CACHE_DIR, "benchmark_results.json")
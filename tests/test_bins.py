@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_bins import compute_bins, histogram_figure
+
+def test_bins_count_every_value_once():
+    values = pd.Series(np.random.default_rng(0).normal(50, 10, 10_000))
+    values[::100] = np.nan
+    bins = compute_bins(values, nbins=40)
+    assert len(bins) == 40 and bins["count"].sum() == values.notna().sum()
+    assert bins["left"].iloc[0] == values.min() and bins["right"].iloc[-1] == values.max()
+    assert (bins["right"].iloc[:-1].to_numpy() == bins["left"].iloc[1:].to_numpy()).all()
+
+    # drill-down re-bins only the values inside the range
+    zoom = compute_bins(values, nbins=10, value_range=(40, 60))
+    assert zoom["count"].sum() == values.between(40, 60).sum()
+    assert compute_bins([], nbins=5)["count"].sum() == 0
+    assert compute_bins([3, 3, 3], nbins=5)["count"].sum() == 3
+
+def test_figure_ships_bins_not_rows():
+    bins = compute_bins(np.random.default_rng(1).random(100_000), nbins=30)
+    figure = histogram_figure(bins, "score")
+    assert len(figure.data) == 1 and len(figure.data[0].x) == 30
+    assert list(figure.data[0].y) == list(bins["count"])
+
+def test_out_of_core_bins_match(tmp_path):
+    pytest.importorskip("duckdb")
+    from flowen_ooc import OutOfCorePortfolio, write_dataset
+
+    book = pd.read_csv("flowen_mock_data_5000.csv")
+    portfolio = OutOfCorePortfolio(write_dataset("flowen_mock_data_5000.csv", str(tmp_path / "book")))
+    for column in ["total_debt", "dpd", "age"]:
+        pd.testing.assert_frame_equal(portfolio.bins(column, 25), compute_bins(book[column], 25))
+    north = book.loc[book["region"] == "North", "total_debt"]
+    pd.testing.assert_frame_equal(portfolio.bins("total_debt", 10, (1e4, 5e4), {"region": "North"}),
+                                  compute_bins(north, 10, (1e4, 5e4)))
@@ -0,0 +1,35 @@
+import os
+import shutil
+
+import pandas as pd
+
+from flowen_cache import build_cache, file_digest, load_portfolio
+from flowen_schema import apply_schema
+
+SOURCE = "flowen_mock_data_1000.csv"
+
+def test_cached_load_matches_the_csv(tmp_path):
+    cache = str(tmp_path / "cache")
+    loaded = load_portfolio(SOURCE, cache_dir=cache)
+    expected = apply_schema(pd.read_csv(SOURCE))
+    # Parquet keeps dates at millisecond resolution
+    pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+    dates = [c for c in expected.columns if c.endswith("_date")]
+    assert loaded.drop(columns=dates).dtypes.equals(expected.drop(columns=dates).dtypes)
+    # only requested columns are read; unknown names are ignored
+    subset = load_portfolio(SOURCE, columns=["dpd", "journey_type", "no_such_column"], cache_dir=cache)
+    assert list(subset.columns) == ["dpd"] and subset["dpd"].dtype == "int16"
+
+def test_cache_is_reused_until_the_source_changes(tmp_path):
+    source, cache = tmp_path / "book.csv", str(tmp_path / "cache")
+    shutil.copy(SOURCE, source)
+    first = build_cache(str(source), cache)
+    stamp = os.stat(first).st_mtime_ns
+    assert build_cache(str(source), cache) == first and os.stat(first).st_mtime_ns == stamp
+
+    book = pd.read_csv(source)
+    book.iloc[:10].to_csv(source, index=False)
+    second = build_cache(str(source), cache)
+    assert second != first and not os.path.exists(first)
+    assert len(pd.read_parquet(second)) == 10
+    assert file_digest(str(source), cache) in os.path.basename(second)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_cache import load_portfolio
+from flowen_cube import build_cube, merge_cubes, rollup, total, value_counts
+from flowen_ingest import derive_fields
+
+@pytest.fixture(scope="module")
+def book():
+    return derive_fields(load_portfolio("flowen_mock_data_5000.csv"))
+
+def test_rollups_match_groupbys_on_the_book(book):
+    cube = build_cube(book)
+    assert total(cube) == len(book)
+    assert total(cube, "total_debt") == pytest.approx(book["total_debt"].sum())
+
+    counts = rollup(cube, ["risk_level", "region"]).set_index(["risk_level", "region"])["count"]
+    expected = book.groupby(["risk_level", "region"], observed=True).size()
+    assert counts.sort_index().equals(expected.sort_index())
+
+    means = rollup(cube, ["journey_type"], "dpd", how="mean").set_index("journey_type")["dpd"]
+    pd.testing.assert_series_equal(means.sort_index(), book.groupby("journey_type", observed=True)["dpd"].mean().sort_index(),
+                                   check_names=False, check_index_type=False)
+
+    where = {"status_paid": ["Stuck", "In Progress"], "loan_type": "Personal Loan"}
+    subset = book[book["status_paid"].isin(where["status_paid"]) & (book["loan_type"] == "Personal Loan")]
+    sums = rollup(cube, ["age_group"], "recovered", how="sum", where=where).set_index("age_group")["recovered"]
+    assert len(subset) and (sums == subset.groupby("age_group", observed=True)["recovered"].sum()).all()
+    top = value_counts(cube, "contact_channel")
+    assert top["count"].is_monotonic_decreasing and top["count"].sum() == book["contact_channel"].notna().sum()
+    assert total(cube, "dpd_over_30") == (book["dpd"] > 30).sum()
+
+def test_merged_cube_equals_a_rebuild(book):
+    cube = build_cube(book.iloc[:4_000])
+    merged = merge_cubes(cube, build_cube(book.iloc[4_000:]))
+    removed = merge_cubes(merged, build_cube(book.iloc[3_000:]), sign=-1)
+    for result, rows in [(merged, book), (removed, book.iloc[:3_000])]:
+        rebuilt = build_cube(rows)
+        dims = rebuilt.attrs["dimensions"]
+        left = result.set_index(dims).sort_index()
+        right = rebuilt.set_index(dims).sort_index()
+        assert left.index.equals(right.index)
+        assert np.allclose(left[right.columns].to_numpy(dtype=float), right.to_numpy(dtype=float), equal_nan=True)
@@ -0,0 +1,29 @@
+
+from unittest import mock
+
+import pytest
+import streamlit_option_menu
+from streamlit.testing.v1 import AppTest
+
+import flowen_data
+
+PAGES = ["Risk Overview", "Journey Management", "Recovery KPI", "Behavioral Insights"]
+# Valid on their own, but no account is both
+EMPTY_FILTER = {"filter_risk_level": ["High"], "filter_journey_type": ["General Follow-up"]}
+
+def run_page(page, state):
+    with mock.patch.object(streamlit_option_menu, "option_menu", lambda *a, **k: page):
+        at = AppTest.from_file("../app.py", default_timeout=120)
+        for key, value in state.items():
+            at.session_state[key] = value
+        return at.run()
+
+@pytest.mark.parametrize("backend", ["memory", "duckdb"])
+@pytest.mark.parametrize("page", PAGES)
+def test_empty_filter_shows_empty_state(page, backend, monkeypatch):
+    if backend == "duckdb":
+        pytest.importorskip("duckdb")
+    monkeypatch.setattr(flowen_data, "BACKEND", backend)
+    at = run_page(page, EMPTY_FILTER)
+    assert not at.exception, at.exception[0].message
+    assert any("No accounts match" in info.value for info in at.info)
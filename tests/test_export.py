@@ -0,0 +1,102 @@
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import flowen_data
+import flowen_export
+from flowen_cache import load_portfolio
+from flowen_export import EXPORT_TTL, CsvWriter, ExcelWriter, ExportJob, ExportJobs, PdfWriter
+from flowen_filters import BitmapIndex
+from flowen_ingest import derive_fields
+from flowen_refresh import Snapshot
+
+def test_pdf_spells_out_the_baht_sign(tmp_path):
+    path = tmp_path / "debtors.pdf"
+    writer = PdfWriter(path, ["Account ID", "Outstanding (฿)"], "Debtor Summary")
+    writer.write(pd.DataFrame({"account_id": ["A001"], "total_debt": [1250.5]}))
+    writer.close()
+    streams = re.findall(rb"stream\n(.*?)\nendstream", path.read_bytes(), re.S)
+    text = b"".join(zlib.decompress(stream) for stream in streams)
+    assert b"(Outstanding \\(THB\\))" in text and b"?" not in text
+
+def test_finished_jobs_are_evicted_after_the_ttl():
+    jobs = ExportJobs(workers=1)
+    old, recent, running = ExportJob("a", "csv"), ExportJob("b", "csv"), ExportJob("c", "csv")
+    old.finished = time.time() - EXPORT_TTL - 1
+    recent.finished = time.time()
+    jobs.jobs = {job.id: job for job in (old, recent, running)}
+    jobs._evict()
+    assert set(jobs.jobs) == {recent.id, running.id}
+
+def test_writers_stream_chunks_into_every_format(tmp_path, monkeypatch):
+    frame = pd.DataFrame({
+        "account_id": [f"A{n:04d}" for n in range(250)],
+        "total_debt": np.linspace(0, 1000, 250),
+        "due_date": pd.date_range("2025-01-01", periods=250, freq="D"),
+        "region": ["North", None] * 125,
+    })
+    labels = ["Account", "Debt", "Due", "Region"]
+    chunks = [frame.iloc[start:start + 60] for start in range(0, 250, 60)]
+
+    writer = CsvWriter(tmp_path / "rows.csv", labels, "Rows")
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    back = pd.read_csv(tmp_path / "rows.csv", encoding="utf-8-sig")
+    assert list(back.columns) == labels and len(back) == 250
+    assert back["Due"].iloc[3] == "2025-01-04" and back["Region"].isna().sum() == 125
+    assert np.allclose(back["Debt"], frame["total_debt"].round(2))
+
+    openpyxl = pytest.importorskip("openpyxl")
+    pytest.importorskip("xlsxwriter")
+    monkeypatch.setattr(ExcelWriter, "MAX_ROWS", 100)
+    writer = ExcelWriter(tmp_path / "rows.xlsx", labels, "Rows")
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    book = openpyxl.load_workbook(tmp_path / "rows.xlsx", read_only=True)
+    sizes = [sum(1 for _ in sheet.iter_rows()) - 1 for sheet in book.worksheets]
+    assert book.sheetnames == ["Rows", "Rows 2", "Rows 3"] and sizes == [100, 100, 50]
+
+    writer = PdfWriter(tmp_path / "rows.pdf", labels, "Rows")
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    pdf = (tmp_path / "rows.pdf").read_bytes()
+    assert pdf.count(b"/Type /Page ") == -(-250 // writer.per_page) and pdf.rstrip().endswith(b"%%EOF")
+
+def test_jobs_write_complete_files_or_none(tmp_path, monkeypatch):
+    monkeypatch.setattr(flowen_export, "EXPORT_DIR", str(tmp_path))
+    jobs = ExportJobs(workers=1)
+    frame = pd.DataFrame({"account_id": ["A", "B", "C"], "dpd": [1, 2, 3]})
+
+    done = ExportJob("rows", "csv")
+    jobs._run(done, lambda: (3, iter([frame.iloc[:2], frame.iloc[2:]])), ["Account", "DPD"], "Rows")
+    assert done.status == "done" and done.rows == 3 and done.progress == 1.0
+    assert pd.read_csv(done.path, encoding="utf-8-sig")["DPD"].tolist() == [1, 2, 3]
+
+    def broken():
+        yield frame
+        raise OSError("disk full")
+    failed = ExportJob("rows", "csv")
+    jobs._run(failed, lambda: (6, broken()), ["Account", "DPD"], "Rows")
+    assert failed.status == "failed" and failed.error == "disk full"
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(done.path)]
+
+def test_export_rows_follow_filters_conditions_and_sort(monkeypatch):
+    monkeypatch.setattr(flowen_data, "BACKEND", "memory")
+    book = derive_fields(load_portfolio("flowen_mock_data_5000.csv"))
+    snapshot = Snapshot("test-export", book, None, None, bitmaps=BitmapIndex(book))
+    filters = (("region", ("North", "South")),)
+    total, chunks = flowen_data.export_rows(["account_id", "total_debt"], {"dpd": (">", 10)}, ("total_debt", False),
+                                            chunk_rows=100, snapshot=snapshot, filters=filters)
+    rows = pd.concat(list(chunks))
+    expected = book[book["region"].isin(["North", "South"]) & (book["dpd"] > 10)]
+    expected = expected.sort_values("total_debt", ascending=False, kind="stable")
+    assert total == len(rows) == len(expected)
+    assert rows["account_id"].tolist() == expected["account_id"].tolist()
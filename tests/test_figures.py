@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+
+from flowen_figures import FigureCache, figure_size
+
+FRAME = pd.DataFrame({
+    "day": np.arange(3000),
+    "amount": np.random.default_rng(0).random(3000) * 1e5,
+    "channel": np.random.default_rng(1).choice(["LINE", "Call", "SMS", "Email"], 3000),
+})
+
+@pytest.mark.parametrize("build", [
+    lambda: px.line(FRAME, x="day", y="amount", color="channel"),
+    lambda: px.bar(FRAME.groupby("channel", as_index=False)["amount"].sum(), x="channel", y="amount"),
+    lambda: px.histogram(FRAME, x="amount", color="channel"),
+    lambda: px.scatter(FRAME, x="day", y="amount", hover_name=FRAME["channel"] + " account"),
+])
+def test_size_estimate_is_close_to_the_json(build):
+    figure = build()
+    assert 0.5 < figure_size(figure) / len(figure.to_json()) < 2
+
+def test_miss_does_not_serialise_the_figure(monkeypatch):
+    cache = FigureCache(max_bytes=10**6)
+    figure = px.bar(x=["a", "b"], y=[1, 2])
+    monkeypatch.setattr(type(figure), "to_json", lambda *args, **kwargs: pytest.fail("serialised on a miss"))
+    assert cache.get("chart", "v1", None, lambda: figure) is figure
+    assert cache.stats()["bytes"] == figure_size(figure)
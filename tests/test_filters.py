@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from flowen_cache import load_portfolio
+from flowen_cube import build_cube, filter_cube, total
+from flowen_filters import BitmapIndex, filter_conditions, filter_label
+from flowen_ingest import derive_fields
+from flowen_rules import conditions_mask
+
+FILTERS = [
+    (("region", ("North",)),),
+    (("risk_level", ("High", "Medium")), ("loan_type", ("Car Loan", "SME Loan"))),
+    (("region", ("South", "Bangkok")), ("dpd_bucket", ("8–30",)), ("journey_type", ("Hardship Assistance",))),
+    (("region", ("Atlantis",)),),
+]
+
+@pytest.fixture(scope="module")
+def book():
+    # an odd row count exercises the padding of the packed bits
+    return derive_fields(load_portfolio("flowen_mock_data_5000.csv")).iloc[:4_997].copy()
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_bitmaps_match_the_columns(book, filters):
+    expected = np.ones(len(book), dtype=bool)
+    for column, values in filters:
+        expected &= book[column].isin(values).to_numpy()
+    mask = BitmapIndex(book).mask(filters)
+    assert mask.shape == (len(book),) and (mask == expected).all()
+    # the same selection as rule conditions, and as a cube slice
+    assert (conditions_mask(book, filter_conditions(filters)) == expected).all()
+    assert total(filter_cube(build_cube(book), dict(filters))) == expected.sum()
+
+def test_no_filter_is_every_row(book):
+    assert BitmapIndex(book).mask(()).all()
+    assert filter_label(FILTERS[1]) == "Risk Level: High, Medium; Loan Type: Car Loan, SME Loan"
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from flowen_cache import load_portfolio
+from flowen_cube import build_cube
+from flowen_forecast import FORECAST_SOURCE, fit_model, pay_probability, simulate
+from flowen_ingest import derive_fields
+from flowen_recovery import build_recovery_series
+
+@pytest.fixture(scope="module")
+def book():
+    return derive_fields(load_portfolio("flowen_mock_data_5000.csv"))
+
+@pytest.fixture(scope="module")
+def model(book):
+    return fit_model(build_cube(book), build_recovery_series(book))
+
+def test_model_rates_come_from_the_book(book, model):
+    rate = book.groupby("risk_level", observed=True)["recovered"].mean()
+    assert np.allclose(model["rate"].sort_index(), rate.sort_index())
+    recovered = book[book["recovered"] == 1]
+    days = recovered.groupby("risk_level", observed=True)["dpd"].mean().clip(lower=1)
+    assert np.allclose(model["days"].sort_index(), days.sort_index())
+    pays = pay_probability(model, book, book["journey_type"].astype(object).to_numpy(), 30)
+    assert ((pays >= 0) & (pays < 1)).all()
+
+def test_simulated_recovery_matches_its_expectation(book, model):
+    accounts = book[FORECAST_SOURCE].iloc[:4_000]
+    result = simulate(accounts, model, trials=400, horizon=30, seed=1)
+    totals = result["totals"]["Baseline"]
+    assert len(totals) == 400 and result["balance"] == pytest.approx(accounts["total_debt"].sum(), rel=1e-6)
+    error = totals.std() / np.sqrt(len(totals))
+    assert abs(totals.mean() - result["expected"]["Baseline"]) < 4 * error
+    segments = result["segments"]
+    assert segments["Accounts"].sum() == len(accounts)
+    assert segments["Expected (฿)"].sum() == pytest.approx(totals.mean())
+
+def test_chunking_and_what_if_share_the_draws(book, model):
+    accounts = book[FORECAST_SOURCE].iloc[:1_000]
+    whole = simulate(accounts, model, trials=64, seed=7)
+    chunked = simulate(accounts, model, trials=64, seed=7, chunk_cells=8_000)
+    assert np.array_equal(whole["totals"], chunked["totals"])
+
+    # reassigning no account changes nothing; reassigning some only moves them
+    nobody = {"where": {"total_debt": ("<", 0)}, "journey_type": "Hardship Assistance"}
+    same = simulate(accounts, model, trials=64, seed=7, reassign=nobody)
+    assert np.array_equal(same["totals"]["Baseline"], same["totals"]["What-if"])
+    assert np.array_equal(same["totals"]["Baseline"], whole["totals"]["Baseline"])
+    moved = simulate(accounts, model, trials=64, seed=7,
+                     reassign={"where": {"risk_level": "High"}, "journey_type": "Default Prevention"})
+    high = accounts["risk_level"] == "High"
+    journeys = np.where(high, "Default Prevention", accounts["journey_type"].astype(object))
+    expected = pay_probability(model, accounts, journeys, 30) * accounts["total_debt"].to_numpy(dtype=np.float32)
+    assert moved["expected"]["What-if"] == pytest.approx(expected.sum(), rel=1e-5)
+    assert moved["expected"]["Baseline"] == pytest.approx(whole["expected"]["Baseline"])
+    changed = moved["segments"].query("Scenario == 'What-if' and Journey == 'Default Prevention'")
+    assert changed["Accounts"].sum() >= high.sum()
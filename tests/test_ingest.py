@@ -0,0 +1,117 @@
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_cache import load_portfolio
+from flowen_filters import FILTER_DIMENSIONS, BitmapIndex
+from flowen_ingest import PortfolioStore, derive_fields
+
+@pytest.fixture
+def store():
+    return PortfolioStore(load_portfolio("flowen_mock_data_5000.csv"))
+
+def row(store, account):
+    return store.df.iloc[store.keys.positions(pd.Index([account]))[0]]
+
+def test_scored_confidence_survives_later_updates(store):
+    scored, unscored = store.df["account_id"].iloc[:2]
+    store.apply_batch(pd.DataFrame({"account_id": [scored], "ai_risk_score": [0.906], "ai_confidence": [45.9]}))
+    assert row(store, scored)["ai_confidence"] == pytest.approx(45.9)
+
+    store.apply_batch(pd.DataFrame({"account_id": [scored, unscored], "dpd": [3, 4], "ai_risk_score": [np.nan, 0.5]}))
+    assert row(store, scored)["dpd"] == 3
+    assert row(store, scored)["ai_confidence"] == pytest.approx(45.9)
+    # accounts never scored still follow ai_risk_score
+    assert row(store, unscored)["ai_confidence"] == pytest.approx(50.0)
+
+def test_indexes_follow_batches_and_keep_snapshot_copies(store):
+    filters = [(("risk_level", ("High",)),), (("region", ("North",)), ("journey_type", ("Legal Action", "Recovery")))]
+    accounts, bitmaps = store.account_index(), copy.copy(store.filter_index())
+    ranking = copy.copy(store.rankings["likely_to_pay"])
+    before = store.df.copy()
+    head = ranking.positions.copy()
+
+    ids = store.df["account_id"].iloc[[0, 7, 9, 100]].tolist()
+    store.apply_batch(pd.DataFrame({"account_id": ids, "risk_level": ["High", "Low", "High", "Medium"],
+                                    "dpd": [0, 95, 40, 5], "ai_risk_score": [1.0, 0.99, 0.0, 0.98]}))
+    assert store.account_index() is accounts
+    new = load_portfolio("flowen_mock_data_5000.csv").head(3).assign(
+        account_id=["NEW-1", "NEW-2", "NEW-3"], risk_level=["High", "Low", "High"], region=["North", "North", "Offshore"])
+    store.apply_batch(new)
+    assert store.account_index() is not accounts
+    assert store.account_index().position("NEW-2") == len(store.df) - 2
+
+    fresh = BitmapIndex(store.df, FILTER_DIMENSIONS)
+    for f in filters + [(("region", ("Offshore",)),)]:
+        assert (store.filter_index().mask(f) == fresh.mask(f)).all()
+    # what a snapshot copied still describes its own version
+    old = BitmapIndex(before, FILTER_DIMENSIONS)
+    for f in filters:
+        assert (bitmaps.mask(f) == old.mask(f)).all()
+    assert (ranking.positions == head).all()
+
+def sorted_cube(cube):
+    dims = cube.attrs["dimensions"]
+    frame = cube.astype({d: str for d in dims})
+    return frame.sort_values(dims).reset_index(drop=True)
+
+def test_incremental_state_matches_a_rebuild(store):
+    source = load_portfolio("flowen_mock_data_5000.csv")
+    rng = np.random.default_rng(0)
+    store.account_index(), store.filter_index()
+    for batch in range(4):
+        picked = rng.choice(len(store.df), size=200, replace=False)
+        store.apply_batch(pd.DataFrame({
+            "account_id": store.df["account_id"].to_numpy()[picked],
+            "dpd": rng.integers(0, 120, 200),
+            "risk_level": rng.choice(["Low", "Medium", "High"], 200),
+            "contact_channel": rng.choice(["LINE", "Call", "SMS"], 200),
+            "total_debt": rng.uniform(1_000, 90_000, 200).round(2),
+            "ai_risk_score": rng.random(200),
+            "last_payment_date": pd.Timestamp("2030-01-01") + pd.to_timedelta(rng.integers(0, 30, 200), unit="D"),
+        }))
+        appends = source.sample(150, random_state=batch).copy()
+        appends["account_id"] = [f"NEW{batch}-{i}" for i in range(150)]
+        store.apply_batch(appends)
+
+    rebuilt = PortfolioStore(store.df.copy())
+    pd.testing.assert_frame_equal(sorted_cube(store.cube), sorted_cube(rebuilt.cube), check_dtype=False)
+    pd.testing.assert_frame_equal(sorted_cube(store.recovery), sorted_cube(rebuilt.recovery), check_dtype=False)
+    # rows tied on the score may be kept in any order, so the scores are compared
+    for name, ranking in store.rankings.items():
+        scores = store.df[ranking.column].to_numpy()
+        assert (scores[ranking.top(store.df, 10)] == scores[rebuilt.rankings[name].top(rebuilt.df, 10)]).all()
+    assert (store.keys.positions(store.df["account_id"]) == np.arange(len(store.df))).all()
+    for column, values in rebuilt.filter_index().bitmaps.items():
+        for value in values:
+            f = ((column, (value,)),)
+            assert (store.filter_index().mask(f) == rebuilt.filter_index().mask(f)).all()
+    assert store.account_index().position("NEW3-149") == len(store.df) - 1
+
+def test_tag_batches_add_to_earlier_counts(store):
+    account = store.df["account_id"].iloc[0]
+    store.apply_batch(pd.DataFrame({"account_id": [account], "tag_willing": [2], "tag_silent": [1]}))
+    store.apply_batch(pd.DataFrame({"account_id": [account], "tag_willing": [3]}))
+    assert row(store, account)["tag_willing"] == 5
+    assert row(store, account)["tag_silent"] == 1
+    assert store.df["tag_willing"].sum() == 5
+
+def test_recovered_fallback_follows_the_account_not_the_batch():
+    source = pd.read_csv("flowen_mock_data_1000.csv")
+    assert "recovered" not in source.columns
+    whole = derive_fields(source.copy())["recovered"].to_numpy()
+    alone = derive_fields(source.tail(7).copy())["recovered"].to_numpy()
+    assert (alone == whole[-7:]).all()
+    assert (whole[source["dpd"].to_numpy() == 0] == 1).all()
+    assert 0.5 < whole[source["dpd"].to_numpy() > 0].mean() < 0.7
+
+def test_recovered_fallback_matches_the_duckdb_backend():
+    duckdb = pytest.importorskip("duckdb")
+    from flowen_ooc import DERIVED_SQL
+
+    sql = f"SELECT {DERIVED_SQL['recovered']} AS recovered FROM read_csv_auto('flowen_mock_data_1000.csv')"
+    expected = duckdb.sql(sql).df()["recovered"].to_numpy()
+    assert (derive_fields(pd.read_csv("flowen_mock_data_1000.csv"))["recovered"].to_numpy() == expected).all()
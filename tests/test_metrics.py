@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import time
+
+import flowen_metrics
+from flowen_metrics import Metrics, _write_periodically, begin_rerun, end_rerun, section
+
+def test_file_is_rewritten_in_the_background_only_when_changed(tmp_path):
+    path = tmp_path / "metrics.prom"
+    metrics = Metrics()
+    _write_periodically(metrics, str(path), 0.05)
+    metrics.observe_rerun("risk", 0.2)
+    time.sleep(0.3)
+    assert 'flowen_rerun_seconds_count{page="risk"} 1' in path.read_text()
+    written = path.stat().st_mtime_ns
+    time.sleep(0.2)
+    assert path.stat().st_mtime_ns == written
+
+def test_rerun_records_without_writing(monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(flowen_metrics, "registry", lambda: metrics)
+    monkeypatch.setattr(Metrics, "write", lambda *args: (_ for _ in ()).throw(AssertionError("written on the rerun")))
+    begin_rerun("risk")
+    with section("table", rows=10):
+        pass
+    seconds, records = end_rerun()
+    assert [r["section"] for r in records] == ["table"] and metrics.rows[("risk", "table")] == 10
+    assert metrics.reruns["risk"].count == 1
+
+def test_default_file_follows_the_cache_dir(tmp_path):
+    env = {**os.environ, "FLOWEN_CACHE_DIR": str(tmp_path)}
+    env.pop("FLOWEN_METRICS_FILE", None)
+    out = subprocess.run([sys.executable, "-c", "import flowen_metrics; print(flowen_metrics.METRICS_FILE)"],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    assert out.strip() == os.path.join(str(tmp_path), "metrics.prom")
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from flowen_cache import load_portfolio
+from flowen_cube import CUBE_DIMENSIONS, build_cube, rollup, total
+from flowen_filters import filter_conditions
+from flowen_ingest import derive_fields
+from flowen_ooc import OutOfCorePortfolio, write_dataset
+from flowen_recovery import build_recovery_series
+from flowen_topk import build_rankings
+
+SOURCE = "flowen_mock_data_5000.csv"
+
+@pytest.fixture(scope="module")
+def book():
+    return derive_fields(load_portfolio(SOURCE))
+
+@pytest.fixture(scope="module")
+def portfolio(tmp_path_factory):
+    pytest.importorskip("duckdb")
+    return OutOfCorePortfolio(write_dataset(SOURCE, str(tmp_path_factory.mktemp("ooc") / "book")))
+
+def test_dataset_files_share_one_schema(tmp_path):
+    book = pd.read_csv("flowen_mock_data_5000_enhanced.csv", dtype=str)
+    rows = len(book)
+    # values that would each infer a different type chunk by chunk
+    book["tag_willing"] = [""] * 3_000 + ["2"] * (rows - 3_000)
+    book["note"] = [""] * 4_500 + ["x"] * (rows - 4_500)
+    book["extra"] = ["1"] * 2_500 + ["1.5"] * (rows - 2_500)
+    book["total_debt"] = ["1000"] * 2_000 + book["total_debt"].iloc[2_000:].tolist()
+    book.to_csv(tmp_path / "book.csv", index=False)
+
+    directory = write_dataset(tmp_path / "book.csv", tmp_path / "book", chunk_rows=1_000)
+    files = sorted((tmp_path / "book").rglob("*.parquet"))
+    schemas = {str(pq.read_schema(path).remove_metadata()) for path in files}
+    assert len(files) > 4 and len(schemas) == 1
+
+    schema = pq.read_schema(files[0])
+    assert str(schema.field("tag_willing").type) == "int32"
+    assert str(schema.field("extra").type) == "double"
+    assert "string" in str(schema.field("note").type)
+    assert "timestamp" in str(schema.field("due_date").type)
+    assert len(pd.read_parquet(directory)) == rows
+
+def test_cube_matches_the_in_memory_cube(book, portfolio):
+    memory, ooc = build_cube(book), portfolio.cube()
+    assert total(ooc) == total(memory) == len(portfolio)
+    for measure in ["total_debt", "recovered", "ai_confidence", "dpd_over_30"]:
+        assert total(ooc, measure) == pytest.approx(total(memory, measure))
+    for dim in CUBE_DIMENSIONS:
+        left = rollup(ooc, [dim], "total_debt", how="mean").set_index(dim)["total_debt"]
+        right = rollup(memory, [dim], "total_debt", how="mean").set_index(dim)["total_debt"]
+        assert left.index.astype(str).sort_values().equals(right.index.astype(str).sort_values())
+        assert np.allclose(left.sort_index().to_numpy(), right.sort_index().to_numpy())
+
+def test_recovery_series_matches(book, portfolio):
+    memory = build_recovery_series(book[book["risk_level"].isin(["High", "Medium"])])
+    ooc = portfolio.recovery_series(filter_conditions([("risk_level", ("High", "Medium"))]))
+    keys = ["payment_day", "contact_channel", "risk_level"]
+    memory = memory.assign(**{k: memory[k].astype(object) for k in keys[1:]}).sort_values(keys, ignore_index=True)
+    ooc = ooc.assign(**{k: ooc[k].astype(object) for k in keys[1:]}).sort_values(keys, ignore_index=True)
+    assert len(ooc) == len(memory)
+    assert (ooc["payment_day"].to_numpy() == memory["payment_day"].to_numpy()).all()
+    for column in ["count", "sum_recovered_amount", "sum_recovered_dpd"]:
+        assert np.allclose(ooc[column], memory[column])
+
+def test_rows_rankings_and_lookups_match(book, portfolio):
+    rankings = build_rankings(book)
+    for name in rankings:
+        expected = book["account_id"].iloc[rankings[name].top(book, 15)]
+        assert list(portfolio.top(name, 15)["account_id"]) == list(expected)
+    north = (book["region"] == "North").to_numpy()
+    expected = book["account_id"].iloc[rankings["likely_to_pay"].top(book, 15, north)]
+    assert list(portfolio.top("likely_to_pay", 15, {"region": "North"})["account_id"]) == list(expected)
+
+    assert portfolio.count({"dpd": (">", 30)}, {"region": "North"}) == ((book["dpd"] > 30) & north).sum()
+    row = portfolio.account("ACCT00042")
+    assert row["journey_type"] == book["journey_type"].iloc[41] and row["recovered"] == book["recovered"].iloc[41]
+    assert portfolio.account("ACCT99999") is None
+    assert list(portfolio.search("acct0010")["account_id"]) == [f"ACCT{n:05d}" for n in range(100, 110)]
@@ -0,0 +1,52 @@
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_cache import load_portfolio
+from flowen_ingest import PortfolioStore, derive_fields
+from flowen_recovery import RECOVERY_SOURCE, as_of, build_recovery_series, daily_recovery, month_to_date
+
+def test_series_without_payments():
+    rows = load_portfolio("flowen_mock_data_5000.csv").head(20)[RECOVERY_SOURCE].copy()
+    rows["last_payment_date"] = pd.NaT
+    series = build_recovery_series(rows)
+    assert pd.isna(as_of(series))
+    mtd = month_to_date(series)
+    assert mtd["recovered_amount"] == 0 and mtd["accounts"] == 0
+    assert daily_recovery(series).empty
+
+def test_kpis_match_the_accounts():
+    rows = derive_fields(load_portfolio("flowen_mock_data_5000.csv"))
+    series = build_recovery_series(rows)
+    day = as_of(series)
+    paid = pd.to_datetime(rows["last_payment_date"]).dt.normalize()
+    month = rows[(paid >= day.replace(day=1)) & (paid <= day)]
+    mtd = month_to_date(series)
+    assert mtd["accounts"] == len(month)
+    assert mtd["recovered_amount"] == pytest.approx((month["total_debt"] * month["recovered"]).sum())
+    assert mtd["recovery_rate"] == pytest.approx(month["recovered"].mean() * 100)
+
+    daily = daily_recovery(series, days=30, rolling=7).set_index("Date")["Recovered"]
+    assert len(daily) == 30 and daily.index[-1] == day
+    amounts = (rows["total_debt"] * rows["recovered"]).groupby(paid).sum()
+    assert np.allclose(daily, amounts.reindex(daily.index, fill_value=0))
+
+def test_store_keeps_the_series_current():
+    store = PortfolioStore(load_portfolio("flowen_mock_data_5000.csv"))
+    batch = store.df[["account_id", "last_payment_date", "dpd", "total_debt"]].sample(300, random_state=0)
+    batch["last_payment_date"] = as_of(store.recovery)
+    batch["dpd"] = 0
+    batch["total_debt"] = batch["total_debt"] * 0.5
+    new = pd.read_csv("flowen_mock_data_5000.csv", nrows=20).assign(account_id=[f"NEW{n:03d}" for n in range(20)])
+    store.apply_batch(pd.concat([batch, new], ignore_index=True))
+
+    rebuilt = build_recovery_series(store.df)
+    dims = rebuilt.attrs["dimensions"]
+    left = store.recovery.set_index(dims).sort_index()
+    right = rebuilt.set_index(dims).sort_index()
+    assert left.index.equals(right.index)
+    assert np.allclose(left[right.columns].to_numpy(dtype=float), right.to_numpy(dtype=float))
+    kept, expected = month_to_date(store.recovery), month_to_date(rebuilt)
+    assert kept.pop("as_of") == expected.pop("as_of") and kept == pytest.approx(expected)
+    assert month_to_date(store.recovery)["accounts"] >= 300
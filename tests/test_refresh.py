@@ -0,0 +1,61 @@
+import threading
+import time
+
+from flowen_refresh import Refresher, Snapshot, pin, pinned
+
+class Source:
+    def __init__(self):
+        self.version = 0
+        self.fail = False
+
+    def build(self, previous):
+        if self.fail:
+            raise RuntimeError("source unreadable")
+        if previous is not None and previous.version == self.version:
+            return None
+        return Snapshot(self.version, f"data-{self.version}", None, None)
+
+def test_swaps_only_on_change_and_keeps_the_last_good_snapshot():
+    source = Source()
+    refresher = Refresher(source.build, interval=0)
+    first = refresher.current
+    assert not refresher.refresh() and refresher.current is first
+
+    source.version = 1
+    assert refresher.refresh() and refresher.current.data == "data-1" and refresher.swaps == 1
+    source.fail, source.version = True, 2
+    assert not refresher.refresh()
+    assert refresher.current.data == "data-1" and "source unreadable" in refresher.last_error
+    source.fail = False
+    assert refresher.refresh(full=True) and refresher.current.version == 2
+
+def test_a_rerun_reads_one_snapshot_across_swaps():
+    source = Source()
+    refresher = Refresher(source.build, interval=0)
+    seen = []
+
+    def rerun():
+        pinned_at_start = pin(refresher)
+        source.version = 5
+        refresher.refresh()
+        seen.append((pinned_at_start, pinned(refresher)))
+
+    thread = threading.Thread(target=rerun)
+    thread.start()
+    thread.join()
+    start, later = seen[0]
+    assert later is start and start.version == 0
+    # threads that never pinned read the latest snapshot
+    assert pinned(refresher).version == 5
+
+def test_background_thread_publishes_new_versions():
+    source = Source()
+    refresher = Refresher(source.build, interval=0.01)
+    try:
+        source.version = 3
+        deadline = time.time() + 5
+        while refresher.current.version != 3 and time.time() < deadline:
+            time.sleep(0.01)
+        assert refresher.current.version == 3
+    finally:
+        refresher.stop()
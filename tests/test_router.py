@@ -0,0 +1,33 @@
+import importlib
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+import streamlit_option_menu
+from streamlit.testing.v1 import AppTest
+
+from flowen_pages import PAGES
+
+@pytest.mark.parametrize("page", list(PAGES))
+def test_only_the_selected_page_renders(page):
+    rendered = []
+    modules = {name: importlib.import_module(path) for name, path in PAGES.items()}
+    with mock.patch.object(streamlit_option_menu, "option_menu", lambda *a, **k: page):
+        patches = [mock.patch.object(module, "render", lambda df, name=name: rendered.append(name))
+                   for name, module in modules.items()]
+        for patch in patches:
+            patch.start()
+        try:
+            at = AppTest.from_file("../app.py", default_timeout=120).run()
+        finally:
+            for patch in patches:
+                patch.stop()
+    assert not at.exception
+    assert rendered == [page]
+
+def test_page_modules_are_imported_on_first_use():
+    code = ("import sys, flowen_pages; "
+            "print(sorted(m for m in sys.modules if m.startswith('flowen_pages.')))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
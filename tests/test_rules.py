@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_rules import (
+    JOURNEY_DEFAULT, JOURNEY_RULES, STATUS_PAID_DEFAULT, STATUS_PAID_RULES, assign_journey, assign_status_paid,
+    conditions_mask, rules_sql
+)
+
+# The row-wise mapping the rule tables replaced
+def legacy_status_paid(dpd):
+    return "Paid" if dpd == 0 else ("In Progress" if dpd < 30 else "Stuck")
+
+def legacy_journey(row):
+    if row["risk_level"] == "High":
+        return "Hardship Assistance"
+    elif row["contact_channel"] == "LINE":
+        return "Default Prevention"
+    elif row["contact_channel"] == "Call":
+        return "Promise to Pay Reinforcement"
+    else:
+        return "General Follow-up"
+
+@pytest.fixture
+def book():
+    df = pd.read_csv("flowen_mock_data_5000.csv", usecols=["dpd", "risk_level", "contact_channel"])
+    # gaps fall through to the next rule, as they did row by row
+    edge = pd.DataFrame({"dpd": [np.nan, 0, 29, 30], "risk_level": [np.nan, "High", None, "Low"],
+                         "contact_channel": ["LINE", np.nan, "Call", None]})
+    return pd.concat([df, edge], ignore_index=True)
+
+def test_rule_tables_match_the_row_wise_mapping(book):
+    assert (assign_status_paid(book) == book["dpd"].apply(legacy_status_paid)).all()
+    assert (assign_journey(book) == book.apply(legacy_journey, axis=1)).all()
+    assert assign_journey.columns == ["contact_channel", "risk_level"]
+
+def test_operators_and_sql_agree(book):
+    duckdb = pytest.importorskip("duckdb")
+    when = {"dpd": (">=", 10), "contact_channel": ("in", ["LINE", "SMS"])}
+    expected = book["dpd"].ge(10) & book["contact_channel"].isin(["LINE", "SMS"])
+    assert (conditions_mask(book, when) == expected.to_numpy()).all()
+
+    sql = (f"SELECT {rules_sql(JOURNEY_RULES, JOURNEY_DEFAULT)} AS journey, "
+           f"{rules_sql(STATUS_PAID_RULES, STATUS_PAID_DEFAULT)} AS status FROM book")
+    result = duckdb.sql(sql).df()
+    assert (result["journey"] == assign_journey(book)).all()
+    assert (result["status"] == assign_status_paid(book)).all()
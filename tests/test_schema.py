@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from flowen_schema import SCHEMA, apply_schema, empty_column, extend_categories, memory_report
+
+SOURCE = "flowen_mock_data_5000.csv"
+
+def test_typed_book_is_smaller_and_keeps_its_values():
+    raw = pd.read_csv(SOURCE)
+    typed = apply_schema(raw.copy())
+    assert typed.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum() / 3
+    for column in raw.columns.intersection(list(SCHEMA)):
+        if str(SCHEMA[column]).startswith("datetime64"):
+            assert (typed[column] == pd.to_datetime(raw[column])).all()
+        elif typed[column].dtype == "category":
+            assert (typed[column].astype(object).fillna("") == raw[column].fillna("")).all()
+        else:
+            # float32 scores keep about seven significant digits
+            assert np.allclose(typed[column], raw[column], rtol=1e-6, equal_nan=True)
+    report = memory_report(typed)
+    assert report["bytes"].sum() == typed.memory_usage(deep=True, index=False).sum()
+    assert report.loc["dpd", "dtype"] == "int16"
+
+def test_batches_keep_text_and_widen_categories():
+    typed = apply_schema(pd.read_csv(SOURCE, nrows=100))
+    batch = apply_schema(pd.DataFrame({"region": ["Far North"], "dpd": [np.nan]}), categorical=False)
+    assert batch["region"].dtype != "category" and batch["dpd"].isna().all()
+    extend_categories(typed, "region", batch["region"])
+    assert "Far North" in typed["region"].cat.categories
+    assert empty_column("tag_willing", 3).dtype == "int32" and np.isnan(empty_column("note", 3)).all()
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_ingest import write_batch
+from flowen_scoring import SCORE_FEATURES, main, score_frame, score_parallel
+
+ENHANCED = "flowen_mock_data_5000_enhanced.csv"
+
+def test_missing_features_are_neutral_and_lower_confidence():
+    rows = pd.read_csv(ENHANCED).head(200)
+    assert score_frame(rows)["ai_confidence"].max() > 90
+    partial = score_frame(rows.drop(columns=["credit_history_score", "payment_pattern_score"]))
+    # at most the share of the total weight that is still known
+    known = sum(abs(spec["weight"]) for spec in SCORE_FEATURES.values())
+    assert partial["ai_confidence"].max() <= 100 * (known - 2.6 - 1.6) / known
+    # a feature at its midpoint moves nothing, so dropping it changes nothing
+    midpoint = rows.assign(dpd=15)
+    assert np.allclose(score_frame(midpoint)["ai_risk_score"], score_frame(midpoint.drop(columns="dpd"))["ai_risk_score"])
+
+def test_higher_dpd_lowers_the_score():
+    rows = pd.read_csv(ENHANCED).head(50)
+    assert (score_frame(rows.assign(dpd=0))["ai_risk_score"] > score_frame(rows.assign(dpd=30))["ai_risk_score"]).all()
+
+def test_parallel_chunks_match_a_single_pass():
+    rows = pd.read_csv(ENHANCED)[["account_id", *SCORE_FEATURES]]
+    pd.testing.assert_frame_equal(score_parallel(rows, workers=2, chunk_rows=700), score_frame(rows))
+
+def test_batches_written_in_the_same_second_keep_their_order(tmp_path):
+    frame = pd.DataFrame({"account_id": ["A1"], "dpd": [1]})
+    names = [os.path.basename(write_batch(frame, tmp_path, "scores")) for _ in range(5)]
+    assert len(set(names)) == 5 and sorted(names) == names
+
+def test_scores_follow_the_delta_batches(tmp_path):
+    source = pd.read_csv(ENHANCED)
+    account = source["account_id"].iloc[0]
+    pd.DataFrame({"account_id": [account], "dpd": [0 if source["dpd"].iloc[0] else 30]}).to_csv(
+        tmp_path / "a-update.csv", index=False)
+    main(["--source", ENHANCED, "--delta-dir", str(tmp_path), "--workers", "1"])
+    written = [name for name in os.listdir(tmp_path) if name.startswith("scores-")]
+    scores = pd.read_parquet(tmp_path / written[0]).set_index("account_id")
+    updated = source.head(1).assign(dpd=0 if source["dpd"].iloc[0] else 30)
+    assert scores.loc[account, "ai_risk_score"] == pytest.approx(score_frame(updated)["ai_risk_score"].iloc[0], rel=1e-6)
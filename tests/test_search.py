@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_search import AccountIndex
+
+@pytest.fixture(scope="module")
+def book():
+    return pd.read_csv("flowen_mock_data_5000.csv", usecols=["account_id", "name"])
+
+@pytest.fixture(scope="module")
+def index(book):
+    return AccountIndex(book)
+
+def test_lookup_by_account_id(book, index):
+    assert index.position("ACCT00042") == 41
+    assert index.position("ACCT99999") is None
+
+def test_exact_id_ranks_before_prefix_and_substring_hits(book, index):
+    hits = index.search("ACCT01234", limit=5)
+    assert hits[0] == 1233 and len(hits) == 1
+    assert list(index.search("acct0010", limit=20)) == list(range(99, 109))
+
+    # exact id first, then names starting with the query, then the rest
+    hits = index.search("user_12", limit=20)
+    names = book["name"].str.lower().to_numpy()
+    prefix = sorted(np.flatnonzero(pd.Series(names).str.startswith("user_12")), key=lambda p: names[p])
+    assert list(hits) == prefix[:20]
+
+    hits = index.search(" SER_499 ", limit=50)
+    expected = np.flatnonzero(pd.Series(names).str.contains("ser_499", regex=False))
+    assert sorted(hits) == list(expected)
+
+def test_limits_and_empty_queries(index):
+    assert len(index.search("acct", limit=7)) == 7
+    assert list(index.search("", limit=3)) == [0, 1, 2]
+    assert len(index.search("zzz")) == 0
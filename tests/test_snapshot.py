@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import flowen_data
+from flowen_refresh import Refresher, _local, pin
+
+@pytest.fixture
+def refresher(monkeypatch, tmp_path):
+    monkeypatch.setattr(flowen_data, "BACKEND", "memory")
+    monkeypatch.setattr(flowen_data, "DELTA_DIR", str(tmp_path / "deltas"))
+    refresher = Refresher(flowen_data._build_snapshot, interval=0)
+    monkeypatch.setattr(flowen_data, "_get_refresher", lambda path, backend: refresher)
+    pin(refresher)
+    yield refresher
+    _local.snapshot = None
+
+def test_sessions_share_the_snapshot_buffers(refresher):
+    snapshot = refresher.current
+    first, second = flowen_data.load_data(), flowen_data.load_data()
+    assert first is not second
+    for column in ["total_debt", "dpd"]:
+        assert np.shares_memory(first[column].to_numpy(), snapshot.data[column].to_numpy())
+        assert np.shares_memory(second[column].to_numpy(), snapshot.data[column].to_numpy())
+
+    # what one session writes stays in its own copy
+    before = snapshot.data["total_debt"].copy()
+    first.loc[first.index[:10], "total_debt"] = 0.0
+    first["overlay"] = 1
+    assert (second["total_debt"] == before).all() and (snapshot.data["total_debt"] == before).all()
+    assert "overlay" not in second.columns and "overlay" not in snapshot.data.columns
+
+def test_store_writes_leave_published_snapshots_alone(refresher, tmp_path):
+    old = refresher.current
+    before = old.data.copy()
+    batch = old.data[["account_id", "dpd", "total_debt"]].head(50).assign(dpd=0, total_debt=1.0)
+    (tmp_path / "deltas").mkdir()
+    batch.to_csv(tmp_path / "deltas" / "batch-1.csv", index=False)
+
+    assert refresher.refresh()
+    new = refresher.current
+    assert new.version != old.version and (new.data["total_debt"].iloc[:50] == 1.0).all()
+    pd.testing.assert_frame_equal(old.data, before)
+    # the new version shares every column the batch did not touch
+    assert np.shares_memory(new.data["age"].to_numpy(), old.data["age"].to_numpy())
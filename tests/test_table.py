@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowen_cache import load_portfolio
+from flowen_ingest import derive_fields
+from flowen_table import _page
+
+COLUMNS = ("account_id", "name", "dpd", "total_debt", "risk_level")
+
+@pytest.fixture(scope="module")
+def book():
+    return derive_fields(load_portfolio("flowen_mock_data_5000.csv"))
+
+def expected_page(book, sort_column, ascending, query, rows, start, size):
+    frame = book if rows is None else book[rows]
+    if query:
+        frame = frame[frame["account_id"].str.lower().str.contains(query) | frame["name"].str.lower().str.contains(query)]
+    if sort_column:
+        frame = frame.sort_values(sort_column, ascending=ascending, kind="stable", na_position="last")
+    return frame[list(COLUMNS)].iloc[start:start + size], len(frame)
+
+@pytest.mark.parametrize("sort_column, ascending", [(None, True), ("total_debt", False), ("dpd", True), ("risk_level", False)])
+@pytest.mark.parametrize("query", ["", "user_4"])
+def test_page_matches_a_full_sort(book, sort_column, ascending, query):
+    rows = (book["region"] != "North").to_numpy()
+    for start in [0, 25, 900]:
+        page, total = _page(book, COLUMNS, "test-table", sort_column, ascending, query, ("account_id", "name"),
+                            start, 25, rows)
+        expected, expected_total = expected_page(book, sort_column, ascending, query, rows, start, 25)
+        assert total == expected_total
+        pd.testing.assert_frame_equal(page, expected)
+
+def test_out_of_core_pages_match(book, tmp_path):
+    pytest.importorskip("duckdb")
+    from flowen_ooc import OutOfCorePortfolio, write_dataset
+
+    portfolio = OutOfCorePortfolio(write_dataset("flowen_mock_data_5000.csv", str(tmp_path / "book")))
+    for sort_column, ascending in [("total_debt", False), ("dpd", True)]:
+        for query in ["", "user_4"]:
+            page, total = _page(portfolio, COLUMNS, portfolio.version, sort_column, ascending, query,
+                                ("account_id", "name"), 50, 25, {"region": ("!=", "North")})
+            rows = (book["region"] != "North").to_numpy()
+            expected, expected_total = expected_page(book, sort_column, ascending, query, rows, 50, 25)
+            assert total == expected_total
+            assert list(page["account_id"]) == list(expected["account_id"])
+            assert np.allclose(page["total_debt"], expected["total_debt"])
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from flowen_ingest import known_accounts
+from flowen_tagging import get_automaton, normalize, tag_chunk
+
+def test_thai_spacing_and_spelling_variants_match():
+    automaton = get_automaton()
+    assert automaton.tag("ไม่ มี เงิน ครับ") == ["Cashflow_Issue"]
+    assert automaton.tag("ขอเลื่อนนนน ๆ") == ["Willing"]
+    assert normalize("จะ  จ่าย, pay  tomorrow!!") == " จะจ่าย pay tomorrow "
+
+def test_english_phrases_match_whole_words():
+    automaton = get_automaton()
+    assert automaton.tag("casino money") == []
+    assert automaton.tag("repay tomorrow") == []
+    assert automaton.tag("Sorry, NO MONEY this week") == ["Cashflow_Issue"]
+    assert automaton.tag("ตกงาน, lost my job") == ["Cashflow_Issue"]
+
+def test_chunk_counts_messages_per_account_and_tag():
+    chunk = pd.DataFrame({
+        "account_id": ["A1", "A1", "A2", "A1"],
+        "message": ["will pay tomorrow", "no money no money", "stop calling", None],
+    })
+    counts = tag_chunk(chunk)
+    assert counts.loc["A1", "tag_pay_intent"] == 1 and counts.loc["A1", "tag_cashflow_issue"] == 1
+    assert counts.loc["A2", "tag_silent"] == 1 and counts.loc["A2"].sum() == 1
+
+def test_known_accounts_include_appended_ones(tmp_path):
+    pd.DataFrame({"account_id": ["LATE-1"], "dpd": [3]}).to_csv(tmp_path / "batch.csv", index=False)
+    known = known_accounts("flowen_mock_data_5000.csv", str(tmp_path))
+    assert "LATE-1" in known and len(known) == 5001
@@ -0,0 +1,69 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import flowen_data
+from flowen_refresh import Snapshot
+from flowen_topk import TopK, build_rankings
+
+def test_top_beyond_capacity_leaves_the_index_alone():
+    df = pd.DataFrame({"score": np.random.default_rng(0).random(500)})
+    ranking = TopK("score", capacity=8).rebuild(df)
+    positions, capacity = ranking.positions, ranking.capacity
+
+    top = ranking.top(df, 20)
+    assert (top == np.argsort(-df["score"].to_numpy())[:20]).all()
+    mask = np.arange(500) % 2 == 0
+    assert (ranking.top(df, 5, mask) == np.flatnonzero(mask)[np.argsort(-df["score"].to_numpy()[mask])[:5]]).all()
+    assert ranking.positions is positions and ranking.capacity == capacity
+
+def test_narrow_mask_selects_from_the_masked_rows_only():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"score": rng.random(2_000), "dpd": rng.integers(0, 90, 2_000)})
+    ranking = TopK("score", where={"dpd": (">", 30)}, capacity=16).rebuild(df)
+    mask = np.zeros(2_000, dtype=bool)
+    mask[rng.choice(2_000, 40, replace=False)] = True
+    expected = df[mask & (df["dpd"] > 30)].sort_values("score", ascending=False).index[:10]
+    assert (ranking.top(df, 10, mask) == expected.to_numpy()).all()
+    # fewer qualifying rows than asked for: all of them, best first
+    assert (ranking.top(df, 100, mask) == df[mask & (df["dpd"] > 30)].sort_values("score", ascending=False).index).all()
+
+def test_masked_top_is_cached_per_version_and_filter():
+    df = pd.DataFrame({"ai_risk_score": np.random.default_rng(2).random(300), "risk_level": ["High"] * 10 + ["Low"] * 290})
+    df["dpd"], df["last_payment_days_ago"] = 40, 1
+    snapshot = Snapshot("v-topk", df, None, None, rankings=build_rankings(df))
+    filters = (("risk_level", ("High",)),)
+    with mock.patch.object(flowen_data, "filter_mask", lambda filters, snapshot: (df["risk_level"] == "High").to_numpy()):
+        first = flowen_data._top_positions(snapshot.version, "likely_to_pay", 20, filters, snapshot)
+        assert flowen_data._top_positions(snapshot.version, "likely_to_pay", 20, filters, snapshot) is first
+    assert sorted(first) == list(range(10))
+
+def test_updates_keep_the_head_exact():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({"score": rng.random(5_000), "dpd": rng.integers(0, 90, 5_000)})
+    ranking = TopK("score", ascending=True, where={"dpd": (">", 30)}, capacity=32).rebuild(df)
+    for _ in range(50):
+        changed = rng.choice(5_000, 200, replace=False)
+        df = df.copy()
+        df.loc[changed, "score"] = rng.random(200)
+        df.loc[changed, "dpd"] = rng.integers(0, 90, 200)
+        ranking.update(df, changed)
+        eligible = df[df["dpd"] > 30].sort_values("score", kind="stable")
+        assert (ranking.top(df, 10) == eligible.index[:10].to_numpy()).all()
+        assert len(ranking.positions) <= ranking.capacity
+
+def test_ties_rank_by_position_like_the_sql_backend():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({"score": rng.integers(0, 5, 3_000).astype(float)})
+    ranking = TopK("score", capacity=16).rebuild(df)
+    expected = lambda df: df.sort_values("score", ascending=False, kind="stable").index.to_numpy()
+    assert (ranking.top(df, 16) == expected(df)[:16]).all()
+    for _ in range(30):
+        changed = rng.choice(3_000, 100, replace=False)
+        df = df.copy()
+        df.loc[changed, "score"] = rng.integers(0, 5, 100).astype(float)
+        ranking.update(df, changed)
+        assert (ranking.top(df, 10) == expected(df)[:10]).all()
+    mask = np.arange(3_000) % 7 == 0
+    assert (ranking.top(df, 40, mask) == expected(df[mask])[:40]).all()